@@ -26,7 +26,7 @@ sys.path.append(os.getcwd())
 
 from app.db.base_class import Base
 from app.core.config import settings
-from app.db.models import User, Tenant, Asset, TelemetrySnapshot, AuditLog
+from app.db.models import User, Tenant, Asset, TelemetrySnapshot, AuditLog, ReliabilityConfig
 
 target_metadata = Base.metadata
 
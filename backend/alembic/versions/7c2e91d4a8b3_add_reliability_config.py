@@ -0,0 +1,48 @@
+"""Add reliability_config
+
+Revision ID: 7c2e91d4a8b3
+Revises: 504599fea539
+Create Date: 2026-10-18 16:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e91d4a8b3'
+down_revision: Union[str, None] = '504599fea539'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reliability_config',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('scope_key', sa.String(), nullable=False),
+        sa.Column('threshold_load', sa.Float(), nullable=True),
+        sa.Column('penalty_weight', sa.Float(), nullable=True),
+        sa.Column('ambient_ref_temp', sa.Float(), nullable=True),
+        sa.Column('temp_coefficient', sa.Float(), nullable=True),
+        sa.Column('humidity_threshold', sa.Float(), nullable=True),
+        sa.Column('humidity_coefficient', sa.Float(), nullable=True),
+        sa.Column('max_aging_factor', sa.Float(), nullable=True),
+        sa.Column('tenant_id', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'scope', 'scope_key')
+    )
+    op.create_index(op.f('ix_reliability_config_id'), 'reliability_config', ['id'], unique=False)
+    op.create_index(op.f('ix_reliability_config_tenant_id'), 'reliability_config', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_reliability_config_tenant_id'), table_name='reliability_config')
+    op.drop_index(op.f('ix_reliability_config_id'), table_name='reliability_config')
+    op.drop_table('reliability_config')
@@ -0,0 +1,42 @@
+"""Tenant-scoped composite indexes
+
+Revision ID: b3f8a1c6d2e4
+Revises: 7c2e91d4a8b3
+Create Date: 2026-10-18 19:42:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8a1c6d2e4'
+down_revision: Union[str, None] = '7c2e91d4a8b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns). Databases created with create_all already have them.
+INDEXES = [
+    ('ix_asset_tenant_id_id', 'asset', ['tenant_id', 'id']),
+    ('ix_asset_tenant_id_type_id', 'asset', ['tenant_id', 'type', 'id']),
+    ('ix_telemetry_snapshot_tenant_id_current_damage', 'telemetry_snapshot', ['tenant_id', 'current_damage']),
+    ('ix_telemetry_snapshot_tenant_id_current_rul', 'telemetry_snapshot', ['tenant_id', 'current_rul', 'asset_id']),
+    ('ix_auditlog_tenant_id_entity_id_created_at', 'auditlog', ['tenant_id', 'entity_id', 'created_at']),
+    ('ix_auditlog_tenant_id_action_id', 'auditlog', ['tenant_id', 'action', 'id']),
+    ('ix_auditlog_created_at', 'auditlog', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY on PostgreSQL, so ingest and audit writes are not blocked
+    # while the indexes build; it cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
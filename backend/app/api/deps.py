@@ -1,38 +1,20 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from pydantic import ValidationError
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, HTTPException
 
-from app.core.config import settings
+from app.api.middleware.tenant import get_token_claims, user_id_of
 from app.db.models import User
-from app.db.session import get_db
 from app.schemas.token import TokenPayload
-from app.core import security
-
-reusable_oauth2 = OAuth2PasswordBearer(
-    tokenUrl=f"{settings.API_V1_STR}/login/access-token"
-)
+from app.services.user_cache import user_cache
+from app.utils.timing import timed
 
 async def get_current_user(
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
+    claims: TokenPayload = Depends(get_token_claims)
 ) -> User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
-    
-    stmt = select(User).where(User.id == token_data.sub)
-    user = await db.scalar(stmt)
+    """
+    The authenticated user, served from the user cache. The returned instance is
+    detached and shared: load the user in your own session before modifying it.
+    """
+    with timed("auth"):
+        user = await user_cache.get(user_id_of(claims))
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
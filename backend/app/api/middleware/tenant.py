@@ -1,26 +1,81 @@
-from typing import Optional
 from fastapi import Request, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from app.core.config import settings
 from app.schemas.token import TokenPayload
+from app.services.user_cache import user_cache
+from app.utils.timing import timed
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
-def get_current_tenant_id(token: str = Depends(reusable_oauth2)) -> str:
-    # ... previous logic ...
-    return payload.get("tenant_id") # Simplified for readability in this chunk
+def decode_token(token: str) -> TokenPayload:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        token_data = TokenPayload(**payload)
+    except (JWTError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    if not token_data.tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token is not bound to a tenant",
+        )
+    return token_data
+
+async def get_token_claims(request: Request, token: str = Depends(reusable_oauth2)) -> TokenPayload:
+    """
+    Verified claims of the request's bearer token. Every auth dependency goes
+    through this one, so the signature is checked once per request; the claims
+    are also left on request.state.claims for non-dependency code.
+
+    A role claim issued before the user's last role or status change is
+    dropped, so role checks fall back to the user record.
+    """
+    claims = getattr(request.state, "claims", None)
+    if claims is None:
+        with timed("auth"):
+            claims = decode_token(token)
+            if claims.role is not None and await user_cache.is_stale(user_id_of(claims), claims.iat):
+                claims.role = None
+        request.state.claims = claims
+    return claims
+
+def get_current_tenant_id(claims: TokenPayload = Depends(get_token_claims)) -> str:
+    return claims.tenant_id
+
+def user_id_of(claims: TokenPayload) -> int:
+    try:
+        return int(claims.sub)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
 
 class RoleChecker:
     def __init__(self, allowed_roles: list[str]):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, token: str = Depends(reusable_oauth2)):
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_role = payload.get("role", "viewer")
+    async def __call__(
+        self,
+        claims: TokenPayload = Depends(get_token_claims),
+    ):
+        user_role = claims.role
+        if user_role is None:
+            # Token predates role claims or a later role/status change: ask the user record
+            with timed("auth"):
+                user = await user_cache.get(user_id_of(claims))
+            if user is None or not user.is_active:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Could not validate credentials",
+                )
+            user_role = user.role or "viewer"
         if user_role not in self.allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
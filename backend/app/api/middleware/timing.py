@@ -0,0 +1,61 @@
+import random
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.utils.metrics import HTTP_REQUEST_SECONDS
+from app.utils.timing import RequestTimings, current_timings
+from loguru import logger
+
+# Phases reported in the Server-Timing header; slow-request logs include every phase
+SERVER_TIMING_PHASES = ("auth", "db", "engine")
+
+def server_timing(timings: RequestTimings) -> bytes:
+    parts = [f"{phase};dur={timings.phases[phase] * 1000:.2f}" for phase in SERVER_TIMING_PHASES if phase in timings.phases]
+    parts.append(f"app;dur={timings.elapsed() * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI request timing. Records latency per route template (the matched
+    route's path, so /assets/{asset_id} is one series), adds a Server-Timing
+    header with the auth/db/engine time spent before the response started, and
+    logs a sample of slow requests with every recorded phase. Response bodies
+    pass through untouched, so streaming responses keep streaming.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()), (b"server-timing", server_timing(timings))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            elapsed = timings.elapsed()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(method=scope["method"], route=template, status=f"{status_code // 100}xx").observe(elapsed)
+            if (
+                settings.SLOW_REQUEST_THRESHOLD_MS > 0
+                and elapsed * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS
+                and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE
+            ):
+                breakdown = ", ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in sorted(timings.phases.items()))
+                # Diagnostics, not audit material: keep out of the audit log
+                logger.bind(audit=False).warning(
+                    f"Slow request: {scope['method']} {scope['path']} ({template}) - {status_code} - "
+                    f"{elapsed * 1000:.1f}ms [{breakdown or 'no phases recorded'}]"
+                )
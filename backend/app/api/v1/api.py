@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import login, reliability, assets, tenants, dashboard, system_requests, role_requests, users, chatbot
+from app.api.v1.endpoints import login, reliability, assets, tenants, dashboard, system_requests, role_requests, users, chatbot, configs, live
 
 api_router = APIRouter()
 
@@ -12,6 +12,8 @@ api_router.include_router(system_requests.router, prefix="/system-requests", tag
 api_router.include_router(role_requests.router, prefix="/role-requests", tags=["Role Requests"])
 api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(chatbot.router, prefix="/chatbot", tags=["Chatbot"])
+api_router.include_router(configs.router, prefix="/configs", tags=["Reliability Config"])
+api_router.include_router(live.router, prefix="/live", tags=["Live Feed"])
 
 @api_router.get("/info", tags=["System"])
 async def get_system_info():
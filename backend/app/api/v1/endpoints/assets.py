@@ -1,25 +1,150 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_, or_
 from app.api.middleware.tenant import get_current_tenant_id, RoleChecker
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.db.models import Asset, TelemetrySnapshot
-from typing import List
+from app.services.config_cache import config_cache
+from app.services.dashboard import dashboard_aggregates
+from app.schemas.asset import AssetPage, AssetSummary, asset_page_adapter
+from app.utils.pagination import encode_cursor, decode_cursor
+from typing import Literal, Optional
 
 router = APIRouter()
 is_engineer = RoleChecker(["admin", "engineer"])
 
-@router.get("/", response_model=List[dict])
+# Position of each sort column in the selected row, for building the cursor
+SORT_INDEX = {"id": 0, "type": 2, "status": 3, "rul": 5}
+SORT_COLUMNS = {
+    "id": Asset.id,
+    "type": Asset.type,
+    "status": Asset.operational_status,
+    "rul": TelemetrySnapshot.current_rul,
+}
+LIST_COLUMNS = (
+    Asset.id, Asset.name, Asset.type, Asset.operational_status,
+    TelemetrySnapshot.current_damage, TelemetrySnapshot.current_rul, TelemetrySnapshot.confidence_score,
+)
+
+@router.get("/", response_model=AssetPage)
 async def list_assets(
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    sort: Literal["id", "type", "status", "rul"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    rul_min: Optional[float] = None,
+    rul_max: Optional[float] = None,
+    db: AsyncSession = Depends(get_read_db),
     tenant_id: str = Depends(get_current_tenant_id)
 ):
     """
-    List all assets for the current tenant.
+    List assets for the current tenant with their latest health state, one page at a time.
+    Keyset pagination: pass next_cursor back as ?cursor= (with the same sort/order) to continue.
+    Rows without a value for the sort column come last.
     """
-    stmt = select(Asset).where(Asset.tenant_id == tenant_id)
-    result = await db.scalars(stmt)
-    return [asset.__dict__ for asset in result]
+    sort_col = SORT_COLUMNS[sort]
+    descending = order == "desc"
+    filters = []
+    if type is not None:
+        filters.append(Asset.type == type)
+    if status is not None:
+        filters.append(Asset.operational_status == status)
+    if rul_min is not None:
+        filters.append(TelemetrySnapshot.current_rul >= rul_min)
+    if rul_max is not None:
+        filters.append(TelemetrySnapshot.current_rul <= rul_max)
+    stmt = (
+        select(*LIST_COLUMNS)
+        .outerjoin(TelemetrySnapshot, TelemetrySnapshot.asset_id == Asset.id)
+        .where(Asset.tenant_id == tenant_id, *filters)
+    )
+
+    values = None
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if sort == "rul":
+            # Applied by _rul_rows, separately to the assets with and without a RUL
+            pass
+        elif sort == "id":
+            stmt = stmt.where(Asset.id < values[1] if descending else Asset.id > values[1])
+        elif values[0] is None:
+            # Already into the trailing NULLs: only the id tie-breaker is left
+            stmt = stmt.where(sort_col.is_(None), Asset.id < values[1] if descending else Asset.id > values[1])
+        else:
+            after = (
+                or_(sort_col < values[0], and_(sort_col == values[0], Asset.id < values[1]))
+                if descending else
+                or_(sort_col > values[0], and_(sort_col == values[0], Asset.id > values[1]))
+            )
+            stmt = stmt.where(or_(after, sort_col.is_(None)))
+
+    id_order = Asset.id.desc() if descending else Asset.id.asc()
+    if sort == "rul":
+        rows = await _rul_rows(db, stmt, tenant_id, filters, values, descending, limit + 1)
+    else:
+        if sort == "id":
+            stmt = stmt.order_by(id_order)
+        else:
+            stmt = stmt.order_by((sort_col.desc() if descending else sort_col.asc()).nulls_last(), id_order)
+        rows = (await db.execute(stmt.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[SORT_INDEX[sort]], last.id)
+
+    page = AssetPage.model_construct(
+        items=[
+            AssetSummary.model_construct(
+                id=aid, name=name, type=asset_type, status=op_status,
+                damage=damage,
+                health=None if damage is None else round((1.0 - damage) * 100, 1),
+                rul=rul, confidence=confidence,
+            )
+            for aid, name, asset_type, op_status, damage, rul, confidence in rows
+        ],
+        next_cursor=next_cursor,
+    )
+    return Response(content=asset_page_adapter.dump_json(page), media_type="application/json")
+
+async def _rul_rows(db: AsyncSession, stmt, tenant_id: str, filters: list, values: Optional[list], descending: bool, limit: int) -> list:
+    """
+    Up to `limit` rows in RUL order: the assets with a RUL walked off the
+    (tenant_id, current_rul, asset_id) index, then those without one by id.
+    `stmt` is the tenant's asset list (outer joined), `values` the decoded cursor.
+    """
+    rul = TelemetrySnapshot.current_rul
+    asset_id = TelemetrySnapshot.asset_id
+    rows = []
+    if values is None or values[0] is not None:
+        # Driven from the snapshot side: filtering on asset.tenant_id as well
+        # would lead SQLite into scanning the tenant's assets and sorting them
+        rated = (
+            select(*LIST_COLUMNS)
+            .select_from(TelemetrySnapshot)
+            .join(Asset, Asset.id == asset_id)
+            .where(TelemetrySnapshot.tenant_id == tenant_id, rul.is_not(None), *filters)
+        )
+        if values:
+            rated = rated.where(
+                or_(rul < values[0], and_(rul == values[0], asset_id < values[1]))
+                if descending else
+                or_(rul > values[0], and_(rul == values[0], asset_id > values[1]))
+            )
+        order = (rul.desc(), asset_id.desc()) if descending else (rul.asc(), asset_id.asc())
+        rows = (await db.execute(rated.order_by(*order).limit(limit))).all()
+        values = None
+    if len(rows) < limit:
+        unrated = stmt.where(rul.is_(None))
+        if values:
+            unrated = unrated.where(Asset.id < values[1] if descending else Asset.id > values[1])
+        unrated = unrated.order_by(Asset.id.desc() if descending else Asset.id.asc())
+        rows += (await db.execute(unrated.limit(limit - len(rows)))).all()
+    return rows
 
 @router.post("/register", dependencies=[Depends(is_engineer)])
 async def register_asset(
@@ -38,4 +163,8 @@ async def register_asset(
     snapshot = TelemetrySnapshot(asset_id=asset_id, tenant_id=tenant_id, current_damage=0.0)
     db.add(snapshot)
     await db.commit()
+    dashboard_aggregates.record(tenant_id, assets_added=1, snapshots_added=1)
+    # Drop any stale config resolved for this id before it existed (e.g. type-level overrides)
+    await config_cache.invalidate(db, tenant_id, "asset", asset_id)
     return {"status": "success", "asset_id": asset_id}
+
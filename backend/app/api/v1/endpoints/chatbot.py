@@ -1,10 +1,14 @@
+import json
 from typing import Any, List
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import google.generativeai as genai
-from app.core.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
 from app.db.models import User
+from app.db.session import get_read_db
+from app.services.chat import chat_service, needs_fleet_data
+from app.services.fleet_summary import fleet_summary
 from loguru import logger
 
 router = APIRouter()
@@ -20,62 +24,56 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str
 
-# System prompt to give Gemini context about Forsee AI
-SYSTEM_PROMPT = """
-You are the Forsee AI Assistant, an expert in industrial predictive maintenance, 
-health monitoring, and equipment reliability. 
+def _history(request: ChatRequest):
+    return [(msg.role, msg.content) for msg in request.history]
 
-Your goal is to help users understand their asset health, interpret RUL (Remaining Useful Life) 
-predictions, and provide guidance on maintenance scheduling.
-
-Context: Forsee AI is a state-of-the-art software that monitors industrial assets (pumps, turbines, etc.) 
-using physically-grounded ML models.
-
-Tone: Professional, intelligent, helpful, and technically accurate.
-
-Constraint: If asked about things completely unrelated to Forsee AI or industrial reliability, 
-politely steer the conversation back to those topics.
-"""
+async def _fleet_context(db: AsyncSession, tenant_id: str, request: ChatRequest) -> str:
+    # General questions go without fleet data, so their cached answers can be shared
+    if not needs_fleet_data(request.message, _history(request)):
+        return ""
+    return await fleet_summary.get(db, tenant_id)
 
 @router.post("/", response_model=ChatResponse)
 async def chat_with_gemini(
     request: ChatRequest,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(deps.get_current_user)
 ) -> Any:
     """
-    Generate a response using Google Gemini
+    Generate a complete response. See /stream for incremental delivery.
     """
-    if not settings.GEMINI_API_KEY:
-        raise HTTPException(status_code=500, detail="Gemini API Key not configured")
-
     try:
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        model = genai.GenerativeModel('gemini-flash-latest', system_instruction=SYSTEM_PROMPT)
-        
-        # Convert history to Gemini format
-        chat_history = []
-        for msg in request.history:
-            chat_history.append({
-                "role": "user" if msg.role == "user" else "model",
-                "parts": [msg.content]
-            })
+        summary = await _fleet_context(db, current_user.tenant_id, request)
+        return ChatResponse(response=await chat_service.answer(request.message, _history(request), summary))
+    except Exception as e:
+        logger.exception(f"Chatbot error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(deps.get_current_user)
+) -> Any:
+    """
+    Server-Sent Events: `event: token` messages ({"text": ...}) as the model
+    produces them, then `event: done`, or `event: error` ({"detail": ...}).
+    """
+    # Before streaming starts: the request's session is closed once the response begins
+    summary = await _fleet_context(db, current_user.tenant_id, request)
 
-        # Start a chat session with history
-        chat = model.start_chat(history=chat_history)
-        
-        # Send the user's message
-        response = chat.send_message(request.message)
-        
-        # Handle cases where response.text might be unavailable/blocked
+    async def events():
         try:
-            bot_text = response.text
-        except Exception:
-            bot_text = "I'm sorry, I cannot answer that request due to safety or technical restrictions."
+            async for text in chat_service.stream(request.message, _history(request), summary):
+                yield f"event: token\ndata: {json.dumps({'text': text})}\n\n"
+        except Exception as e:
+            logger.exception(f"Chatbot stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': f'Failed to generate response: {e}'})}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
 
-        return ChatResponse(response=bot_text)
-        
-    except Exception as e:
-        import traceback
-        logger.error(f"Gemini Error: {e}")
-        logger.error(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.api.middleware.tenant import get_current_tenant_id, RoleChecker
+from app.db.session import SessionLocal, get_read_db
+from app.db.models import ReliabilityConfig
+from app.services.config_cache import config_cache, DEFAULT_RELIABILITY_CONFIG
+from app.utils.logging import audit_logger
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+
+router = APIRouter()
+is_engineer = RoleChecker(["admin", "engineer"])
+
+Scope = Literal["asset", "asset_type"]
+
+class ReliabilityConfigIn(BaseModel):
+    threshold_load: Optional[float] = None
+    penalty_weight: Optional[float] = None
+    ambient_ref_temp: Optional[float] = None
+    temp_coefficient: Optional[float] = None
+    humidity_threshold: Optional[float] = None
+    humidity_coefficient: Optional[float] = None
+    max_aging_factor: Optional[float] = None
+
+class ReliabilityConfigOut(ReliabilityConfigIn):
+    scope: str
+    scope_key: str
+
+    class Config:
+        from_attributes = True
+
+@router.get("/defaults", response_model=Dict[str, float])
+async def get_default_config():
+    """
+    Parameters applied when neither the asset nor its type overrides them.
+    """
+    return DEFAULT_RELIABILITY_CONFIG
+
+@router.get("/", response_model=List[ReliabilityConfigOut])
+async def list_configs(
+    db: AsyncSession = Depends(get_read_db),
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    List reliability config overrides for the current tenant.
+    """
+    stmt = select(ReliabilityConfig).where(ReliabilityConfig.tenant_id == tenant_id)
+    return (await db.scalars(stmt)).all()
+
+@router.get("/effective/{asset_id}", response_model=Dict[str, float])
+async def get_effective_config(
+    asset_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    Resolved parameters the engines use for an asset.
+    """
+    return (await config_cache.resolve(db, tenant_id, [asset_id]))[asset_id]
+
+@router.put("/{scope}/{scope_key}", response_model=ReliabilityConfigOut, dependencies=[Depends(is_engineer)])
+async def upsert_config(
+    scope: Scope,
+    scope_key: str,
+    config_in: ReliabilityConfigIn,
+    db: AsyncSession = Depends(get_read_db),
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    Create or replace the override for an asset or asset type. Restricted to Engineers/Admins.
+    """
+    stmt = select(ReliabilityConfig).where(
+        ReliabilityConfig.tenant_id == tenant_id,
+        ReliabilityConfig.scope == scope,
+        ReliabilityConfig.scope_key == scope_key,
+    )
+    async with SessionLocal() as session:
+        config = await session.scalar(stmt)
+        if not config:
+            config = ReliabilityConfig(tenant_id=tenant_id, scope=scope, scope_key=scope_key)
+            session.add(config)
+        for field, value in config_in.model_dump().items():
+            setattr(config, field, value)
+        await session.commit()
+        await session.refresh(config)
+
+    await config_cache.invalidate(db, tenant_id, scope, scope_key)
+    audit_logger.info(f"Tenant {tenant_id}: reliability config {scope}/{scope_key} set to {config_in.model_dump(exclude_none=True)}")
+    return config
+
+@router.delete("/{scope}/{scope_key}", dependencies=[Depends(is_engineer)])
+async def delete_config(
+    scope: Scope,
+    scope_key: str,
+    db: AsyncSession = Depends(get_read_db),
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    Remove an override; affected assets fall back to type-level or default parameters.
+    """
+    stmt = select(ReliabilityConfig).where(
+        ReliabilityConfig.tenant_id == tenant_id,
+        ReliabilityConfig.scope == scope,
+        ReliabilityConfig.scope_key == scope_key,
+    )
+    async with SessionLocal() as session:
+        config = await session.scalar(stmt)
+        if not config:
+            raise HTTPException(status_code=404, detail="Config not found")
+        await session.delete(config)
+        await session.commit()
+
+    await config_cache.invalidate(db, tenant_id, scope, scope_key)
+    audit_logger.info(f"Tenant {tenant_id}: reliability config {scope}/{scope_key} removed")
+    return {"status": "success"}
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from app.api.middleware.tenant import decode_token, user_id_of
+from app.core.config import settings
+from app.schemas.token import TokenPayload
+from app.services.live_feed import live_feed
+from app.services.user_cache import user_cache
+from typing import List, Optional
+
+router = APIRouter()
+
+def _asset_filter(assets: Optional[str]) -> Optional[List[str]]:
+    return [a for a in assets.split(",") if a] if assets else None
+
+def _header_token(authorization: Optional[str]) -> Optional[str]:
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not credentials:
+        return None
+    return credentials
+
+async def _authenticate(token: str) -> TokenPayload:
+    """
+    Claims of a stream's token; raises HTTPException once it has expired or its
+    user has been deactivated or removed since it was issued. Called on connect
+    and again every LIVE_FEED_AUTH_RECHECK seconds while the stream is open.
+    """
+    claims = decode_token(token)
+    user_id = user_id_of(claims)
+    if await user_cache.is_stale(user_id, claims.iat):
+        user = await user_cache.get(user_id)
+        if user is None or not user.is_active or user.tenant_id != claims.tenant_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Could not validate credentials")
+    return claims
+
+async def _websocket_token(websocket: WebSocket) -> Optional[str]:
+    # Browsers cannot set headers on a WebSocket: they send {"type": "auth", "token": ...} first
+    token = _header_token(websocket.headers.get("Authorization"))
+    if token:
+        return token
+    try:
+        message = await asyncio.wait_for(websocket.receive_json(), timeout=settings.LIVE_FEED_AUTH_TIMEOUT)
+    except (asyncio.TimeoutError, ValueError):
+        return None
+    if not isinstance(message, dict) or message.get("type") != "auth" or not isinstance(message.get("token"), str):
+        return None
+    return message["token"]
+
+@router.websocket("/ws")
+async def asset_state_socket(
+    websocket: WebSocket,
+    assets: Optional[str] = Query(None, description="Comma-separated asset ids; omit for the whole tenant"),
+):
+    """
+    Pushes asset state deltas ({"type": "state", "states": [...]}) for the token's tenant.
+    The token comes in an Authorization header or as the first frame,
+    {"type": "auth", "token": ...}. Sends {"type": "ping"} on idle connections,
+    and closes with 1008 once the token expires or its user is deactivated.
+    """
+    await websocket.accept()
+    try:
+        token = await _websocket_token(websocket)
+        if token is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+        claims = await _authenticate(token)
+    except WebSocketDisconnect:
+        return
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    subscription = live_feed.subscribe(claims.tenant_id, _asset_filter(assets))
+    check_at = time.monotonic() + settings.LIVE_FEED_AUTH_RECHECK
+    try:
+        while True:
+            states = await subscription.next(min(settings.LIVE_FEED_HEARTBEAT, max(0.0, check_at - time.monotonic())))
+            if time.monotonic() >= check_at:
+                try:
+                    await _authenticate(token)
+                except HTTPException:
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    return
+                check_at = time.monotonic() + settings.LIVE_FEED_AUTH_RECHECK
+            await websocket.send_json({"type": "state", "states": states} if states else {"type": "ping"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_feed.unsubscribe(subscription)
+
+@router.get("/sse")
+async def asset_state_events(
+    request: Request,
+    assets: Optional[str] = Query(None, description="Comma-separated asset ids; omit for the whole tenant"),
+):
+    """
+    Server-Sent Events variant of /ws: `event: state` messages carrying a JSON array of states.
+    Takes the token from the Authorization header; the stream ends with
+    `event: unauthorized` once the token expires or its user is deactivated.
+    """
+    token = _header_token(request.headers.get("Authorization"))
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    claims = await _authenticate(token)
+    subscription = live_feed.subscribe(claims.tenant_id, _asset_filter(assets))
+
+    async def stream():
+        check_at = time.monotonic() + settings.LIVE_FEED_AUTH_RECHECK
+        try:
+            while not await request.is_disconnected():
+                states = await subscription.next(min(settings.LIVE_FEED_HEARTBEAT, max(0.0, check_at - time.monotonic())))
+                if time.monotonic() >= check_at:
+                    try:
+                        await _authenticate(token)
+                    except HTTPException:
+                        yield "event: unauthorized\ndata: {}\n\n"
+                        return
+                    check_at = time.monotonic() + settings.LIVE_FEED_AUTH_RECHECK
+                yield f"event: state\ndata: {json.dumps(states)}\n\n" if states else ": ping\n\n"
+        finally:
+            live_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
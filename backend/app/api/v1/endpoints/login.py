@@ -1,13 +1,12 @@
 from datetime import timedelta
 from typing import Any
-import requests
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_read_db
 from app.db.models import User
 from app.schemas.token import Token
 
@@ -15,29 +14,36 @@ router = APIRouter()
 
 @router.post("/login/access-token", response_model=Token)
 async def login_access_token(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
-    OAuth2 compatible token login, retrieve a JWT token
+    OAuth2 compatible token login, retrieve a JWT token.
+    The lookup runs on the read pool so hashing never holds the writer.
     """
     stmt = select(User).where(User.email == form_data.username)
     user = await db.scalar(stmt)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    valid, new_hash = await security.password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    if new_hash:
+        # Hash parameters changed since this password was stored
+        async with SessionLocal() as session:
+            await session.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+            await session.commit()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id, tenant_id=user.tenant_id, expires_delta=access_token_expires
+            user.id, tenant_id=user.tenant_id, expires_delta=access_token_expires, role=user.role
         ),
         "token_type": "bearer",
     }
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from pydantic import BaseModel
 
 class GoogleToken(BaseModel):
@@ -46,11 +52,14 @@ class GoogleToken(BaseModel):
 @router.post("/login/google", response_model=Token)
 async def login_google(
     token_data: GoogleToken,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Any:
     """
     Verify Google access token and return a JWT access token
     """
+    # Only Google sign-in needs requests; keep it off the import path
+    import requests
+
     try:
         # Fetch user info from Google using the access token
         user_info_res = requests.get(
@@ -77,25 +86,26 @@ async def login_google(
             org_name = f"{full_name or email}'s Org"
             
             tenant = Tenant(id=tenant_id, name=org_name, license_tier="free")
-            db.add(tenant)
-            await db.flush() # Ensure tenant is inserted before user
+            async with SessionLocal() as session:
+                session.add(tenant)
+                await session.flush() # Ensure tenant is inserted before user
 
-            # 2. Auto-register Google user
-            user = User(
-                email=email,
-                full_name=full_name,
-                hashed_password="google-auth-no-password", # Dummy
-                is_active=True,
-                tenant_id=tenant_id
-            )
-            db.add(user)
-            await db.commit()
-            await db.refresh(user)
+                # 2. Auto-register Google user
+                user = User(
+                    email=email,
+                    full_name=full_name,
+                    hashed_password="google-auth-no-password", # Dummy
+                    is_active=True,
+                    tenant_id=tenant_id
+                )
+                session.add(user)
+                await session.commit()
+                await session.refresh(user)
 
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         return {
             "access_token": security.create_access_token(
-                user.id, tenant_id=user.tenant_id, expires_delta=access_token_expires
+                user.id, tenant_id=user.tenant_id, expires_delta=access_token_expires, role=user.role
             ),
             "token_type": "bearer",
         }
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.middleware.tenant import get_current_tenant_id
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.services.reliability import reliability_service
-from app.schemas.reliability import TelemetryIngest
-from typing import Any
+from app.schemas.reliability import (
+    TelemetryIngest, TelemetryBatchIngest, TelemetryBatchResponse, TelemetryHistory,
+    RULForecastRequest, RULForecastResponse,
+)
+from app.services.history import history_store
+from typing import Optional
 
 router = APIRouter()
 
+def _utc_timestamp(value: datetime) -> float:
+    # Naive values are UTC, as for reading timestamps; .timestamp() would take local time
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
 @router.post("/ingest/{asset_id}")
 async def ingest_telemetry(
     asset_id: str,
@@ -18,11 +31,70 @@ async def ingest_telemetry(
     """
     Primary endpoint for industrial telemetry streams.
     Enforces multi-tenancy and triggers the reliability engine.
+    Returns the asset's updated snapshot; current_rul is in hours.
     """
     try:
         result = await reliability_service.ingest_telemetry(
-            db, tenant_id, asset_id, data.model_dump()
+            db, tenant_id, asset_id, data.model_dump(mode="json")
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return result
+
+@router.post("/ingest", response_model=TelemetryBatchResponse)
+async def ingest_telemetry_batch(
+    data: TelemetryBatchIngest,
+    db: AsyncSession = Depends(get_db),
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    Batch endpoint for gateways pushing many readings for many assets at once.
+    Runs the reliability pipeline vectorized and commits in a single transaction.
+    Readings for unknown assets, or assets of another tenant, are rejected one by one.
+    """
+    try:
+        return await reliability_service.ingest_batch(
+            db, tenant_id, [reading.model_dump(mode="json") for reading in data.readings]
         )
-        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/history/{asset_id}", response_model=TelemetryHistory)
+async def get_telemetry_history(
+    asset_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    points: int = Query(1000, ge=2, le=10000),
+    method: str = Query("minmax", pattern="^(minmax|lttb)$"),
+    field: str = Query("damage", pattern="^(load|temp|damage|rul)$"),
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    Damage/RUL/load/temp history for an asset, downsampled server-side to at most
+    `points` samples. Defaults to the last 24 hours; times without a zone are UTC.
+    """
+    end_ts = _utc_timestamp(end) if end else time.time()
+    start_ts = _utc_timestamp(start) if start else end_ts - 86400
+    if start_ts >= end_ts:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    series = await run_in_threadpool(
+        history_store.query, tenant_id, asset_id, start_ts, end_ts, points, method, field
+    )
+    return TelemetryHistory(asset_id=asset_id, start=start_ts, end=end_ts, method=method, series=series)
+
+@router.post("/forecast", response_model=RULForecastResponse)
+async def forecast_rul(
+    data: RULForecastRequest,
+    db: AsyncSession = Depends(get_read_db),
+    tenant_id: str = Depends(get_current_tenant_id)
+):
+    """
+    Probabilistic RUL (P10/P50/P90, hours) from Monte Carlo simulation of future
+    load and environment trajectories. Results are reproducible for a given seed.
+    Answers 429 while too many forecasts are already running.
+    """
+    forecasts = await reliability_service.forecast_rul(db, tenant_id, data.asset_ids, data.scenarios, data.seed)
+    return RULForecastResponse(scenarios=data.scenarios, forecasts=forecasts)
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.api.middleware.tenant import RoleChecker
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_read_db
 from app.db.models import Tenant
 from pydantic import BaseModel
 from typing import List
@@ -23,7 +23,7 @@ class TenantOut(BaseModel):
 @router.post("/", response_model=TenantOut, dependencies=[Depends(is_admin)])
 async def create_tenant(
     tenant_in: TenantCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Create a new tenant. Restricted to Super Admins.
@@ -34,13 +34,14 @@ async def create_tenant(
         raise HTTPException(status_code=400, detail="Tenant ID already exists")
     
     tenant = Tenant(**tenant_in.model_dump())
-    db.add(tenant)
-    await db.commit()
-    await db.refresh(tenant)
+    async with SessionLocal() as session:
+        session.add(tenant)
+        await session.commit()
+        await session.refresh(tenant)
     return tenant
 
 @router.get("/", response_model=List[TenantOut], dependencies=[Depends(is_admin)])
-async def list_tenants(db: AsyncSession = Depends(get_db)):
+async def list_tenants(db: AsyncSession = Depends(get_read_db)):
     """
     List all tenants.
     """
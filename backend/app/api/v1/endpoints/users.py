@@ -7,9 +7,11 @@ from pydantic.networks import EmailStr
 
 from app.api.v1.endpoints import login
 from app.core import security
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_read_db
 from app.db.models import User, Tenant
 from app.schemas import user as user_schema
+from app.services.user_cache import user_cache
+from app.utils.logging import audit_logger
 import uuid
 
 from app.api import deps
@@ -28,7 +30,6 @@ async def read_user_me(
 @router.put("/role", response_model=user_schema.User)
 async def update_user_role(
     *,
-    db: AsyncSession = Depends(get_db),
     role: str = Body(..., embed=True),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -38,19 +39,25 @@ async def update_user_role(
     if role not in ["viewer", "engineer", "admin"]:
         raise HTTPException(status_code=400, detail="Invalid role")
     
-    current_user.role = role
-    await db.commit()
-    await db.refresh(current_user)
-    return current_user
+    # current_user is the shared cached instance; modify a copy owned by this session
+    async with SessionLocal() as session:
+        user = await session.get(User, current_user.id)
+        user.role = role
+        await session.commit()
+        await session.refresh(user)
+    await user_cache.invalidate(user.id)
+    audit_logger.info(f"User {user.id} ({user.email}) role changed to {role}")
+    return user
 
 @router.post("/", response_model=user_schema.User)
 async def create_user(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user_in: user_schema.UserCreate,
 ) -> Any:
     """
-    Create new user with a default tenant.
+    Create new user with a default tenant. The password is hashed before the
+    write transaction opens, so the writer is held only for the inserts.
     """
     try:
         # 1. Check if user exists
@@ -67,7 +74,6 @@ async def create_user(
         org_name = f"{user_in.full_name or user_in.email}'s Org"
         
         tenant = Tenant(id=tenant_id, name=org_name, license_tier="free")
-        db.add(tenant)
         
         # 3. Create User
         from loguru import logger
@@ -76,16 +82,20 @@ async def create_user(
         user = User(
             email=user_in.email,
             full_name=user_in.full_name,
-            hashed_password=security.get_password_hash(user_in.password),
+            hashed_password=await security.password_hasher.hash(user_in.password),
             is_active=True,
             tenant_id=tenant_id
         )
-        db.add(user)
         
-        await db.commit()
-        await db.refresh(user)
+        async with SessionLocal() as session:
+            session.add(tenant)
+            session.add(user)
+            await session.commit()
+            await session.refresh(user)
         
         return user
+    except HTTPException:
+        raise
     except Exception as e:
         from loguru import logger
         import traceback
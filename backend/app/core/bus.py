@@ -1,38 +1,218 @@
+import asyncio
 import json
-from confluent_kafka import Producer, Consumer
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 from app.core.config import settings
+from app.utils.metrics import EVENT_QUEUE_DEPTH, EVENT_DELIVERY_LATENCY, EVENT_DELIVERY_FAILED, EVENT_DROPPED, KAFKA_CALL_SECONDS
 from loguru import logger
 
-class EventBus:
+class JSONSerializer:
+    content_type = "application/json"
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode('utf-8')
+
+    def loads(self, payload: bytes) -> dict:
+        return json.loads(payload)
+
+class MsgpackSerializer:
+    content_type = "application/msgpack"
+
     def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise RuntimeError("EVENT_SERIALIZER=msgpack requires the 'msgpack' package") from e
+        self._msgpack = msgpack
+
+    def dumps(self, data: dict) -> bytes:
+        return self._msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, payload: bytes) -> dict:
+        return self._msgpack.unpackb(payload, raw=False)
+
+SERIALIZERS = {
+    "json": JSONSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+def get_serializer(name: str):
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown event serializer '{name}'")
+    return SERIALIZERS[name]()
+
+class BaseBus(ABC):
+    """
+    Publisher interface shared by the Kafka and in-process backends.
+    """
+    def __init__(self, serializer=None):
+        self.serializer = serializer or get_serializer(settings.EVENT_SERIALIZER)
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    def emit(self, topic: str, key: str, data: dict):
+        """
+        Publishes one event to `topic`, partitioned by `key`.
+        """
+        pass
+
+    def emit_state(self, tenant_id: str, asset_id: str, damage: float, rul: float, confidence: float):
+        """
+        Publishes the asset's new damage/RUL according to EVENT_STATE_MODE:
+        'separate' (damage.updated + rul.recalculated), 'combined' (asset.state) or 'both'.
+        """
+        mode = settings.EVENT_STATE_MODE
+        if mode in ("combined", "both"):
+            self.emit("asset.state", key=asset_id, data={
+                "tenant_id": tenant_id, "asset_id": asset_id,
+                "damage": damage, "rul": rul, "confidence": confidence,
+            })
+        if mode in ("separate", "both"):
+            self.emit("damage.updated", key=asset_id, data={"tenant_id": tenant_id, "damage": damage})
+            self.emit("rul.recalculated", key=asset_id, data={"tenant_id": tenant_id, "rul": rul})
+
+    async def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        interval = settings.EVENT_BUS_POLL_INTERVAL_MS / 1000
+        while True:
+            self.poll()
+            await asyncio.sleep(interval)
+
+    def poll(self):
+        pass
+
+    async def flush(self):
+        pass
+
+class EventBus(BaseBus):
+    """
+    Kafka publisher. confluent_kafka is imported and the producer built on
+    start() or the first emit, not at import, so importing the app stays cheap
+    and an unreachable broker never delays it.
+    """
+    def __init__(self, serializer=None):
+        super().__init__(serializer)
         self.producer = None
+        self._connect_attempted = False
+        self._headers = [("content-type", self.serializer.content_type.encode())]
+
+    def _connect(self):
+        # Attempted once per process: if it fails the bus stays disabled
+        self._connect_attempted = True
         try:
+            from confluent_kafka import Producer
             self.producer = Producer({
                 'bootstrap.servers': settings.KAFKA_BOOTSTRAP_SERVERS,
-                'client.id': 'forsee-backend'
+                'client.id': 'forsee-backend',
+                'linger.ms': settings.KAFKA_LINGER_MS,
+                'batch.size': settings.KAFKA_BATCH_SIZE,
+                'batch.num.messages': settings.KAFKA_BATCH_NUM_MESSAGES,
+                'compression.type': settings.KAFKA_COMPRESSION,
+                'queue.buffering.max.messages': settings.KAFKA_QUEUE_MAX_MESSAGES,
             })
         except Exception as e:
             logger.warning(f"Kafka connection failed, EventBus disabled: {e}")
 
+    async def start(self):
+        if not self._connect_attempted:
+            self._connect()
+        await super().start()
+
     def emit(self, topic: str, key: str, data: dict):
         if not self.producer:
-            return
+            if self._connect_attempted:
+                return
+            self._connect()
+            if not self.producer:
+                return
 
+        start = time.perf_counter()
         try:
             self.producer.produce(
                 topic,
                 key=key,
-                value=json.dumps(data).encode('utf-8'),
-                callback=self._delivery_report
+                value=self.serializer.dumps(data),
+                headers=self._headers,
+                on_delivery=self._delivery_report
             )
+        except BufferError:
+            # Local queue full: serve delivery callbacks once and retry
             self.producer.poll(0)
+            try:
+                self.producer.produce(
+                    topic, key=key, value=self.serializer.dumps(data),
+                    headers=self._headers, on_delivery=self._delivery_report
+                )
+            except BufferError:
+                EVENT_DROPPED.inc()
         except Exception as e:
             logger.error(f"Failed to emit event to {topic}: {e}")
+        KAFKA_CALL_SECONDS.labels(call="produce").observe(time.perf_counter() - start)
+
+    def poll(self):
+        if self.producer:
+            with KAFKA_CALL_SECONDS.labels(call="poll").time():
+                self.producer.poll(0)
+            EVENT_QUEUE_DEPTH.set(len(self.producer))
+
+    async def flush(self):
+        if self.producer:
+            loop = asyncio.get_running_loop()
+            with KAFKA_CALL_SECONDS.labels(call="flush").time():
+                remaining = await loop.run_in_executor(None, self.producer.flush, settings.KAFKA_FLUSH_TIMEOUT)
+            if remaining:
+                logger.warning(f"{remaining} events still undelivered after flush")
 
     def _delivery_report(self, err, msg):
         if err is not None:
+            EVENT_DELIVERY_FAILED.inc()
             logger.error(f"Message delivery failed: {err}")
         else:
-            logger.debug(f"Message delivered to {msg.topic()} [{msg.partition()}]")
+            latency = msg.latency()
+            if latency is not None:
+                EVENT_DELIVERY_LATENCY.observe(latency)
+
+class InMemoryBus(BaseBus):
+    """
+    Broker-less bus with the EventBus interface, for benchmarks and tests.
+    Keeps the last EVENT_MEMORY_RETENTION serialized events per topic and
+    invokes in-process subscribers synchronously.
+    """
+    def __init__(self, serializer=None):
+        super().__init__(serializer)
+        self.events: Dict[str, Deque[Tuple[str, bytes]]] = defaultdict(
+            lambda: deque(maxlen=settings.EVENT_MEMORY_RETENTION)
+        )
+        self.subscribers: Dict[str, List[Callable[[str, dict], None]]] = defaultdict(list)
+
+    def subscribe(self, topic: str, callback: Callable[[str, dict], None]):
+        self.subscribers[topic].append(callback)
+
+    def emit(self, topic: str, key: str, data: dict):
+        start = time.perf_counter()
+        self.events[topic].append((key, self.serializer.dumps(data)))
+        for callback in self.subscribers.get(topic, ()):
+            callback(key, data)
+        EVENT_DELIVERY_LATENCY.observe(time.perf_counter() - start)
+
+def create_bus() -> BaseBus:
+    if settings.EVENT_BUS_BACKEND == "memory":
+        return InMemoryBus()
+    return EventBus()
 
-bus = EventBus()
+bus = create_bus()
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from app.core.config import settings
+from app.utils.metrics import STATE_CACHE_FLUSH_SIZE, STATE_CACHE_FLUSH_LATENCY, STATE_CACHE_DROPPED, REDIS_CALL_SECONDS
+from loguru import logger
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_CALL_SECONDS.labels(command="PIPELINE").observe(time.perf_counter() - start)
+
+class InstrumentedRedis(Redis):
+    """
+    Redis client that records every round trip in REDIS_CALL_SECONDS, labelled
+    by command name (pipelines as a whole).
+    """
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_CALL_SECONDS.labels(command=str(args[0]).upper()).observe(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+class StateCache:
+    """
+    Write-coalescing Redis cache for live asset state.
+    Updates are buffered per key (latest wins) and flushed in pipelines by a
+    background task, so callers never wait on a Redis round trip.
+    """
+    def __init__(self):
+        self.pool: Optional[ConnectionPool] = None
+        self.client: Optional[Redis] = None
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, key: str, mapping: Dict[str, str]):
+        """
+        Queues a hash update. Never blocks; drops the update if the buffer is full.
+        """
+        if key not in self._pending and len(self._pending) >= settings.STATE_CACHE_MAX_PENDING:
+            STATE_CACHE_DROPPED.inc()
+            return
+        self._pending[key] = mapping
+        if len(self._pending) >= settings.STATE_CACHE_FLUSH_SIZE:
+            self._wakeup.set()
+
+    async def start(self):
+        if self._task:
+            return
+        self.pool = ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+        self.client = InstrumentedRedis(connection_pool=self.pool)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        await self.client.aclose()
+        await self.pool.disconnect()
+
+    async def _run(self):
+        interval = settings.STATE_CACHE_FLUSH_INTERVAL_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending or not self.client:
+            return
+        batch, self._pending = self._pending, {}
+
+        start = time.perf_counter()
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, mapping in batch.items():
+                    pipe.hset(key, mapping=mapping)
+                await pipe.execute()
+        except Exception as e:
+            STATE_CACHE_DROPPED.inc(len(batch))
+            logger.warning(f"State cache flush of {len(batch)} keys failed: {e}")
+            return
+        STATE_CACHE_FLUSH_SIZE.observe(len(batch))
+        STATE_CACHE_FLUSH_LATENCY.observe(time.perf_counter() - start)
+
+state_cache = StateCache()
@@ -35,12 +35,134 @@ class Settings(BaseSettings):
             self.DATABASE_URL = f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
         return self
 
+    # Database engine profile: "auto" (from the DATABASE_URL dialect), "postgres", "sqlite" or "default"
+    DB_PROFILE: str = "auto"
+    DB_POOL_SIZE: int = 10 # PostgreSQL connections kept open per process
+    DB_MAX_OVERFLOW: int = 10 # extra connections under bursts (PostgreSQL, SQLite read pool)
+    DB_POOL_TIMEOUT: float = 30.0 # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800 # seconds before a PostgreSQL connection is replaced
+    DB_QUERY_CACHE_SIZE: int = 1000 # compiled SQL statements cached per engine
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256 # asyncpg prepared statements per connection; 0 behind PgBouncer transaction pooling
+    DB_STREAM_BATCH_SIZE: int = 1000 # rows per fetch when large reads stream through a server-side cursor
+    DB_SQLITE_READ_POOL_SIZE: int = 4 # query-only connections beside the single writer
+    DB_SQLITE_MMAP_SIZE: int = 268435456 # bytes of the database file memory-mapped (256 MB)
+    DB_SQLITE_BUSY_TIMEOUT: float = 10.0 # seconds a writer waits for another process's write lock
+
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_DB: int
+    REDIS_MAX_CONNECTIONS: int = 20
+
+    # Logging
+    LOG_LEVEL: str = "INFO" # console sink
+    LOG_FILE_LEVEL: str = "INFO" # JSON hot-path log; DEBUG serializes every damage increment
+    LOG_ENQUEUE: bool = True # sinks format and write on a background thread
+    LOG_RETENTION: str = "3 days" # hot-path log (requests, engine events)
+    LOG_AUDIT_RETENTION: str = "1 year" # audit log: warnings, errors and audit_logger records
+    LOG_ENGINE_EVENT_INTERVAL: float = 60.0 # min seconds between events per engine and asset; 0 logs every event
+
+    # Request timing (per-route histograms, Server-Timing header)
+    SLOW_REQUEST_THRESHOLD_MS: float = 1000.0 # 0 disables slow-request logging
+    SLOW_REQUEST_SAMPLE_RATE: float = 1.0 # fraction of slow requests logged with their phase breakdown
+
+    # Coalesced asset-state writes to Redis
+    STATE_CACHE_FLUSH_INTERVAL_MS: int = 50
+    STATE_CACHE_FLUSH_SIZE: int = 500
+    STATE_CACHE_MAX_PENDING: int = 50000
+
+    # TelemetrySnapshot persistence: "write_through" or "write_behind". Write-behind
+    # keeps each asset's live state in the memory of one process: only use it when a
+    # single process ingests every asset (one API worker, or only the Kafka ingest
+    # workers, which split assets by partition and checkpoint and drop an asset's
+    # state when its partition is revoked), never with `uvicorn --workers N`.
+    SNAPSHOT_WRITE_MODE: str = "write_through"
+    SNAPSHOT_CHECKPOINT_INTERVAL: float = 5.0
+
+    # Background AuditLog writer
+    AUDIT_SINK_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_LINGER_MS: int = 200
+    AUDIT_ENQUEUE_TIMEOUT_MS: int = 50
+    AUDIT_ENQUEUE_DEADLINE_MS: int = 5000 # Rare actions wait this long for queue room, then fail the request
+    AUDIT_RETRY_BACKOFF: float = 1.0 # Seconds before retrying a failed flush, doubling up to 30s
+    AUDIT_TELEMETRY_SAMPLE_RATE: float = 1.0 # Fraction of telemetry_processed entries kept
+
+    # Per-asset reliability config cache (local LRU -> Redis -> DB)
+    CONFIG_CACHE_TTL: float = 60.0
+    CONFIG_CACHE_SIZE: int = 200000
+    CONFIG_REDIS_TTL: int = 3600
+
+    # Password hashing (pbkdf2_sha256) on a bounded thread pool
+    PASSWORD_HASH_ROUNDS: int = 29000 # changing this rehashes each user's password at next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32 # hashes allowed to wait for a worker before answering 429
+
+    # Authenticated-user cache (token claims are trusted until a role/status change)
+    USER_CACHE_TTL: float = 30.0
+    USER_CACHE_SIZE: int = 10000
+
+    # Incrementally maintained dashboard aggregates
+    DASHBOARD_FLUSH_INTERVAL: float = 1.0
+    DASHBOARD_ACTIVE_WINDOW: int = 300 # seconds since last heartbeat for a device to count as active
+    DASHBOARD_RECONCILE_INTERVAL: float = 300.0 # 0 disables the reconciliation job
+
+    # Fleet health export for Prometheus (bulk aggregates, no per-asset series)
+    FLEET_EXPORT_INTERVAL: float = 60.0 # 0 disables the export
+    FLEET_EXPORT_TOP_K: int = 10 # lowest-RUL assets exported per tenant
+    FLEET_EXPORT_MAX_SERIES: int = 10000
+
+    # Live asset-state push feed (WebSocket / SSE)
+    LIVE_FEED_FLUSH_INTERVAL_MS: int = 100 # coalescing window for cross-worker Redis publishes
+    LIVE_FEED_HEARTBEAT: float = 15.0 # seconds between keep-alives on idle connections
+    LIVE_FEED_AUTH_TIMEOUT: float = 5.0 # seconds a WebSocket may take to send its auth frame
+    LIVE_FEED_AUTH_RECHECK: float = 30.0 # seconds between token re-checks on open streams
+
+    # Damage-rate estimation for RUL (sliding regression window per asset)
+    RUL_RATE_WINDOW: int = 64
+    RUL_RATE_MAX_ASSETS: int = 200000
+    RUL_RATE_MIN_SPACING: float = 1.0 # seconds; a reading closer than this to the previous point replaces its damage
+
+    # Monte Carlo RUL forecasts
+    MONTE_CARLO_SCENARIOS: int = 1000
+    MONTE_CARLO_STEPS: int = 24 # simulated readings per scenario
+    MONTE_CARLO_STEP_HOURS: float = 1.0 # hours between simulated readings of assets without a measured damage rate
+    MONTE_CARLO_SEED: int = 0
+    MONTE_CARLO_CHUNK_ASSETS: int = 128 # most assets per work unit
+    MONTE_CARLO_CHUNK_CELLS: int = 2000000 # most assets x scenarios x steps per work unit: ~32 bytes each at peak
+    MONTE_CARLO_WORKERS: int = 0 # 0 = one process per CPU
+    MONTE_CARLO_CONCURRENCY: int = 2 # forecasts simulating at once per API process
+    MONTE_CARLO_QUEUE_SIZE: int = 4 # forecasts allowed to wait for a slot before answering 429
+
+    # Append-only telemetry history (memory-mapped day segments)
+    HISTORY_ENABLED: bool = False # needs a persistent volume at HISTORY_DIR
+    HISTORY_DIR: str = "/var/lib/forsee/history"
+    HISTORY_FLUSH_INTERVAL: float = 1.0
+    HISTORY_RETENTION_DAYS: int = 90 # day segments older than this are deleted; 0 keeps everything
+    HISTORY_ROLLUP_CACHE_SIZE: int = 4096 # closed-day rollups kept in memory
 
     KAFKA_BOOTSTRAP_SERVERS: str
     KAFKA_GROUP_ID: str
+    KAFKA_LINGER_MS: int = 20
+    KAFKA_BATCH_SIZE: int = 131072 # bytes per partition batch
+    KAFKA_BATCH_NUM_MESSAGES: int = 10000
+    KAFKA_COMPRESSION: str = "lz4"
+    KAFKA_QUEUE_MAX_MESSAGES: int = 100000
+    KAFKA_FLUSH_TIMEOUT: float = 10.0
+
+    # Kafka ingest worker (scripts/ingest_worker.py)
+    TELEMETRY_TOPIC: str = "telemetry.raw"
+    INGEST_WORKER_BATCH_SIZE: int = 500
+    INGEST_WORKER_BATCH_TIMEOUT: float = 0.5
+    INGEST_WORKER_MAX_ATTEMPTS: int = 5 # a micro-batch failing this many times in a row is skipped
+    INGEST_WORKER_RETRY_BACKOFF: float = 1.0 # seconds before the first retry, doubling up to 30
+
+    # Event publishing
+    EVENT_BUS_BACKEND: str = "kafka" # "kafka" or "memory"
+    EVENT_SERIALIZER: str = "json" # "json" or "msgpack"
+    EVENT_STATE_MODE: str = "separate" # "separate", "combined" (asset.state) or "both"
+    EVENT_BUS_POLL_INTERVAL_MS: int = 100
+    EVENT_MEMORY_RETENTION: int = 10000
 
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
@@ -54,6 +176,18 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_SECRET: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
 
+    # Chatbot
+    CHATBOT_BACKEND: str = "gemini" # "gemini" or "stub" (canned local replies)
+    CHATBOT_MODEL: str = "gemini-flash-latest"
+    CHATBOT_CACHE_TTL: float = 3600.0 # 0 disables answer caching
+    CHATBOT_CACHE_SIZE: int = 1000
+    CHATBOT_HISTORY_TOKEN_BUDGET: int = 1500 # recent turns sent verbatim (estimated tokens)
+    CHATBOT_HISTORY_SUMMARY_TOKENS: int = 200 # one-line digest of the turns trimmed above
+    CHATBOT_FLEET_SUMMARY_ITEMS: int = 5 # lowest-RUL assets / recent violations listed
+    CHATBOT_FLEET_SUMMARY_REFRESH: float = 30.0 # seconds a rendered summary is reused
+    CHATBOT_FLEET_SUMMARY_RELOAD: float = 300.0 # seconds between database reloads of a tenant
+    CHATBOT_FLEET_SUMMARY_IDLE: float = 3600.0 # tenants without a chat for this long stop being tracked
+
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env", extra='ignore')
 
 settings = Settings()
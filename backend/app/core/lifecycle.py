@@ -0,0 +1,21 @@
+from app.core.bus import bus
+from app.core.cache import state_cache
+from app.services.audit import audit_sink
+from app.services.config_cache import config_cache
+from app.services.dashboard import dashboard_aggregates
+from app.services.history import history_store
+from app.services.live_feed import live_feed
+from app.services.snapshot_store import snapshot_store
+from app.services.user_cache import user_cache
+
+# Background services shared by the API and the ingest worker.
+# Started in order, stopped in reverse so producers drain before their sinks.
+BACKGROUND_SERVICES = [state_cache, user_cache, config_cache, snapshot_store, dashboard_aggregates, audit_sink, history_store, live_feed, bus]
+
+async def start_background_services():
+    for service in BACKGROUND_SERVICES:
+        await service.start()
+
+async def stop_background_services():
+    for service in reversed(BACKGROUND_SERVICES):
+        await service.stop()
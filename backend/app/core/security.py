@@ -1,22 +1,40 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Callable, Optional, Tuple, Union
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
+from passlib.exc import UnknownHashError
 from app.core.config import settings
+from app.utils.metrics import PASSWORD_HASH_SECONDS, PASSWORD_HASH_REJECTED
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# min = max = default, so hashes made with other rounds are flagged for rehash
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
-def create_access_token(subject: Union[str, Any], tenant_id: str, expires_delta: timedelta = None) -> str:
+def create_access_token(subject: Union[str, Any], tenant_id: str, expires_delta: timedelta = None, role: str = None) -> str:
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {
         "exp": expire,
+        "iat": now,
         "sub": str(subject),
         "tenant_id": tenant_id
     }
+    if role:
+        # Lets role checks skip the user lookup; see UserCache.is_stale for revocation
+        to_encode["role"] = role
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -25,3 +43,58 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+class PasswordHasher:
+    """
+    Runs password hashing off the event loop on a small dedicated thread pool
+    (hashlib releases the GIL, so the loop keeps serving ingest meanwhile).
+
+    At most PASSWORD_HASH_WORKERS hashes run at once and PASSWORD_HASH_QUEUE_SIZE
+    wait; beyond that callers get an immediate 429 instead of queueing behind a
+    login burst.
+    """
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._admitted = 0
+
+    async def _run(self, operation: str, fn: Callable, *args) -> Any:
+        if self._admitted >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE:
+            PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent sign-ins, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+        self._admitted += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._admitted -= 1
+            PASSWORD_HASH_SECONDS.labels(operation=operation).observe(time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns (valid, new_hash); new_hash is set when the stored hash uses
+        outdated parameters and should be replaced.
+        """
+        return await self._run("verify", _verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except UnknownHashError:
+        # Accounts without a usable password (e.g. Google sign-in)
+        return False, None
+
+password_hasher = PasswordHasher()
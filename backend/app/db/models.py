@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, ForeignKey, JSON, Integer, Boolean
+from sqlalchemy import Column, String, Float, ForeignKey, JSON, Integer, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base, MultiTenantBase
 
@@ -10,6 +10,12 @@ class Tenant(Base):
     assets = relationship("Asset", back_populates="tenant", cascade="all, delete-orphan")
 
 class Asset(MultiTenantBase):
+    __table_args__ = (
+        # Tenant asset list in id order (keyset pagination) and per-type lookups
+        Index("ix_asset_tenant_id_id", "tenant_id", "id"),
+        Index("ix_asset_tenant_id_type_id", "tenant_id", "type", "id"),
+    )
+
     id = Column(String, primary_key=True, index=True)
     name = Column(String, nullable=False)
     type = Column(String) # e.g., "Pump", "Compressor", "Turbine"
@@ -21,6 +27,13 @@ class Asset(MultiTenantBase):
 
 class TelemetrySnapshot(MultiTenantBase):
     __tablename__ = "telemetry_snapshot"
+    __table_args__ = (
+        # Covers the dashboard's per-tenant damage aggregates
+        Index("ix_telemetry_snapshot_tenant_id_current_damage", "tenant_id", "current_damage"),
+        # Covers the per-tenant RUL scan (chatbot fleet summary)
+        Index("ix_telemetry_snapshot_tenant_id_current_rul", "tenant_id", "current_rul", "asset_id"),
+    )
+
     asset_id = Column(String, ForeignKey("asset.id"), primary_key=True)
     current_load = Column(Float, default=0.0)
     current_temp = Column(Float, default=0.0)
@@ -42,6 +55,15 @@ class User(MultiTenantBase):
     tenant = relationship("Tenant")
 
 class AuditLog(MultiTenantBase):
+    __table_args__ = (
+        # Audit trail of one entity, in time order
+        Index("ix_auditlog_tenant_id_entity_id_created_at", "tenant_id", "entity_id", "created_at"),
+        # Latest entries of one action (e.g. load violations), newest first
+        Index("ix_auditlog_tenant_id_action_id", "tenant_id", "action", "id"),
+        # Time-range exports and retention
+        Index("ix_auditlog_created_at", "created_at"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     entity_type = Column(String, nullable=False) # e.g., "Asset", "RUL"
     entity_id = Column(String, nullable=False)
@@ -49,3 +71,20 @@ class AuditLog(MultiTenantBase):
     old_value = Column(JSON)
     new_value = Column(JSON)
     metadata_info = Column(JSON) # e.g., source_engine, env_data
+
+class ReliabilityConfig(MultiTenantBase):
+    __tablename__ = "reliability_config"
+    __table_args__ = (UniqueConstraint("tenant_id", "scope", "scope_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False) # "asset" or "asset_type"
+    scope_key = Column(String, nullable=False) # asset id or asset type
+    # Shift engine
+    threshold_load = Column(Float)
+    penalty_weight = Column(Float)
+    # Environmental engine
+    ambient_ref_temp = Column(Float)
+    temp_coefficient = Column(Float)
+    humidity_threshold = Column(Float)
+    humidity_coefficient = Column(Float)
+    max_aging_factor = Column(Float)
@@ -1,21 +1,217 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.utils.metrics import DB_POOL_CAPACITY, DB_POOL_CHECKOUT_SECONDS, DB_POOL_IN_USE, DB_POOL_TIMEOUTS, DB_POOL_WAITING
+from app.utils.timing import current_timings, record
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False,
-)
+def _instrument_pool(sync_engine, pool: str, capacity: int):
+    # Every Connection goes through raw_connection(): time the pool checkout
+    # there (queueing for a free slot and opening new connections included).
+    # Patched on the engine, not the pool, so it survives dispose().
+    raw_connection = sync_engine.raw_connection
+    checkout_seconds = DB_POOL_CHECKOUT_SECONDS.labels(pool=pool)
+    waiting = DB_POOL_WAITING.labels(pool=pool)
+    in_use = DB_POOL_IN_USE.labels(pool=pool)
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        waiting.inc()
+        try:
+            return raw_connection()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(pool=pool).inc()
+            raise
+        finally:
+            waiting.dec()
+            elapsed = time.perf_counter() - start
+            checkout_seconds.observe(elapsed)
+            record("db", elapsed)
+
+    sync_engine.raw_connection = timed_raw_connection
+    event.listen(sync_engine, "checkout", lambda *args: in_use.inc())
+    event.listen(sync_engine, "checkin", lambda *args: in_use.dec())
+    DB_POOL_CAPACITY.labels(pool=pool).set(capacity)
+
+def _instrument_queries(sync_engine):
+    # Statement time for the request's "db" phase (Server-Timing). The async
+    # driver runs these hooks in a greenlet that shares the request's context.
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and current_timings.get() is not None:
+            context._forsee_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_forsee_started", None)
+        if started is not None:
+            record("db", time.perf_counter() - started)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+def _create(pool: str, url: str, pool_size: int = 0, max_overflow: int = 0, **kwargs: Any) -> AsyncEngine:
+    """
+    Instrumented engine. pool_size 0 keeps the dialect's default pool, whose
+    capacity is then reported as 0 (unbounded or not configured here).
+    """
+    if pool_size:
+        kwargs.update(pool_size=pool_size, max_overflow=max_overflow)
+    new_engine = create_async_engine(url, echo=False, **kwargs)
+    _instrument_pool(new_engine.sync_engine, pool, pool_size + max_overflow if pool_size else 0)
+    _instrument_queries(new_engine.sync_engine)
+    return new_engine
+
+def _sqlite_pragmas(sync_engine, query_only: bool):
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL: readers never block the writer nor each other
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # Durable at checkpoints rather than every commit; WAL keeps the file consistent
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.DB_SQLITE_MMAP_SIZE)}")
+        # Writers of other processes (uvicorn workers, ingest worker) wait instead of failing
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.DB_SQLITE_BUSY_TIMEOUT * 1000)}")
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+def default_profile(url: str) -> Dict[str, AsyncEngine]:
+    """
+    SQLAlchemy's defaults, as before engine profiles existed.
+    """
+    return {"primary": _create("primary", url, pool_pre_ping=True)}
+
+def postgres_profile(url: str) -> Dict[str, AsyncEngine]:
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        connect_args = {
+            # SQLAlchemy's per-connection cache of asyncpg prepared statements, and
+            # asyncpg's own; both must be 0 behind PgBouncer transaction pooling
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    return {"primary": _create(
+        "primary", url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=connect_args,
+    )}
 
+def sqlite_profile(url: str) -> Dict[str, AsyncEngine]:
+    """
+    One writer connection per process, so this process's writers queue in the
+    pool instead of failing with "database is locked", plus a pool of
+    query-only readers, which WAL lets run alongside the writer.
+    An in-memory database cannot be shared across connections: writer only.
+    """
+    common = dict(
+        poolclass=AsyncAdaptedQueuePool,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    )
+    in_memory = make_url(url).database in (None, "", ":memory:")
+    writer = _create("primary", url, pool_size=1, max_overflow=0, **common)
+    _sqlite_pragmas(writer.sync_engine, query_only=False)
+    engines = {"primary": writer}
+    if not in_memory:
+        reader = _create("read", url, pool_size=settings.DB_SQLITE_READ_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW, **common)
+        _sqlite_pragmas(reader.sync_engine, query_only=True)
+        engines["read"] = reader
+    return engines
+
+ENGINE_PROFILES = {
+    "default": default_profile,
+    "postgres": postgres_profile,
+    "sqlite": sqlite_profile,
+}
+
+def create_engines(url: str, profile: str = "auto") -> Dict[str, AsyncEngine]:
+    """
+    Engines for the DB_PROFILE: always "primary", plus "read" when the profile
+    has a separate read pool. "auto" picks the profile from the URL's dialect.
+    """
+    if profile == "auto":
+        if url.startswith("sqlite"):
+            profile = "sqlite"
+        elif url.startswith("postgresql"):
+            profile = "postgres"
+        else:
+            profile = "default"
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'")
+    return ENGINE_PROFILES[profile](url)
+
+engines = create_engines(settings.DATABASE_URL, settings.DB_PROFILE)
+engine = engines["primary"]
+read_engine: Optional[AsyncEngine] = engines.get("read")
+
+class RoutingSession(Session):
+    """
+    Read-only sessions (ReadSessionLocal, get_read_db) run on the read pool;
+    every other session stays on the writer for its whole transaction, so
+    read-modify-write paths such as ingest never work from a stale read.
+    """
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("read_only"):
+            return read_engine.sync_engine
+        return engine.sync_engine
+
+# Writing sessions. Under the SQLite profile the writer is one connection per
+# process, held from a session's first statement until commit, rollback or
+# close: do reads that may lead to a write on ReadSessionLocal, and keep awaits
+# on unrelated work (hashing, Redis, HTTP) outside the writing transaction.
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession if read_engine is not None else Session,
     expire_on_commit=False,
 )
 
+# For endpoints and jobs that only read; the same as SessionLocal without a read pool
+ReadSessionLocal = SessionLocal
+if read_engine is not None:
+    ReadSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=read_engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info={"read_only": True},
+    )
+
 async def get_db():
+    """
+    Writing session for the request. It holds the writer (SQLite: the only one
+    in the process) until the request ends, so endpoints that mostly read take
+    get_read_db and open a short SessionLocal() transaction for the write.
+    """
     async with SessionLocal() as session:
         yield session
+
+async def get_read_db():
+    """
+    Session for read-only endpoints: served by the read pool when the profile has one.
+    """
+    async with ReadSessionLocal() as session:
+        yield session
+
+async def stream_rows(db: AsyncSession, stmt) -> AsyncIterator[Any]:
+    """
+    Iterates a large result through a server-side cursor, DB_STREAM_BATCH_SIZE
+    rows at a time, instead of loading every row first.
+    """
+    result = await db.stream(stmt.execution_options(yield_per=settings.DB_STREAM_BATCH_SIZE))
+    async for partition in result.partitions():
+        for row in partition:
+            yield row
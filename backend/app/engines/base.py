@@ -1,19 +1,96 @@
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import numpy as np
+from app.core.config import settings
+from app.utils.logging import engine_event_sampler, level_enabled
+from app.utils.metrics import ENGINE_LOG_SUPPRESSED, ENGINE_SECONDS
+from app.utils.timing import record
 from loguru import logger
 
+# Columnar telemetry fields and the defaults applied when a reading omits them
+TELEMETRY_DEFAULTS: Dict[str, float] = {
+    "load": 0.0,
+    "temp": 0.0,
+    "ambient_temp": 25.0,
+    "humidity": 50.0,
+    "base_damage_factor": 0.0001,
+}
+
+def to_columns(records: List[Dict[str, Any]], fields: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Converts row-oriented telemetry dicts into float64 columns.
+    Missing or None values fall back to TELEMETRY_DEFAULTS.
+    """
+    columns = {}
+    for field in fields or TELEMETRY_DEFAULTS:
+        default = TELEMETRY_DEFAULTS.get(field, 0.0)
+        columns[field] = np.fromiter(
+            (default if (value := row.get(field)) is None else value for row in records),
+            dtype=np.float64,
+            count=len(records),
+        )
+    return columns
+
+def _timed(method: Callable, engine: str) -> Callable:
+    histogram = ENGINE_SECONDS.labels(engine=engine)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            histogram.observe(elapsed)
+            record("engine", elapsed)
+    return wrapper
+
 class BaseEngine(ABC):
     def __init__(self, name: str):
         self.name = name
 
+    def __init_subclass__(cls, **kwargs):
+        # Every engine's process_batch (and so its scalar process) is timed per engine class
+        super().__init_subclass__(**kwargs)
+        if "process_batch" in cls.__dict__:
+            cls.process_batch = _timed(cls.__dict__["process_batch"], cls.__name__)
+
     @abstractmethod
+    def process_batch(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Vectorized processing over a batch of readings.
+        'columns' maps field names to equally sized float64 arrays.
+        'context' holds parameters, either scalars or arrays broadcastable to the batch.
+        The scalar 'process' of every engine is a thin wrapper over this method.
+        """
+        pass
+
     async def process(self, data: Dict[str, Any], context: Dict[str, Any]) -> Any:
         """
         Main processing loop for the engine.
         'data' usually contains telemetry or previous engine output.
         'context' contains tenant_id and asset_id.
         """
-        pass
+        return self.process_batch(to_columns([data]), context)
 
-    def log_event(self, asset_id: str, message: str, level: str = "INFO"):
-        logger.opt(depth=1).log(level, f"[{self.name}] Asset {asset_id}: {message}")
+    def log_event(self, asset_id: str, message: str, *args: Any, level: str = "INFO"):
+        """
+        Logs an engine event. `message` is a str.format template filled from
+        `args` only if the event is emitted: nothing is formatted below the
+        configured level, and each (engine, asset) logs at most one event per
+        LOG_ENGINE_EVENT_INTERVAL seconds, noting how many were suppressed.
+        """
+        if not level_enabled(level):
+            return
+        suppressed = 0
+        if settings.LOG_ENGINE_EVENT_INTERVAL > 0:
+            suppressed = engine_event_sampler.admit((self.name, asset_id), settings.LOG_ENGINE_EVENT_INTERVAL)
+            if suppressed is None:
+                ENGINE_LOG_SUPPRESSED.labels(engine=self.name).inc()
+                return
+        if suppressed:
+            logger.opt(depth=1).log(level, "[{}] Asset {}: " + message + " ({} similar events suppressed)", self.name, asset_id, *args, suppressed)
+        else:
+            logger.opt(depth=1).log(level, "[{}] Asset {}: " + message, self.name, asset_id, *args)
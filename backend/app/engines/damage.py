@@ -1,5 +1,6 @@
-from typing import Any, Dict
-from app.engines.base import BaseEngine
+from typing import Any, Dict, Optional
+import numpy as np
+from app.engines.base import BaseEngine, to_columns
 
 class DamageEngine(BaseEngine):
     def __init__(self):
@@ -9,15 +10,24 @@ class DamageEngine(BaseEngine):
         """
         Calculates damage accumulation for a single unit of time (delta).
         """
-        # Linear damage delta (can be expanded to non-linear Palmgren-Miner logic)
-        raw_damage_delta = telemetry.get("base_damage_factor", 0.0001)
-        
-        # Stress-normalized adjustment
-        accumulated_delta = raw_damage_delta * multiplier
+        columns = to_columns([telemetry], ["base_damage_factor"])
+        columns["multiplier"] = np.array([multiplier], dtype=np.float64)
+        accumulated_delta = float(self.process_batch(columns)[0])
         
         self.log_event(
             telemetry.get("asset_id", "unknown"),
-            f"Damage increment: {accumulated_delta:.8f} (M: {multiplier:.2f})"
+            "Damage increment: {:.8f} (M: {:.2f})", accumulated_delta, multiplier
         )
         
         return accumulated_delta
+
+    def process_batch(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Vectorized damage increments.
+        columns: 'base_damage_factor' and the combined stress 'multiplier'.
+        """
+        # Linear damage delta (can be expanded to non-linear Palmgren-Miner logic)
+        raw_damage_delta = columns["base_damage_factor"]
+
+        # Stress-normalized adjustment
+        return raw_damage_delta * columns["multiplier"]
@@ -1,21 +1,33 @@
-from typing import Any, Dict
-from app.engines.base import BaseEngine
+from typing import Any, Dict, Optional
+import numpy as np
+from app.engines.base import BaseEngine, to_columns
 
 class EnvironmentalEngine(BaseEngine):
     def __init__(self):
         super().__init__("EnvironmentalEngine")
 
-    async def process(self, context: Dict[str, Any]) -> float:
+    async def process(self, context: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> float:
         """
         Calculates environmental modifier based on humidity, temperature, etc.
         """
-        temp = context.get("ambient_temp", 25.0)
-        humidity = context.get("humidity", 50.0)
-        
+        return float(self.process_batch(to_columns([context], ["ambient_temp", "humidity"]), config)[0])
+
+    def process_batch(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Vectorized environmental modifier, one aging factor per reading.
+        context (scalars or arrays): ambient_ref_temp, temp_coefficient,
+        humidity_threshold, humidity_coefficient, max_aging_factor.
+        """
+        context = context or {}
+        temp = columns["ambient_temp"]
+        humidity = columns["humidity"]
+
         # Basal aging rate (Arrhenius-like simplified logic)
-        aging_factor = 1.0 + (max(0, temp - 25) * 0.01) + (max(0, humidity - 70) * 0.02)
-        
+        aging_factor = (
+            1.0
+            + (np.maximum(0.0, temp - context.get("ambient_ref_temp", 25)) * context.get("temp_coefficient", 0.01))
+            + (np.maximum(0.0, humidity - context.get("humidity_threshold", 70)) * context.get("humidity_coefficient", 0.02))
+        )
+
         # Bounded to avoid unrealistic scaling
-        aging_factor = min(2.0, aging_factor)
-        
-        return aging_factor
+        return np.minimum(context.get("max_aging_factor", 2.0), aging_factor)
@@ -0,0 +1,184 @@
+import math
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.core.config import settings
+from app.engines.base import BaseEngine
+from app.engines.damage import DamageEngine
+from app.engines.environmental import EnvironmentalEngine
+from app.engines.shift import ShiftEngine
+
+# Per-asset input columns and their defaults. Distribution columns describe the
+# expected operating envelope; parameter columns match the reliability config.
+FLEET_DEFAULTS: Dict[str, float] = {
+    "current_damage": 0.0,
+    "max_damage": 1.0, # same limit as live ingest's RUL
+    "damage_rate": 0.0, # live damage per hour measured at ingest; 0 = not measured yet
+    "base_damage_factor": 0.0001, # damage per reading at nominal stress
+    "load_mean": 50.0,
+    "load_std": 5.0,
+    "ambient_temp_mean": 25.0,
+    "ambient_temp_std": 3.0,
+    "humidity_mean": 50.0,
+    "humidity_std": 10.0,
+    "threshold_load": 80.0,
+    "penalty_weight": 0.4,
+    "ambient_ref_temp": 25.0,
+    "temp_coefficient": 0.01,
+    "humidity_threshold": 70.0,
+    "humidity_coefficient": 0.02,
+    "max_aging_factor": 2.0,
+}
+
+PERCENTILES = (10, 50, 90)
+NO_FAILURE_RUL = 99999.0 # same sentinel as RULEngine
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the parent may be running Kafka/asyncio threads
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def _asset_seed(seed: int, asset_id: str) -> np.random.SeedSequence:
+    # Keyed by asset id, so an asset's scenarios do not depend on fleet order or chunking
+    return np.random.SeedSequence([seed, zlib.crc32(asset_id.encode())])
+
+def chunk_assets(scenarios: int, steps: int) -> int:
+    """
+    Assets per work unit: at most MONTE_CARLO_CHUNK_ASSETS, and few enough that
+    the unit stays within MONTE_CARLO_CHUNK_CELLS simulated readings, since
+    memory grows with assets x scenarios x steps rather than with assets alone.
+    """
+    by_cells = settings.MONTE_CARLO_CHUNK_CELLS // max(1, scenarios * steps)
+    return max(1, min(settings.MONTE_CARLO_CHUNK_ASSETS, by_cells))
+
+def simulate_chunk(asset_ids: Sequence[str], columns: Dict[str, np.ndarray], context: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Simulates `scenarios` trajectories of `steps` readings for each asset and
+    returns RUL percentiles (hours). Top-level so it can run in a worker process.
+    """
+    scenarios = context["scenarios"]
+    steps = context["steps"]
+    n = len(asset_ids)
+
+    # Each scenario is a persistent per-asset regime (trajectory runs hotter/heavier or
+    # lighter than nominal) plus within-window fluctuation. Regimes are drawn per asset;
+    # the fluctuation block is shared by all assets (common random numbers), which
+    # keeps per-asset percentiles unbiased while avoiding assets x scenarios x steps draws.
+    weight = context["regime_fraction"]
+    fluctuation = np.random.default_rng(np.random.SeedSequence(context["seed"])).standard_normal(
+        (3, scenarios, steps), dtype=np.float32
+    )
+    fluctuation *= np.float32(math.sqrt(1.0 - weight ** 2))
+    regime = np.empty((n, 3, scenarios), dtype=np.float32)
+    for i, asset_id in enumerate(asset_ids):
+        np.random.default_rng(_asset_seed(context["seed"], asset_id)).standard_normal(out=regime[i], dtype=np.float32)
+    regime *= np.float32(weight)
+    # [variable (load/ambient/humidity), asset, scenario, step]
+    noise = regime.transpose(1, 0, 2)[..., None] + fluctuation[:, None]
+
+    def per_asset(name: str) -> np.ndarray:
+        return columns[name].astype(np.float32)[:, None, None]
+
+    # In place on the noise block: no extra assets x scenarios x steps temporaries
+    load, ambient_temp, humidity = noise
+    load *= per_asset("load_std")
+    load += per_asset("load_mean")
+    np.maximum(load, 0.0, out=load)
+    ambient_temp *= per_asset("ambient_temp_std")
+    ambient_temp += per_asset("ambient_temp_mean")
+    humidity *= per_asset("humidity_std")
+    humidity += per_asset("humidity_mean")
+    np.clip(humidity, 0.0, 100.0, out=humidity)
+    params = {name: per_asset(name) for name in (
+        "threshold_load", "penalty_weight", "ambient_ref_temp", "temp_coefficient",
+        "humidity_threshold", "humidity_coefficient", "max_aging_factor",
+    )}
+
+    multiplier = ShiftEngine().process_batch({"load": load}, params)
+    multiplier *= EnvironmentalEngine().process_batch({"ambient_temp": ambient_temp, "humidity": humidity}, params)
+    increments = DamageEngine().process_batch({"base_damage_factor": per_asset("base_damage_factor"), "multiplier": multiplier})
+
+    # Mean damage per reading of each scenario; the simulated window is taken as
+    # representative of the asset's future duty, so RUL = remaining / rate.
+    per_reading = increments.mean(axis=2, dtype=np.float64)
+    # Time base: readings arrive at each asset's own pace, which the live damage
+    # rate reflects. Where it is measured, scale so the average scenario runs at
+    # that rate (the scenarios spread around the RUL ingest reports); otherwise
+    # assume one reading per step_hours.
+    live_rate = columns["damage_rate"][:, None]
+    expected = per_reading.mean(axis=1, keepdims=True)
+    readings_per_hour = np.full(live_rate.shape, 1.0 / context["step_hours"])
+    np.divide(live_rate, expected, out=readings_per_hour, where=(live_rate > 0) & (expected > 0))
+    rate = per_reading * readings_per_hour
+    remaining = np.maximum(0.0, columns["max_damage"] - columns["current_damage"])[:, None]
+    rul = np.full(rate.shape, NO_FAILURE_RUL)
+    np.divide(remaining, rate, out=rul, where=rate > 0)
+    np.minimum(rul, NO_FAILURE_RUL, out=rul)
+
+    p10, p50, p90 = np.percentile(rul, PERCENTILES, axis=1)
+    return {"p10": p10, "p50": p50, "p90": p90, "mean": rul.mean(axis=1)}
+
+class MonteCarloRULEngine(BaseEngine):
+    """
+    Probabilistic RUL for a whole fleet. Load, ambient temperature and humidity
+    trajectories are sampled per asset as NumPy arrays and run through the same
+    shift, environmental and damage models as live ingest.
+    """
+    def __init__(self):
+        super().__init__("MonteCarloRULEngine")
+
+    def process_batch(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        columns: per-asset arrays named as in FLEET_DEFAULTS (missing ones use the defaults).
+        context: {'asset_ids': list[str] (required), 'scenarios', 'steps', 'seed',
+                  'step_hours', 'regime_fraction', 'chunk_size', 'workers'}
+        Returns {'p10', 'p50', 'p90', 'mean'} RUL arrays in hours, one value per asset.
+        """
+        context = dict(context or {})
+        asset_ids: List[str] = list(context.pop("asset_ids"))
+        n = len(asset_ids)
+        sim_context = {
+            "scenarios": context.get("scenarios", settings.MONTE_CARLO_SCENARIOS),
+            "steps": context.get("steps", settings.MONTE_CARLO_STEPS),
+            "seed": context.get("seed", settings.MONTE_CARLO_SEED),
+            "step_hours": context.get("step_hours", settings.MONTE_CARLO_STEP_HOURS),
+            "regime_fraction": context.get("regime_fraction", 0.5),
+        }
+        full = {
+            name: np.broadcast_to(np.asarray(columns.get(name, default), dtype=np.float64), (n,))
+            for name, default in FLEET_DEFAULTS.items()
+        }
+        if n == 0:
+            return {key: np.empty(0) for key in ("p10", "p50", "p90", "mean")}
+
+        chunk_size = context.get("chunk_size") or chunk_assets(sim_context["scenarios"], sim_context["steps"])
+        workers = context.get("workers", settings.MONTE_CARLO_WORKERS) or os.cpu_count() or 1
+        bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        chunks = [
+            (asset_ids[a:b], {name: values[a:b] for name, values in full.items()}, sim_context)
+            for a, b in bounds
+        ]
+
+        if len(chunks) == 1 or workers == 1:
+            results = [simulate_chunk(*chunk) for chunk in chunks]
+        else:
+            results = list(_get_pool(workers).map(simulate_chunk, *zip(*chunks)))
+
+        self.log_event("fleet", "Simulated {} assets x {} scenarios in {} chunks", n, sim_context["scenarios"], len(chunks))
+        return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+    async def process(self, data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Single-asset convenience wrapper. data: FLEET_DEFAULTS fields for one asset.
+        """
+        columns = {name: np.array([value], dtype=np.float64) for name, value in data.items() if name in FLEET_DEFAULTS}
+        context = {**context, "asset_ids": [context.get("asset_id", data.get("asset_id", "asset"))]}
+        result = self.process_batch(columns, context)
+        return {key: float(values[0]) for key, values in result.items()}
@@ -1,28 +1,181 @@
-from typing import Any, Dict, Optional
+import copy
+import math
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
 from app.engines.base import BaseEngine
 
+SECONDS_PER_HOUR = 3600.0
+
+class DamageRateWindow:
+    """
+    Fixed-size ring buffer of recent (t, damage) points for one asset.
+    Maintains running sums for an ordinary least squares fit of damage over time,
+    so each push is O(1). Times are stored relative to an origin that is rebased
+    whenever the ring wraps, which keeps the running sums well conditioned.
+    Points less than `min_spacing` seconds after the newest one are merged into
+    it (latest damage wins): readings of one instant carry no time base for a
+    rate, and regressing over them would make it explode.
+    """
+    def __init__(self, capacity: int, min_spacing: float = 0.0):
+        self.capacity = capacity
+        self.min_spacing = min_spacing
+        self.t = np.zeros(capacity)
+        self.d = np.zeros(capacity)
+        self.head = 0
+        self.size = 0
+        self.origin_t = 0.0
+        self.origin_d = 0.0
+        self._reset_sums()
+
+    def copy(self) -> "DamageRateWindow":
+        clone = copy.copy(self)
+        clone.t = self.t.copy()
+        clone.d = self.d.copy()
+        return clone
+
+    def _reset_sums(self):
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+
+    def _add(self, x: float, y: float, sign: float):
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.sxy += sign * x * y
+        self.syy += sign * y * y
+
+    def push(self, t: float, damage: float) -> Tuple[float, float]:
+        """
+        Adds a point and returns (rate per hour, standard error of the rate).
+        """
+        if self.size == 0:
+            self.origin_t, self.origin_d = t, damage
+        else:
+            last = (self.head - 1) % self.capacity
+            if abs(t - self.t[last]) < self.min_spacing:
+                x = (self.t[last] - self.origin_t) / SECONDS_PER_HOUR
+                self._add(x, self.d[last] - self.origin_d, -1.0)
+                self.d[last] = damage
+                self._add(x, damage - self.origin_d, 1.0)
+                return self.estimate()
+
+        if self.size == self.capacity:
+            old = self.head
+            self._add((self.t[old] - self.origin_t) / SECONDS_PER_HOUR, self.d[old] - self.origin_d, -1.0)
+            self.size -= 1
+
+        self.t[self.head] = t
+        self.d[self.head] = damage
+        self._add((t - self.origin_t) / SECONDS_PER_HOUR, damage - self.origin_d, 1.0)
+        self.head = (self.head + 1) % self.capacity
+        self.size += 1
+
+        if self.head == 0:
+            self._rebase()
+        return self.estimate()
+
+    def _rebase(self):
+        # Amortized O(1): once per `capacity` pushes
+        oldest = self.head
+        self.origin_t, self.origin_d = self.t[oldest], self.d[oldest]
+        self._reset_sums()
+        for i in range(self.size):
+            idx = (oldest + i) % self.capacity
+            self._add((self.t[idx] - self.origin_t) / SECONDS_PER_HOUR, self.d[idx] - self.origin_d, 1.0)
+
+    def estimate(self) -> Tuple[float, float]:
+        n = self.size
+        if n < 2:
+            return 0.0, math.inf
+        sxx_c = self.sxx - self.sx * self.sx / n
+        if sxx_c <= 0:
+            # All points share one timestamp; no time base for a rate
+            return 0.0, math.inf
+        sxy_c = self.sxy - self.sx * self.sy / n
+        rate = sxy_c / sxx_c
+        if n < 3:
+            # Two points fit exactly; treat the rate as uncertain as itself
+            return rate, abs(rate)
+        syy_c = self.syy - self.sy * self.sy / n
+        sse = max(0.0, syy_c - rate * sxy_c)
+        return rate, math.sqrt(sse / (n - 2) / sxx_c)
+
 class RULEngine(BaseEngine):
+    """
+    Rates are expressed per hour, so RUL is in hours.
+    """
     def __init__(self):
         super().__init__("RULEngine")
+        self.windows: "OrderedDict[str, DamageRateWindow]" = OrderedDict()
 
-    async def process(self, current_damage: float, damage_rate: float, max_damage: float = 1.0) -> Dict[str, Any]:
+    def observe(self, asset_id: str, t: float, damage: float) -> Tuple[float, float]:
+        """
+        Feeds a timestamped damage value into the asset's sliding window and
+        returns (damage rate per hour, standard error of that rate).
+        """
+        window = self.windows.get(asset_id)
+        if window is None:
+            window = self.windows[asset_id] = DamageRateWindow(settings.RUL_RATE_WINDOW, settings.RUL_RATE_MIN_SPACING)
+            # Bound total memory: evict the least recently seen assets
+            while len(self.windows) > settings.RUL_RATE_MAX_ASSETS:
+                self.windows.popitem(last=False)
+        else:
+            self.windows.move_to_end(asset_id)
+        return window.push(t, damage)
+
+    def save(self, asset_ids: List[str]) -> Dict[str, Optional[DamageRateWindow]]:
+        """
+        Copies of the assets' windows (None for assets without one), for restore().
+        """
+        return {aid: (self.windows[aid].copy() if aid in self.windows else None) for aid in asset_ids}
+
+    def restore(self, saved: Dict[str, Optional[DamageRateWindow]]):
+        for aid, window in saved.items():
+            if window is None:
+                self.windows.pop(aid, None)
+            else:
+                self.windows[aid] = window
+
+    async def process(self, current_damage: float, damage_rate: float, max_damage: float = 1.0, rate_stderr: float = 0.0) -> Dict[str, Any]:
         """
         Calculates RUL based on remaining damage capacity.
         """
-        remaining_capacity = max(0.0, max_damage - current_damage)
-        
+        columns = {
+            "current_damage": np.array([current_damage], dtype=np.float64),
+            "damage_rate": np.array([damage_rate], dtype=np.float64),
+            "rate_stderr": np.array([rate_stderr], dtype=np.float64),
+        }
+        result = self.process_batch(columns, {"max_damage": max_damage})
+        return {key: float(values[0]) for key, values in result.items()}
+
+    def process_batch(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized RUL over 'current_damage' and 'damage_rate' columns, with an
+        optional 'rate_stderr' column for confidence.
+        context: {'max_damage': float | array}
+        """
+        context = context or {}
+        current_damage = columns["current_damage"]
+        damage_rate = columns["damage_rate"]
+        rate_stderr = columns.get("rate_stderr")
+        if rate_stderr is None:
+            rate_stderr = np.zeros_like(damage_rate)
+        max_damage = context.get("max_damage", 1.0)
+
+        remaining_capacity = np.maximum(0.0, max_damage - current_damage)
+
         # Stability: Handle zero or negative rates (which shouldn't happen in physical accumulation)
-        if damage_rate <= 0:
-            rul = 99999.0 # Effectively infinity for the controller
-        else:
-            rul = remaining_capacity / damage_rate
-            
-        # Confidence score modulation
-        # Logic: Confidence decays if the damage rate is highly erratic or if data is stale
-        confidence = 1.0
-        if damage_rate > (raw_damage_delta := 0.001): # Arbitrary threshold for high stress
-             confidence = 0.85 # High stress reduces confidence in linear projection
-             
+        positive = damage_rate > 0
+        rul = np.full(remaining_capacity.shape, 99999.0) # Effectively infinity for the controller
+        np.divide(remaining_capacity, damage_rate, out=rul, where=positive)
+
+        # Confidence from the relative uncertainty of the rate: 1 / (1 + stderr / rate).
+        # An erratic rate (or no usable rate at all) drives it towards 0.
+        relative_error = np.full(damage_rate.shape, np.inf)
+        np.divide(rate_stderr, damage_rate, out=relative_error, where=positive)
+        confidence = 1.0 / (1.0 + relative_error)
+
         return {
             "rul": rul,
             "confidence": confidence,
@@ -1,5 +1,6 @@
-from typing import Any, Dict
-from app.engines.base import BaseEngine
+from typing import Any, Dict, Optional
+import numpy as np
+from app.engines.base import BaseEngine, to_columns
 
 class ShiftEngine(BaseEngine):
     def __init__(self):
@@ -10,21 +11,39 @@ class ShiftEngine(BaseEngine):
         Detects shift violations and returns a damage multiplier.
         config: {'threshold_load': float, 'penalty_weight': float}
         """
+        multiplier = float(self.process_batch(to_columns([telemetry], ["load"]), config)[0])
+
         load = telemetry.get("load", 0.0)
         threshold = config.get("threshold_load", 100.0)
-        penalty_weight = config.get("penalty_weight", 0.5)
-        
-        multiplier = 1.0
         if load > threshold:
-            violation_ratio = load / threshold
-            # industrial calculation: Bounded penalty to prevent instability
-            multiplier = 1.0 + (violation_ratio - 1.0) * penalty_weight
-            multiplier = min(5.0, multiplier)
-            
             self.log_event(
                 telemetry.get("asset_id", "unknown"),
-                f"Violation detected! Load: {load:.2f} > Threshold: {threshold:.2f}. Multiplier: {multiplier:.3f}",
+                "Violation detected! Load: {:.2f} > Threshold: {:.2f}. Multiplier: {:.3f}", load, threshold, multiplier,
                 level="WARNING"
             )
             
         return multiplier
+
+    def process_batch(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Vectorized shift check. Returns one damage multiplier per reading.
+        context: {'threshold_load': float | array, 'penalty_weight': float | array}
+        """
+        context = context or {}
+        load = columns["load"]
+        threshold = context.get("threshold_load", 100.0)
+        penalty_weight = context.get("penalty_weight", 0.5)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            violation_ratio = load / threshold
+            # industrial calculation: Bounded penalty to prevent instability
+            multiplier = np.minimum(5.0, 1.0 + (violation_ratio - 1.0) * penalty_weight)
+
+        return np.where(load > threshold, multiplier, 1.0)
+
+    def violations(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Boolean mask of readings above the shift threshold.
+        """
+        context = context or {}
+        return columns["load"] > context.get("threshold_load", 100.0)
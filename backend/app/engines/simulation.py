@@ -1,8 +1,17 @@
 import random
 import asyncio
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+import numpy as np
 from app.engines.base import BaseEngine
 
+# (load offset range, temp coefficient) per asset type
+LOAD_PROFILES = {
+    "Pump": ((0, 20), 0.2),
+    "Turbine": ((40, 60), 0.5),
+}
+DEFAULT_PROFILE = ((0, 5), 0.1)
+
 class SimulationEngine(BaseEngine):
     def __init__(self):
         super().__init__("SimulationEngine")
@@ -15,20 +24,29 @@ class SimulationEngine(BaseEngine):
         base_load = 50.0
         base_temp = 40.0
         
-        if asset_type == "Pump":
-            load = base_load + random.uniform(0, 20)
-            temp = base_temp + (load * 0.2)
-        elif asset_type == "Turbine":
-            load = base_load + random.uniform(40, 60)
-            temp = base_temp + (load * 0.5)
-        else:
-            load = base_load + random.uniform(0, 5)
-            temp = base_temp + (load * 0.1)
+        (low, high), temp_coefficient = LOAD_PROFILES.get(asset_type, DEFAULT_PROFILE)
+        load = base_load + random.uniform(low, high)
+        temp = base_temp + (load * temp_coefficient)
             
         return {
             "load": load,
             "temp": temp,
-            "timestamp": "now" # In real use, use datetime.utcnow().isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+
+    def process_batch(self, columns: Dict[str, np.ndarray], context: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Generates synthetic load/temp columns for a batch of assets of one type.
+        context: {'asset_type': str, 'size': int, 'seed': int | None}
+        """
+        context = context or {}
+        (low, high), temp_coefficient = LOAD_PROFILES.get(context.get("asset_type"), DEFAULT_PROFILE)
+        rng = np.random.default_rng(context.get("seed"))
+
+        load = 50.0 + rng.uniform(low, high, size=context.get("size", 1))
+        return {
+            "load": load,
+            "temp": 40.0 + load * temp_coefficient,
         }
 
     async def run_simulation_step(self, asset_id: str, asset_type: str):
@@ -1,10 +1,11 @@
 import time
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from app.utils.logging import setup_logging
 from app.utils.metrics import get_metrics
 from app.api.v1.api import api_router
+from app.api.middleware.timing import RequestTimingMiddleware
 from app.core.config import settings
 
 setup_logging()
@@ -19,16 +20,34 @@ app = FastAPI(
 async def startup_event():
     logger.info("Starting up...")
     try:
-        from app.db.session import get_db
+        from app.db.session import SessionLocal
         from sqlalchemy import text
-        # We need to get a session to test
-        async for session in get_db():
+        # We need to get a session to test (closed right away: it holds the writer)
+        async with SessionLocal() as session:
             await session.execute(text("SELECT 1"))
             logger.info("Database connection successful!")
-            break
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
 
+    from app.core.lifecycle import start_background_services
+    await start_background_services()
+    # API only: the ingest worker does not serve /metrics
+    from app.services.fleet_health import fleet_health_export
+    await fleet_health_export.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Shutting down...")
+    from app.services.fleet_health import fleet_health_export
+    await fleet_health_export.stop()
+    from app.core.lifecycle import stop_background_services
+    await stop_background_services()
+    from app.core.security import password_hasher
+    password_hasher.shutdown()
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead()
+    # Drain the enqueued log sinks
+    await logger.complete()
 
 # CORS
 app.add_middleware(
@@ -39,13 +58,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.4f}s")
-    return response
+# Added last so it wraps CORS too and times the whole request
+app.add_middleware(RequestTimingMiddleware)
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, TypeAdapter
+from typing import Optional, List
+
+class AssetSummary(BaseModel):
+    id: str
+    name: str
+    type: Optional[str] = None
+    status: Optional[str] = None
+    damage: Optional[float] = None
+    health: Optional[float] = None # 0-100, derived from damage
+    rul: Optional[float] = None # hours
+    confidence: Optional[float] = None
+
+class AssetPage(BaseModel):
+    items: List[AssetSummary]
+    next_cursor: Optional[str] = None # pass back as ?cursor= for the next page; None on the last page
+
+# Built once at import so listing responses skip per-request schema setup and validation
+asset_page_adapter = TypeAdapter(AssetPage)
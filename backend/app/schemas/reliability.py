@@ -1,10 +1,58 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from datetime import datetime
 
 class TelemetryIngest(BaseModel):
     load: float
     temp: float
+    timestamp: Optional[datetime] = None # Reading time (naive = UTC); defaults to the request's receive time
     base_damage_factor: Optional[float] = 0.0001
     ambient_temp: Optional[float] = 25.0
     humidity: Optional[float] = 50.0
     extra_data: Optional[Dict[str, Any]] = None
+
+class TelemetryBatchReading(TelemetryIngest):
+    asset_id: str
+
+class TelemetryStreamReading(TelemetryBatchReading):
+    tenant_id: str
+
+class TelemetryBatchIngest(BaseModel):
+    readings: List[TelemetryBatchReading] = Field(..., min_length=1)
+
+class TelemetryBatchResult(BaseModel):
+    asset_id: str
+    status: str # "processed" or "rejected"
+    damage: Optional[float] = None
+    rul: Optional[float] = Field(None, description="Remaining useful life in hours; 99999 while no damage rate is measurable")
+    confidence: Optional[float] = None
+    multiplier: Optional[float] = None
+    detail: Optional[str] = None
+
+class TelemetryBatchResponse(BaseModel):
+    processed: int
+    rejected: int
+    results: List[TelemetryBatchResult]
+
+class TelemetryHistory(BaseModel):
+    asset_id: str
+    start: float
+    end: float
+    method: str
+    series: Dict[str, List[float]]
+
+class RULForecastRequest(BaseModel):
+    asset_ids: Optional[List[str]] = None # defaults to every asset of the tenant
+    scenarios: int = Field(1000, ge=10, le=10000)
+    seed: Optional[int] = None
+
+class RULForecast(BaseModel):
+    asset_id: str
+    p10: float # hours
+    p50: float
+    p90: float
+    mean: float
+
+class RULForecastResponse(BaseModel):
+    scenarios: int
+    forecasts: List[RULForecast]
@@ -8,3 +8,5 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
     tenant_id: Optional[str] = None
+    role: Optional[str] = None
+    iat: Optional[int] = None
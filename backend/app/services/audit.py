@@ -0,0 +1,190 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.models import AuditLog
+from app.db.session import SessionLocal
+from app.utils.metrics import AUDIT_QUEUE_DEPTH, AUDIT_WRITTEN, AUDIT_DROPPED, AUDIT_SAMPLED_OUT, AUDIT_FLUSH_SIZE
+from loguru import logger
+
+# High-frequency actions that may be sampled; everything else is always kept
+SAMPLED_ACTIONS = {"telemetry_processed"}
+
+AUDIT_COLUMNS = ["tenant_id", "entity_type", "entity_id", "action", "old_value", "new_value", "metadata_info"]
+JSON_COLUMNS = {"old_value", "new_value", "metadata_info"}
+
+class AuditSink:
+    """
+    Moves AuditLog writes off the request transaction.
+    Entries are queued on a bounded in-memory queue and drained by a background
+    task in multi-row INSERTs (COPY on PostgreSQL). When the sink is not running
+    entries are written through the caller's session instead.
+    Either way the audit commit is separate from the state commit: a crash
+    between the two loses the entries, it never audits uncommitted state.
+    """
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Rare entries of a failed flush, retried first; still unfinished in the queue
+        self._retry: List[Dict[str, Any]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def keep(self, entry: Dict[str, Any]) -> bool:
+        if entry["action"] not in SAMPLED_ACTIONS:
+            return True
+        if random.random() < settings.AUDIT_TELEMETRY_SAMPLE_RATE:
+            return True
+        AUDIT_SAMPLED_OUT.inc()
+        return False
+
+    async def write(self, db: AsyncSession, entries: List[Dict[str, Any]]):
+        """
+        Records audit entries, applying the sampling policy. Call it once the
+        state the entries describe is committed, so nothing is audited for a
+        transaction that rolled back; without the sink running they are
+        inserted and committed through `db` in a second commit.
+        Blocks for up to AUDIT_ENQUEUE_TIMEOUT_MS when the queue is full before
+        dropping sampled actions. Rare actions wait up to AUDIT_ENQUEUE_DEADLINE_MS
+        and then fail the caller with a 503; the state is already committed.
+        """
+        entries = [entry for entry in entries if self.keep(entry)]
+        if not entries:
+            return
+        if not self.running:
+            await db.execute(insert(AuditLog), entries)
+            await db.commit()
+            return
+
+        timeout = settings.AUDIT_ENQUEUE_TIMEOUT_MS / 1000
+        deadline = settings.AUDIT_ENQUEUE_DEADLINE_MS / 1000
+        for i, entry in enumerate(entries):
+            try:
+                self._queue.put_nowait(entry)
+                continue
+            except asyncio.QueueFull:
+                pass
+            rare = entry["action"] not in SAMPLED_ACTIONS
+            try:
+                await asyncio.wait_for(self._queue.put(entry), timeout=deadline if rare else timeout)
+            except asyncio.TimeoutError:
+                if not rare:
+                    AUDIT_DROPPED.inc()
+                    continue
+                lost = entries[i:]
+                AUDIT_DROPPED.inc(len(lost))
+                AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+                logger.error(f"Audit queue full for {deadline}s, dropped {len(lost)} entries including '{entry['action']}' on {entry['entity_id']}")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Audit log is backed up: the change was applied but not fully audited",
+                )
+        AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def drain(self):
+        """
+        Waits until every entry queued so far is written (or, for sampled
+        actions, counted as dropped by a failed flush).
+        """
+        if self.running:
+            await self._queue.join()
+
+    async def start(self):
+        if self.running or not settings.AUDIT_SINK_ENABLED:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        # Sentinel lets the drainer finish its current batch before exiting
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        retry, self._retry = self._retry, []
+        await self._flush(retry)
+        while not self._queue.empty():
+            await self._flush(self._take(settings.AUDIT_BATCH_SIZE))
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            entry = self._queue.get_nowait()
+            self._queue.task_done()
+            if entry is not None:
+                batch.append(entry)
+        return batch
+
+    async def _run(self):
+        linger = settings.AUDIT_LINGER_MS / 1000
+        stopping = False
+        failures = 0
+        while not stopping:
+            batch, self._retry = self._retry, []
+            deadline = time.monotonic() + linger if batch else None
+            while len(batch) < settings.AUDIT_BATCH_SIZE:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(entry)
+                # Linger starts with the first entry of the batch
+                deadline = deadline or time.monotonic() + linger
+            AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                await self._flush(batch)
+                failures = 0
+            except Exception as e:
+                # Sampled entries may go; rare ones are retried with the next batch
+                self._retry = [entry for entry in batch if entry["action"] not in SAMPLED_ACTIONS]
+                AUDIT_DROPPED.inc(len(batch) - len(self._retry))
+                failures += 1
+                logger.error(f"Audit flush of {len(batch)} entries failed (attempt {failures}, {len(self._retry)} kept for retry): {e}")
+            for _ in range(len(batch) - len(self._retry)):
+                self._queue.task_done()
+            if failures and not stopping:
+                await asyncio.sleep(min(30.0, settings.AUDIT_RETRY_BACKOFF * 2 ** (failures - 1)))
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        async with SessionLocal() as db:
+            if db.bind.dialect.name == "postgresql":
+                await self._copy(db, batch)
+            else:
+                await db.execute(insert(AuditLog), batch)
+            await db.commit()
+        AUDIT_FLUSH_SIZE.observe(len(batch))
+        AUDIT_WRITTEN.inc(len(batch))
+
+    async def _copy(self, db: AsyncSession, batch: List[Dict[str, Any]]):
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        records = [tuple(_copy_value(entry, column) for column in AUDIT_COLUMNS) for entry in batch]
+        await raw.driver_connection.copy_records_to_table(
+            AuditLog.__tablename__, records=records, columns=AUDIT_COLUMNS
+        )
+
+def _copy_value(entry: Dict[str, Any], column: str) -> Any:
+    value = entry.get(column)
+    # JSON columns travel as text; a missing value is SQL NULL, not the JSON 'null'
+    if column in JSON_COLUMNS and value is not None:
+        return json.dumps(value)
+    return value
+
+audit_sink = AuditSink()
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from app.core.cache import state_cache
+from app.core.config import settings
+from app.utils.metrics import CHATBOT_CACHE_LOOKUPS, CHATBOT_FIRST_TOKEN_SECONDS, CHATBOT_PROMPT_TOKENS
+from loguru import logger
+
+# System prompt to give Gemini context about Forsee AI
+SYSTEM_PROMPT = """
+You are the Forsee AI Assistant, an expert in industrial predictive maintenance,
+health monitoring, and equipment reliability.
+
+Your goal is to help users understand their asset health, interpret RUL (Remaining Useful Life)
+predictions, and provide guidance on maintenance scheduling.
+
+Context: Forsee AI is a state-of-the-art software that monitors industrial assets (pumps, turbines, etc.)
+using physically-grounded ML models.
+
+Tone: Professional, intelligent, helpful, and technically accurate.
+
+Constraint: If asked about things completely unrelated to Forsee AI or industrial reliability,
+politely steer the conversation back to those topics.
+"""
+
+BLOCKED_RESPONSE = "I'm sorry, I cannot answer that request due to safety or technical restrictions."
+
+# (role, content) pairs, role is 'user' or 'model'
+History = Sequence[Tuple[str, str]]
+
+# Questions about the tenant's own equipment, or that name an asset (P-101).
+# Deliberately broad: a false match only costs caching.
+FLEET_QUESTION = re.compile(
+    r"\b(my|our|we|fleet|assets?|equipment|machines?|pumps?|compressors?|turbines?|motors?|"
+    r"which|worst|lowest|highest|critical|risks?|violations?|status|health|reporting|"
+    r"currently|now|today)\b|\b[a-z]+-\d+\b",
+    re.IGNORECASE,
+)
+
+class ChatBackend(ABC):
+    """
+    LLM interface: streams the reply to `message` given the prior turns and
+    per-request context (fleet data, summary of trimmed turns).
+    """
+    name = "base"
+
+    @abstractmethod
+    def stream(self, message: str, history: History, context: str = "") -> AsyncIterator[str]:
+        """
+        Yields the reply in chunks as the model produces them (an async generator).
+        """
+        pass
+
+class GeminiBackend(ChatBackend):
+    """
+    Google Gemini. The client is configured and the model built once, on first use.
+    """
+    name = "gemini"
+
+    def __init__(self):
+        self._model = None
+
+    def _get_model(self):
+        if self._model is None:
+            if not settings.GEMINI_API_KEY:
+                raise RuntimeError("Gemini API Key not configured")
+            import google.generativeai as genai
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self._model = genai.GenerativeModel(settings.CHATBOT_MODEL, system_instruction=SYSTEM_PROMPT)
+        return self._model
+
+    async def stream(self, message: str, history: History, context: str = "") -> AsyncIterator[str]:
+        contents = [
+            {"role": "user" if role == "user" else "model", "parts": [content]}
+            for role, content in history
+        ]
+        # The model (and its system prompt) is shared, so per-tenant context rides on the user turn
+        contents.append({"role": "user", "parts": [f"{context}\n\nQuestion: {message}" if context else message]})
+        response = await self._get_model().generate_content_async(contents, stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Blocked or empty candidate
+                yield BLOCKED_RESPONSE
+                return
+            if text:
+                yield text
+
+class StubBackend(ChatBackend):
+    """
+    Local stand-in for tests and benchmarks: deterministic reply, streamed word by word.
+    """
+    name = "stub"
+
+    async def stream(self, message: str, history: History, context: str = "") -> AsyncIterator[str]:
+        reply = f"Stub reply to: {message.strip()} ({len(history)} earlier turns, {estimate_tokens(context)} context tokens)"
+        for i, word in enumerate(reply.split(" ")):
+            yield word if i == 0 else " " + word
+
+CHAT_BACKENDS = {
+    "gemini": GeminiBackend,
+    "stub": StubBackend,
+}
+
+def create_backend(name: str) -> ChatBackend:
+    if name not in CHAT_BACKENDS:
+        raise ValueError(f"Unknown chatbot backend '{name}'")
+    return CHAT_BACKENDS[name]()
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; good enough for budgeting
+    return (len(text) + 3) // 4
+
+def fit_history(history: History, budget: int) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Keeps the most recent turns that fit in `budget` tokens, starting on a user
+    turn. Older turns are condensed into a one-line summary of what the user
+    asked, itself capped at CHATBOT_HISTORY_SUMMARY_TOKENS.
+    Returns (summary, kept turns).
+    """
+    kept = len(history)
+    used = 0
+    while kept > 0:
+        cost = estimate_tokens(history[kept - 1][1])
+        if used + cost > budget:
+            break
+        used += cost
+        kept -= 1
+    while kept < len(history) and history[kept][0] != "user":
+        kept += 1
+    recent = list(history[kept:])
+
+    questions: List[str] = []
+    remaining = settings.CHATBOT_HISTORY_SUMMARY_TOKENS
+    for role, content in reversed(history[:kept]):
+        if role != "user":
+            continue
+        question = " ".join(content.split())
+        if len(question) > 160:
+            question = question[:157] + "..."
+        remaining -= estimate_tokens(question) + 1
+        if remaining < 0:
+            break
+        questions.append(question)
+    summary = ""
+    if questions:
+        summary = "Earlier in this conversation the user asked: " + "; ".join(reversed(questions))
+    return summary, recent
+
+def needs_fleet_data(message: str, history: History) -> bool:
+    """
+    True if answering `message` may need the tenant's fleet data. The last user
+    turn counts too, so follow-ups ("and the second one?") keep the context.
+    Other questions ("what is RUL?") are answered without it: their answers
+    hold no tenant data and are cached on the conversation alone.
+    """
+    last_question = next((content for role, content in reversed(history) if role == "user"), "")
+    return bool(FLEET_QUESTION.search(message) or FLEET_QUESTION.search(last_question))
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def cache_key(message: str, history: History, context: str = "") -> str:
+    """
+    Case- and whitespace-insensitive digest of the conversation, so the same
+    question asked the same way after the same turns hits the cache. Fleet
+    data in `context` changes with every render, so fleet questions are only
+    reused within CHATBOT_FLEET_SUMMARY_REFRESH.
+    """
+    payload = json.dumps([context, [(role, _normalize(content)) for role, content in history], _normalize(message)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ChatService:
+    """
+    Streams chatbot answers from the configured backend and caches completed
+    answers: in-process LRU first, then Redis so every worker shares them.
+    """
+    def __init__(self, backend: Optional[ChatBackend] = None):
+        self.backend = backend
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _get_backend(self) -> ChatBackend:
+        if self.backend is None:
+            self.backend = create_backend(settings.CHATBOT_BACKEND)
+        return self.backend
+
+    async def _cached(self, key: str) -> Optional[str]:
+        entry = self._local.get(key)
+        if entry and entry[0] > time.monotonic():
+            CHATBOT_CACHE_LOOKUPS.labels(result="local").inc()
+            return entry[1]
+        if state_cache.client is not None:
+            try:
+                value = await state_cache.client.get(f"chat:answer:{key}")
+            except Exception as e:
+                logger.warning(f"Chat cache Redis lookup failed: {e}")
+                value = None
+            if value is not None:
+                CHATBOT_CACHE_LOOKUPS.labels(result="redis").inc()
+                return self._store_local(key, value.decode())
+        CHATBOT_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    def _store_local(self, key: str, answer: str) -> str:
+        self._local[key] = (time.monotonic() + settings.CHATBOT_CACHE_TTL, answer)
+        self._local.move_to_end(key)
+        while len(self._local) > settings.CHATBOT_CACHE_SIZE:
+            self._local.popitem(last=False)
+        return answer
+
+    async def _store(self, key: str, answer: str):
+        self._store_local(key, answer)
+        if state_cache.client is not None:
+            try:
+                await state_cache.client.set(f"chat:answer:{key}", answer, ex=int(settings.CHATBOT_CACHE_TTL))
+            except Exception as e:
+                logger.warning(f"Chat cache Redis write failed: {e}")
+
+    async def stream(self, message: str, history: History, fleet_summary: str = "") -> AsyncIterator[str]:
+        """
+        Yields the answer in chunks as the backend produces them; a cached answer
+        comes back as a single chunk. Only answers that completed are cached.
+        History is trimmed to CHATBOT_HISTORY_TOKEN_BUDGET before it is sent.
+        Pass a fleet summary only when needs_fleet_data(): answers without one
+        are shared by every tenant.
+        """
+        earlier, history = fit_history(history, settings.CHATBOT_HISTORY_TOKEN_BUDGET)
+        context = "\n\n".join(part for part in (
+            f"Current fleet data:\n{fleet_summary}" if fleet_summary else "",
+            earlier,
+        ) if part)
+        key = cache_key(message, history, context)
+        if settings.CHATBOT_CACHE_TTL > 0:
+            cached = await self._cached(key)
+            if cached is not None:
+                yield cached
+                return
+
+        CHATBOT_PROMPT_TOKENS.observe(
+            estimate_tokens(message) + estimate_tokens(context) + sum(estimate_tokens(content) for _, content in history)
+        )
+        start = time.perf_counter()
+        parts: List[str] = []
+        async for text in self._get_backend().stream(message, history, context):
+            if not parts:
+                CHATBOT_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start)
+            parts.append(text)
+            yield text
+
+        answer = "".join(parts)
+        if settings.CHATBOT_CACHE_TTL > 0 and answer and answer != BLOCKED_RESPONSE:
+            await self._store(key, answer)
+
+    async def answer(self, message: str, history: History, fleet_summary: str = "") -> str:
+        return "".join([text async for text in self.stream(message, history, fleet_summary)])
+
+chat_service = ChatService()
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.bus import bus
+from app.core.cache import state_cache
+from app.core.config import settings
+from app.db.models import Asset, ReliabilityConfig
+from app.db.session import stream_rows
+from app.utils.metrics import CONFIG_CACHE_LOOKUPS
+from loguru import logger
+
+CONFIG_FIELDS = (
+    "threshold_load", "penalty_weight",
+    "ambient_ref_temp", "temp_coefficient",
+    "humidity_threshold", "humidity_coefficient", "max_aging_factor",
+)
+
+DEFAULT_RELIABILITY_CONFIG: Dict[str, float] = {
+    "threshold_load": 80.0,
+    "penalty_weight": 0.4,
+    "ambient_ref_temp": 25.0,
+    "temp_coefficient": 0.01,
+    "humidity_threshold": 70.0,
+    "humidity_coefficient": 0.02,
+    "max_aging_factor": 2.0,
+}
+
+INVALIDATION_CHANNEL = "forsee:config:invalidate"
+
+def _redis_key(tenant_id: str, asset_id: str) -> str:
+    return f"tenant:{tenant_id}:asset:{asset_id}:config"
+
+def _version_key(tenant_id: str) -> str:
+    return f"tenant:{tenant_id}:config:version"
+
+def merge_config(*layers: Optional[ReliabilityConfig]) -> Dict[str, float]:
+    """
+    Resolves effective parameters: later layers override earlier ones field by
+    field, and unset fields fall back to DEFAULT_RELIABILITY_CONFIG.
+    """
+    config = dict(DEFAULT_RELIABILITY_CONFIG)
+    for layer in layers:
+        if layer is None:
+            continue
+        for field in CONFIG_FIELDS:
+            value = getattr(layer, field)
+            if value is not None:
+                config[field] = value
+    return config
+
+class ConfigCache:
+    """
+    Tiered lookup of resolved per-asset reliability configuration:
+    in-process LRU with TTL -> Redis -> database.
+
+    The first database lookup of a tenant in a process loads the whole tenant,
+    so later assets of that tenant only fall through on TTL expiry. Config
+    edits publish on INVALIDATION_CHANNEL and every worker drops the affected
+    entries.
+
+    Edits also bump the tenant's version in Redis, and Redis entries carry the
+    version they were loaded under: a lookup that read the database before an
+    edit committed may still write its result, but nobody reads it. Locally, a
+    per-tenant generation does the same for lookups in flight.
+    """
+    def __init__(self):
+        self._local: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, float]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._loaded_tenants: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def resolve(self, db: AsyncSession, tenant_id: str, asset_ids: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic()
+        generation = self._generations.get(tenant_id, 0)
+        resolved: Dict[str, Dict[str, float]] = {}
+        missing: List[str] = []
+        for aid in asset_ids:
+            entry = self._local.get((tenant_id, aid))
+            if entry and entry[0] > now:
+                resolved[aid] = entry[1]
+            else:
+                missing.append(aid)
+        CONFIG_CACHE_LOOKUPS.labels(tier="local").inc(len(resolved))
+        if not missing:
+            return resolved
+
+        # L2: Redis
+        version: Optional[int] = None
+        if state_cache.client is not None:
+            try:
+                async with state_cache.client.pipeline(transaction=False) as pipe:
+                    pipe.get(_version_key(tenant_id))
+                    pipe.mget([_redis_key(tenant_id, aid) for aid in missing])
+                    raw_version, values = await pipe.execute()
+                version = int(raw_version or 0)
+            except Exception as e:
+                logger.warning(f"Config cache Redis lookup failed: {e}")
+                values = [None] * len(missing)
+            still_missing = []
+            for aid, value in zip(missing, values):
+                entry = json.loads(value) if value is not None else None
+                # Entries loaded before the tenant's last edit are stale
+                if entry is None or entry.get("version") != version:
+                    still_missing.append(aid)
+                else:
+                    resolved[aid] = self._store(tenant_id, aid, entry["config"], generation)
+            CONFIG_CACHE_LOOKUPS.labels(tier="redis").inc(len(missing) - len(still_missing))
+            missing = still_missing
+
+        # L3: Database
+        if missing:
+            if tenant_id in self._loaded_tenants:
+                loaded = await self._load(db, tenant_id, missing)
+            else:
+                # First use of the tenant in this process: load all of it in one pass
+                loaded = await self._load(db, tenant_id)
+                self._loaded_tenants.add(tenant_id)
+                for aid, config in loaded.items():
+                    self._store(tenant_id, aid, config, generation)
+                loaded.update((aid, merge_config()) for aid in missing if aid not in loaded)
+            CONFIG_CACHE_LOOKUPS.labels(tier="database").inc(len(missing))
+            for aid in missing:
+                resolved[aid] = self._store(tenant_id, aid, loaded[aid], generation)
+            if version is not None:
+                await self._publish_l2(tenant_id, version, loaded)
+        return resolved
+
+    def _store(self, tenant_id: str, asset_id: str, config: Dict[str, float], generation: int) -> Dict[str, float]:
+        """
+        Caches locally unless the tenant was invalidated since `generation` was
+        read (the config may predate the edit). Returns the config either way.
+        """
+        if self._generations.get(tenant_id, 0) != generation:
+            return config
+        key = (tenant_id, asset_id)
+        self._local[key] = (time.monotonic() + settings.CONFIG_CACHE_TTL, config)
+        self._local.move_to_end(key)
+        while len(self._local) > settings.CONFIG_CACHE_SIZE:
+            self._local.popitem(last=False)
+        return config
+
+    async def _publish_l2(self, tenant_id: str, version: int, configs: Dict[str, Dict[str, float]]):
+        if state_cache.client is None or not configs:
+            return
+        try:
+            async with state_cache.client.pipeline(transaction=False) as pipe:
+                for aid, config in configs.items():
+                    entry = {"version": version, "config": config}
+                    pipe.set(_redis_key(tenant_id, aid), json.dumps(entry), ex=settings.CONFIG_REDIS_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Config cache Redis write failed: {e}")
+
+    async def _load(self, db: AsyncSession, tenant_id: str, asset_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Resolves configuration for the given assets (default: every asset of
+        the tenant) straight from the database.
+        """
+        asset_stmt = select(Asset.id, Asset.type).where(Asset.tenant_id == tenant_id)
+        config_stmt = select(ReliabilityConfig).where(ReliabilityConfig.tenant_id == tenant_id)
+        if asset_ids is not None:
+            asset_stmt = asset_stmt.where(Asset.id.in_(asset_ids))
+        types = {aid: asset_type async for aid, asset_type in stream_rows(db, asset_stmt)}
+        if asset_ids is None:
+            asset_ids = list(types)
+        else:
+            config_stmt = config_stmt.where(or_(
+                and_(ReliabilityConfig.scope == "asset", ReliabilityConfig.scope_key.in_(asset_ids)),
+                and_(ReliabilityConfig.scope == "asset_type", ReliabilityConfig.scope_key.in_(set(filter(None, types.values())))),
+            ))
+        by_scope = {(row.scope, row.scope_key): row for row in await db.scalars(config_stmt)}
+        return {
+            aid: merge_config(by_scope.get(("asset_type", types.get(aid))), by_scope.get(("asset", aid)))
+            for aid in asset_ids
+        }
+
+    def invalidate_local(self, tenant_id: str, asset_ids: Optional[List[str]] = None):
+        self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+        if asset_ids is None:
+            for key in [key for key in self._local if key[0] == tenant_id]:
+                del self._local[key]
+        else:
+            for aid in asset_ids:
+                self._local.pop((tenant_id, aid), None)
+
+    async def invalidate(self, db: AsyncSession, tenant_id: str, scope: str, scope_key: str):
+        """
+        Called after a config edit has committed: bumps the tenant's version in
+        Redis, which retires its Redis entries, and tells every worker
+        (including this one) to drop its local entries.
+        """
+        if scope == "asset":
+            asset_ids = [scope_key]
+        else:
+            asset_ids = list(await db.scalars(
+                select(Asset.id).where(Asset.tenant_id == tenant_id, Asset.type == scope_key)
+            ))
+        self.invalidate_local(tenant_id, asset_ids)
+
+        message = {"tenant_id": tenant_id, "asset_ids": asset_ids}
+        if state_cache.client is not None:
+            try:
+                async with state_cache.client.pipeline(transaction=True) as pipe:
+                    pipe.incr(_version_key(tenant_id))
+                    pipe.publish(INVALIDATION_CHANNEL, json.dumps(message))
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Config invalidation via Redis failed: {e}")
+        bus.emit("config.invalidated", key=tenant_id, data=message)
+
+    async def start(self):
+        if state_cache.client is not None and not self._task:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        while True:
+            try:
+                async with state_cache.client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        payload = json.loads(message["data"])
+                        self.invalidate_local(payload["tenant_id"], payload.get("asset_ids"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Config invalidation listener failed, retrying: {e}")
+                await asyncio.sleep(5)
+
+config_cache = ConfigCache()
@@ -0,0 +1,304 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import state_cache
+from app.core.config import settings
+from app.db.models import Asset, TelemetrySnapshot
+from app.db.session import SessionLocal
+from app.services.snapshot_store import snapshot_store
+from app.utils.metrics import DASHBOARD_RECONCILE_DRIFT, DASHBOARD_RECONCILE_SECONDS
+from loguru import logger
+
+CRITICAL_DAMAGE = 0.7 # damage above which an asset counts as a critical risk
+
+COUNTERS = ("asset_count", "snapshot_count", "critical_count", "predictions_run")
+# Fields reconciliation can recompute from the tables (predictions_run is only counted on ingest)
+ABSOLUTE_FIELDS = ("asset_count", "snapshot_count", "critical_count", "damage_sum")
+RECONCILE_LOCK_KEY = "dashboard:reconcile:leader"
+
+# Applies one tenant's flushed deltas. KEYS[1]: stats hash; ARGV: time the
+# deltas started accumulating, then field/amount pairs. Deltas of the absolute
+# fields that started before the last recount are dropped: their changes were
+# committed, hence counted, by then.
+FLUSH_SCRIPT = """
+local fence = tonumber(redis.call('HGET', KEYS[1], 'reconciled_at') or '0')
+local stale = tonumber(ARGV[1]) < fence
+for i = 2, #ARGV, 2 do
+    local field = ARGV[i]
+    if field == 'predictions_run' then
+        redis.call('HINCRBY', KEYS[1], field, ARGV[i + 1])
+    elseif not stale then
+        if field == 'damage_sum' then
+            redis.call('HINCRBYFLOAT', KEYS[1], field, ARGV[i + 1])
+        else
+            redis.call('HINCRBY', KEYS[1], field, ARGV[i + 1])
+        end
+    end
+end
+return stale and 1 or 0
+"""
+
+def _stats_key(tenant_id: str) -> str:
+    return f"tenant:{tenant_id}:dashboard"
+
+def _heartbeat_key(tenant_id: str) -> str:
+    return f"tenant:{tenant_id}:heartbeats"
+
+class DashboardAggregates:
+    """
+    Per-tenant dashboard counters kept up to date by the ingest path.
+
+    Deltas are accumulated in-process and flushed to a Redis hash in one
+    pipeline per interval; last heartbeats go to a sorted set so the
+    active-device count is a single ZCOUNT. Reads never touch the asset or
+    snapshot tables. A periodic reconciliation recomputes the absolute values
+    from the database to correct any drift (lost flushes, crashed workers).
+
+    Reconciliation runs on one worker at a time (a Redis lock), and records
+    when it recounted: deltas any worker accumulated before that point are
+    already in the count and are dropped at their flush instead of being
+    added twice. A delta that straddles the recount is dropped whole; the
+    next reconciliation restores it.
+    """
+    def __init__(self):
+        self._deltas: Dict[str, Dict[str, float]] = {}
+        self._since: Dict[str, float] = {}
+        self._heartbeats: Dict[str, Dict[str, float]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        tenant_id: str,
+        damage_delta: float = 0.0,
+        critical_delta: int = 0,
+        predictions: int = 0,
+        assets_added: int = 0,
+        snapshots_added: int = 0,
+        heartbeats: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Accumulates changes for the next flush. Never blocks.
+        """
+        delta = self._deltas.get(tenant_id)
+        if delta is None:
+            delta = self._deltas[tenant_id] = dict.fromkeys(("damage_sum",) + COUNTERS, 0)
+            self._since[tenant_id] = time.time()
+        delta["damage_sum"] += damage_delta
+        delta["critical_count"] += critical_delta
+        delta["predictions_run"] += predictions
+        delta["asset_count"] += assets_added
+        delta["snapshot_count"] += snapshots_added
+        if heartbeats:
+            self._heartbeats.setdefault(tenant_id, {}).update(heartbeats)
+
+    async def get(self, tenant_id: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        """
+        Current aggregates for a tenant, including this process's unflushed deltas.
+        Falls back to computing them from the tables if Redis has nothing yet.
+        """
+        stats = None
+        active = 0
+        if state_cache.client is not None:
+            try:
+                async with state_cache.client.pipeline(transaction=False) as pipe:
+                    pipe.hgetall(_stats_key(tenant_id))
+                    pipe.zcount(_heartbeat_key(tenant_id), time.time() - settings.DASHBOARD_ACTIVE_WINDOW, "+inf")
+                    raw, active = await pipe.execute()
+                if b"asset_count" in raw:
+                    stats = {k.decode(): float(v) for k, v in raw.items()}
+            except Exception as e:
+                logger.warning(f"Dashboard aggregate read failed: {e}")
+
+        if stats is None:
+            recounted_at = time.time()
+            if db is None:
+                async with SessionLocal() as session:
+                    stats = await self._compute(session, tenant_id)
+            else:
+                stats = await self._compute(db, tenant_id)
+            await self._store(tenant_id, stats, recounted_at)
+        else:
+            # Same rule as the flush: absolute deltas from before the last recount are already counted
+            counted = self._since.get(tenant_id, 0.0) < stats.get("reconciled_at", 0.0)
+            for field, value in self._deltas.get(tenant_id, {}).items():
+                if not (counted and field in ABSOLUTE_FIELDS):
+                    stats[field] = stats.get(field, 0) + value
+        cutoff = time.time() - settings.DASHBOARD_ACTIVE_WINDOW
+        active += sum(1 for t in self._heartbeats.get(tenant_id, {}).values() if t >= cutoff)
+
+        snapshots = stats.get("snapshot_count", 0)
+        avg_damage = stats.get("damage_sum", 0.0) / snapshots if snapshots else 0.0
+        return {
+            "total_assets": int(stats.get("asset_count", 0)),
+            "active_devices": int(active),
+            "critical_risks": int(stats.get("critical_count", 0)),
+            "avg_health": round((1.0 - avg_damage) * 100, 1),
+            "predictions_run": int(stats.get("predictions_run", 0)),
+        }
+
+    async def _compute(self, db: AsyncSession, tenant_id: Optional[str] = None) -> Any:
+        """
+        Absolute aggregates from the tables, for one tenant or (tenant_id=None) all of them.
+        """
+        asset_stmt = select(Asset.tenant_id, func.count(Asset.id)).group_by(Asset.tenant_id)
+        snapshot_stmt = select(
+            TelemetrySnapshot.tenant_id,
+            # Snapshots with a damage value, the denominator of the average; the
+            # (tenant_id, current_damage) index covers the query
+            func.count(TelemetrySnapshot.current_damage),
+            func.coalesce(func.sum(TelemetrySnapshot.current_damage), 0.0),
+            func.count(case((TelemetrySnapshot.current_damage > CRITICAL_DAMAGE, 1))),
+        ).group_by(TelemetrySnapshot.tenant_id)
+        if tenant_id is not None:
+            asset_stmt = asset_stmt.where(Asset.tenant_id == tenant_id)
+            snapshot_stmt = snapshot_stmt.where(TelemetrySnapshot.tenant_id == tenant_id)
+
+        totals: Dict[str, Dict[str, float]] = {}
+        for tid, count in (await db.execute(asset_stmt)).all():
+            totals.setdefault(tid, {})["asset_count"] = count
+        for tid, count, damage_sum, critical in (await db.execute(snapshot_stmt)).all():
+            totals.setdefault(tid, {}).update(snapshot_count=count, damage_sum=damage_sum, critical_count=critical)
+        for stats in totals.values():
+            for field in ABSOLUTE_FIELDS:
+                stats.setdefault(field, 0)
+
+        if tenant_id is not None:
+            return totals.get(tenant_id, dict.fromkeys(ABSOLUTE_FIELDS, 0))
+        return totals
+
+    async def _store(self, tenant_id: str, stats: Dict[str, float], recounted_at: float) -> Optional[Dict[str, float]]:
+        """
+        Overwrites the absolute values (not predictions_run, which only the ingest path
+        knows) with those counted at `recounted_at`, and returns what was there before.
+        """
+        if state_cache.client is None:
+            return None
+        key = _stats_key(tenant_id)
+        try:
+            async with state_cache.client.pipeline(transaction=True) as pipe:
+                pipe.hgetall(key)
+                pipe.hset(key, mapping={**{field: stats[field] for field in ABSOLUTE_FIELDS}, "reconciled_at": recounted_at})
+                pipe.zremrangebyscore(_heartbeat_key(tenant_id), "-inf", time.time() - settings.DASHBOARD_ACTIVE_WINDOW)
+                previous, _, _ = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Dashboard aggregate write failed: {e}")
+            return None
+        return {k.decode(): float(v) for k, v in previous.items()}
+
+    async def flush(self):
+        if state_cache.client is None:
+            # No shared store: reads compute from the tables, only local heartbeats are kept
+            self._deltas.clear()
+            self._since.clear()
+            cutoff = time.time() - settings.DASHBOARD_ACTIVE_WINDOW
+            for members in self._heartbeats.values():
+                for aid in [aid for aid, t in members.items() if t < cutoff]:
+                    del members[aid]
+            return
+        if not (self._deltas or self._heartbeats):
+            return
+        deltas, self._deltas = self._deltas, {}
+        since, self._since = self._since, {}
+        heartbeats, self._heartbeats = self._heartbeats, {}
+        try:
+            async with state_cache.client.pipeline(transaction=False) as pipe:
+                for tenant_id, delta in deltas.items():
+                    changes = []
+                    if delta["damage_sum"]:
+                        changes += ["damage_sum", delta["damage_sum"]]
+                    for field in COUNTERS:
+                        if delta[field]:
+                            changes += [field, int(delta[field])]
+                    if changes:
+                        pipe.eval(FLUSH_SCRIPT, 1, _stats_key(tenant_id), since[tenant_id], *changes)
+                for tenant_id, members in heartbeats.items():
+                    pipe.zadd(_heartbeat_key(tenant_id), members)
+                await pipe.execute()
+        except Exception as e:
+            # Keep the deltas for the next attempt; reconciliation catches anything lost
+            logger.warning(f"Dashboard aggregate flush failed: {e}")
+            for tenant_id, delta in deltas.items():
+                self.record(tenant_id, delta["damage_sum"], int(delta["critical_count"]), int(delta["predictions_run"]),
+                            int(delta["asset_count"]), int(delta["snapshot_count"]))
+                self._since[tenant_id] = min(since[tenant_id], self._since[tenant_id])
+            for tenant_id, members in heartbeats.items():
+                pending = self._heartbeats.setdefault(tenant_id, {})
+                for aid, t in members.items():
+                    pending[aid] = max(t, pending.get(aid, t))
+
+    async def reconcile(self) -> bool:
+        """
+        Recomputes absolute aggregates for every tenant from the tables and
+        overwrites the Redis values, logging any drift that was corrected.
+        Returns False, doing nothing, if another worker holds the leader lock
+        (or there is no Redis to reconcile).
+        """
+        await self.flush()
+        if state_cache.client is None:
+            return False
+        try:
+            # Expires rather than being released, so workers reconcile at most once per interval between them
+            leader = await state_cache.client.set(
+                RECONCILE_LOCK_KEY, os.getpid(), nx=True, ex=max(1, int(settings.DASHBOARD_RECONCILE_INTERVAL))
+            )
+        except Exception as e:
+            logger.warning(f"Dashboard reconciliation lock failed: {e}")
+            return False
+        if not leader:
+            return False
+
+        start = time.perf_counter()
+        await snapshot_store.checkpoint()
+        recounted_at = time.time()
+        async with SessionLocal() as db:
+            totals = await self._compute(db)
+        for tenant_id, stats in totals.items():
+            previous = await self._store(tenant_id, stats, recounted_at)
+            if not previous:
+                continue
+            drift = {
+                field: stats[field] - previous.get(field, 0)
+                for field in stats
+                if abs(stats[field] - previous.get(field, 0)) > 1e-6
+            }
+            if drift:
+                DASHBOARD_RECONCILE_DRIFT.inc()
+                logger.warning(f"Dashboard aggregates for tenant {tenant_id} drifted, corrected by {drift}")
+        DASHBOARD_RECONCILE_SECONDS.observe(time.perf_counter() - start)
+        return True
+
+    async def start(self):
+        if not self._flush_task:
+            self._flush_task = asyncio.create_task(self._run_flush())
+        if settings.DASHBOARD_RECONCILE_INTERVAL > 0 and not self._reconcile_task:
+            self._reconcile_task = asyncio.create_task(self._run_reconcile())
+
+    async def stop(self):
+        for task in (self._flush_task, self._reconcile_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flush_task = self._reconcile_task = None
+        await self.flush()
+
+    async def _run_flush(self):
+        while True:
+            await asyncio.sleep(settings.DASHBOARD_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def _run_reconcile(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Dashboard reconciliation failed: {e}")
+            await asyncio.sleep(settings.DASHBOARD_RECONCILE_INTERVAL)
+
+dashboard_aggregates = DashboardAggregates()
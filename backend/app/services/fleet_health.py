@@ -0,0 +1,181 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from prometheus_client.core import GaugeMetricFamily, HistogramMetricFamily
+from sqlalchemy import select, func, case
+from app.core.config import settings
+from app.db.models import Asset, TelemetrySnapshot
+from app.db.session import ReadSessionLocal
+from app.services.dashboard import CRITICAL_DAMAGE
+from app.utils.metrics import FLEET_EXPORT_SECONDS, register_collector
+from loguru import logger
+
+DAMAGE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+RUL_BUCKETS = (24.0, 72.0, 168.0, 720.0, 2160.0, 4380.0, 8760.0) # hours: 1d, 3d, 1w, 30d, 90d, 6mo, 1y
+NO_FAILURE_RUL = 99999.0 # RULEngine sentinel, kept out of the RUL histogram
+
+# Series each tenant/type/asset costs in the export
+TENANT_SERIES = (len(DAMAGE_BUCKETS) + 3) + (len(RUL_BUCKETS) + 3) + 1 # buckets + Inf, count, sum; asset gauge
+TYPE_SERIES = 4
+WORST_SERIES = 2
+
+def _bucket_columns(column, bounds):
+    return [func.sum(case((column <= bound, 1), else_=0)) for bound in bounds]
+
+class FleetHealthExport:
+    """
+    Fleet health for Prometheus without a series per asset.
+
+    A background task aggregates the snapshot table in bulk every
+    FLEET_EXPORT_INTERVAL seconds: per-tenant damage and RUL histograms,
+    per-(tenant, asset type) summaries and the FLEET_EXPORT_TOP_K
+    lowest-RUL assets per tenant. Scrapes only read that precomputed result,
+    capped at FLEET_EXPORT_MAX_SERIES (tenant histograms first, then type
+    summaries, then worst assets; largest tenants first).
+    """
+    def __init__(self):
+        self._families: List = []
+        self._task: Optional[asyncio.Task] = None
+        self._registered = False
+
+    def collect(self):
+        return list(self._families)
+
+    async def refresh(self):
+        start = time.perf_counter()
+        async with ReadSessionLocal() as db:
+            damage = TelemetrySnapshot.current_damage
+            rul = TelemetrySnapshot.current_rul
+            finite_rul = case((rul < NO_FAILURE_RUL, rul))
+            tenants = (await db.execute(
+                select(
+                    TelemetrySnapshot.tenant_id,
+                    func.count(),
+                    func.coalesce(func.sum(damage), 0.0),
+                    func.count(finite_rul),
+                    func.coalesce(func.sum(finite_rul), 0.0),
+                    *_bucket_columns(damage, DAMAGE_BUCKETS),
+                    *_bucket_columns(finite_rul, RUL_BUCKETS),
+                ).group_by(TelemetrySnapshot.tenant_id)
+            )).all()
+            types = (await db.execute(
+                select(
+                    TelemetrySnapshot.tenant_id,
+                    func.coalesce(Asset.type, "unknown"),
+                    func.count(),
+                    func.avg(damage),
+                    func.min(rul),
+                    func.count(case((damage > CRITICAL_DAMAGE, 1))),
+                )
+                .join(Asset, Asset.id == TelemetrySnapshot.asset_id)
+                .group_by(TelemetrySnapshot.tenant_id, func.coalesce(Asset.type, "unknown"))
+            )).all()
+            ranked = select(
+                TelemetrySnapshot.tenant_id, TelemetrySnapshot.asset_id, damage, rul,
+                func.row_number().over(partition_by=TelemetrySnapshot.tenant_id, order_by=rul.asc()).label("rank"),
+            ).where(rul.is_not(None), rul < NO_FAILURE_RUL).subquery()
+            worst = (await db.execute(
+                select(ranked.c.tenant_id, ranked.c.asset_id, ranked.c.current_damage, ranked.c.current_rul)
+                .where(ranked.c.rank <= settings.FLEET_EXPORT_TOP_K)
+            )).all()
+        self._families = self._build(tenants, types, worst)
+        FLEET_EXPORT_SECONDS.observe(time.perf_counter() - start)
+
+    def _build(self, tenants, types, worst) -> List:
+        budget = settings.FLEET_EXPORT_MAX_SERIES
+        dropped = 0
+        # Largest tenants keep their series when the budget runs out
+        tenants = sorted(tenants, key=lambda row: row[1], reverse=True)
+        kept: Dict[str, int] = {}
+        for row in tenants:
+            if budget >= TENANT_SERIES:
+                kept[row[0]] = row[1]
+                budget -= TENANT_SERIES
+            else:
+                dropped += TENANT_SERIES
+
+        def within_budget(rows: List[Tuple], cost: int, order) -> List[Tuple]:
+            nonlocal budget, dropped
+            rows = sorted((row for row in rows if row[0] in kept), key=order)
+            fits = min(len(rows), budget // cost)
+            budget -= fits * cost
+            dropped += (len(rows) - fits) * cost
+            return rows[:fits]
+
+        types = within_budget(types, TYPE_SERIES, lambda row: (-kept[row[0]], -row[2]))
+        worst = within_budget(worst, WORST_SERIES, lambda row: (-kept[row[0]], row[3]))
+
+        assets = GaugeMetricFamily("forsee_fleet_assets", "Assets with a telemetry snapshot", labels=["tenant_id"])
+        damage_hist = HistogramMetricFamily("forsee_fleet_damage", "Cumulative damage across the tenant's assets", labels=["tenant_id"])
+        rul_hist = HistogramMetricFamily(
+            "forsee_fleet_rul_hours", "Predicted RUL across the tenant's degrading assets (no-failure sentinel excluded)", labels=["tenant_id"]
+        )
+        for row in tenants:
+            tenant_id, count, damage_sum, rul_count, rul_sum = row[:5]
+            if tenant_id not in kept:
+                continue
+            damage_counts = row[5:5 + len(DAMAGE_BUCKETS)]
+            rul_counts = row[5 + len(DAMAGE_BUCKETS):]
+            assets.add_metric([tenant_id], count)
+            damage_hist.add_metric(
+                [tenant_id],
+                [(str(b), c or 0) for b, c in zip(DAMAGE_BUCKETS, damage_counts)] + [("+Inf", count)],
+                sum_value=damage_sum,
+            )
+            rul_hist.add_metric(
+                [tenant_id],
+                [(str(b), c or 0) for b, c in zip(RUL_BUCKETS, rul_counts)] + [("+Inf", rul_count)],
+                sum_value=rul_sum,
+            )
+
+        type_labels = ["tenant_id", "asset_type"]
+        type_assets = GaugeMetricFamily("forsee_fleet_type_assets", "Assets per asset type", labels=type_labels)
+        type_damage = GaugeMetricFamily("forsee_fleet_type_damage_avg", "Mean cumulative damage per asset type", labels=type_labels)
+        type_rul = GaugeMetricFamily("forsee_fleet_type_rul_min_hours", "Lowest predicted RUL per asset type", labels=type_labels)
+        type_critical = GaugeMetricFamily("forsee_fleet_type_critical", "Assets above the critical damage level per asset type", labels=type_labels)
+        for tenant_id, asset_type, count, avg_damage, min_rul, critical in types:
+            type_assets.add_metric([tenant_id, asset_type], count)
+            type_damage.add_metric([tenant_id, asset_type], avg_damage or 0.0)
+            type_rul.add_metric([tenant_id, asset_type], NO_FAILURE_RUL if min_rul is None else min_rul)
+            type_critical.add_metric([tenant_id, asset_type], critical)
+
+        worst_labels = ["tenant_id", "asset_id"]
+        worst_rul = GaugeMetricFamily("forsee_fleet_worst_asset_rul_hours", "Predicted RUL of the tenant's lowest-RUL assets", labels=worst_labels)
+        worst_damage = GaugeMetricFamily("forsee_fleet_worst_asset_damage", "Cumulative damage of the tenant's lowest-RUL assets", labels=worst_labels)
+        for tenant_id, asset_id, damage, rul in worst:
+            worst_rul.add_metric([tenant_id, asset_id], rul)
+            worst_damage.add_metric([tenant_id, asset_id], damage or 0.0)
+
+        series = GaugeMetricFamily("forsee_fleet_export_series", "Series emitted by the fleet health export")
+        series.add_metric([], settings.FLEET_EXPORT_MAX_SERIES - budget)
+        truncated = GaugeMetricFamily("forsee_fleet_export_dropped_series", "Series left out to stay within FLEET_EXPORT_MAX_SERIES")
+        truncated.add_metric([], dropped)
+        if dropped:
+            logger.warning(f"Fleet health export over budget: {dropped} series dropped")
+        return [assets, damage_hist, rul_hist, type_assets, type_damage, type_rul, type_critical, worst_rul, worst_damage, series, truncated]
+
+    async def start(self):
+        if not self._registered:
+            register_collector(self)
+            self._registered = True
+        if settings.FLEET_EXPORT_INTERVAL > 0 and not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Fleet health export refresh failed: {e}")
+            await asyncio.sleep(settings.FLEET_EXPORT_INTERVAL)
+
+fleet_health_export = FleetHealthExport()
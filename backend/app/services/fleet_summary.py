@@ -0,0 +1,107 @@
+import heapq
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.models import AuditLog, TelemetrySnapshot
+from app.db.session import stream_rows
+from app.services.dashboard import dashboard_aggregates
+
+NO_FAILURE_RUL = 99999.0 # RULEngine sentinel for "no measurable degradation"
+
+# (asset_id, load, threshold_load, epoch seconds)
+Violation = Tuple[str, float, float, float]
+
+class _TenantFleet:
+    def __init__(self):
+        self.ruls: Dict[str, float] = {}
+        self.violations: Deque[Violation] = deque(maxlen=settings.CHATBOT_FLEET_SUMMARY_ITEMS)
+        self.loaded_at = 0.0
+        self.rendered_at = 0.0
+        self.last_used = 0.0
+        self.text = ""
+
+class FleetSummary:
+    """
+    Compact per-tenant fleet description for chatbot prompts: lowest-RUL
+    assets, recent load violations and the dashboard health figures.
+
+    A tenant is loaded from the database on its first chat turn and then kept
+    current by the ingest path through observe(); the reload every
+    CHATBOT_FLEET_SUMMARY_RELOAD seconds only picks up what other workers
+    ingested. The rendered text is reused for CHATBOT_FLEET_SUMMARY_REFRESH
+    seconds, so chat turns neither query nor re-render.
+    """
+    def __init__(self):
+        self._tenants: Dict[str, _TenantFleet] = {}
+
+    def tracks(self, tenant_id: str) -> bool:
+        """
+        True if observe() for this tenant is worth calling (someone chatted recently).
+        """
+        return tenant_id in self._tenants
+
+    def observe(self, tenant_id: str, ruls: Dict[str, float], violations: Iterable[Violation] = ()):
+        fleet = self._tenants.get(tenant_id)
+        if fleet is None:
+            return
+        fleet.ruls.update(ruls)
+        fleet.violations.extend(violations)
+
+    async def get(self, db: AsyncSession, tenant_id: str) -> str:
+        now = time.time()
+        fleet = self._tenants.get(tenant_id)
+        if fleet is None:
+            self._evict_idle(now)
+            fleet = self._tenants[tenant_id] = _TenantFleet()
+        fleet.last_used = now
+        if now - fleet.loaded_at > settings.CHATBOT_FLEET_SUMMARY_RELOAD:
+            await self._load(db, tenant_id, fleet)
+            fleet.loaded_at = now
+            fleet.rendered_at = 0.0
+        if now - fleet.rendered_at > settings.CHATBOT_FLEET_SUMMARY_REFRESH:
+            fleet.text = self._render(fleet, await dashboard_aggregates.get(tenant_id, db))
+            fleet.rendered_at = now
+        return fleet.text
+
+    async def _load(self, db: AsyncSession, tenant_id: str, fleet: _TenantFleet):
+        rows = stream_rows(db, (
+            select(TelemetrySnapshot.asset_id, TelemetrySnapshot.current_rul)
+            .where(TelemetrySnapshot.tenant_id == tenant_id, TelemetrySnapshot.current_rul.is_not(None))
+        ))
+        fleet.ruls = {asset_id: rul async for asset_id, rul in rows}
+        entries = await db.scalars(
+            select(AuditLog)
+            .where(AuditLog.tenant_id == tenant_id, AuditLog.action == "violation_detected")
+            .order_by(AuditLog.id.desc())
+            .limit(settings.CHATBOT_FLEET_SUMMARY_ITEMS)
+        )
+        fleet.violations.clear()
+        for entry in reversed(entries.all()):
+            value = entry.new_value or {}
+            at = entry.created_at.timestamp() if entry.created_at else 0.0
+            fleet.violations.append((entry.entity_id, value.get("load") or 0.0, value.get("threshold_load") or 0.0, at))
+
+    def _render(self, fleet: _TenantFleet, stats: Dict[str, float]) -> str:
+        lines = [
+            f"Fleet: {stats['total_assets']} assets, {stats['active_devices']} reporting, "
+            f"average health {stats['avg_health']}%, {stats['critical_risks']} at critical damage."
+        ]
+        worst = heapq.nsmallest(settings.CHATBOT_FLEET_SUMMARY_ITEMS, fleet.ruls.items(), key=lambda item: item[1])
+        worst = [(aid, rul) for aid, rul in worst if rul < NO_FAILURE_RUL]
+        if worst:
+            lines.append("Lowest RUL: " + ", ".join(f"{aid} {rul:.0f} h" for aid, rul in worst) + ".")
+        if fleet.violations:
+            lines.append("Recent load violations: " + ", ".join(
+                f"{aid} {load:.1f} > {threshold:.1f} at {time.strftime('%Y-%m-%d %H:%M', time.gmtime(at))} UTC"
+                for aid, load, threshold, at in reversed(fleet.violations)
+            ) + ".")
+        return "\n".join(lines)
+
+    def _evict_idle(self, now: float):
+        for tenant_id in [t for t, fleet in self._tenants.items() if now - fleet.last_used > settings.CHATBOT_FLEET_SUMMARY_IDLE]:
+            del self._tenants[tenant_id]
+
+fleet_summary = FleetSummary()
@@ -0,0 +1,298 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+import numpy as np
+from app.core.config import settings
+from loguru import logger
+
+# One raw record per processed reading, kept in time order per asset
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("load", "<f4"),
+    ("temp", "<f4"),
+    ("damage", "<f8"),
+    ("rul", "<f4"),
+])
+FIELDS = ("load", "temp", "damage", "rul")
+
+# Closed days also get per-minute and per-hour rollups so long ranges never scan raw data
+ROLLUP_LEVELS = (3600, 60)
+ROLLUP_DTYPE = np.dtype(
+    [("t", "<f8"), ("count", "<i4")]
+    + [(f"{field}_{agg}", "<f8") for field in FIELDS for agg in ("min", "max", "mean")]
+)
+DAY_SECONDS = 86400
+
+def _safe_name(value: str) -> str:
+    return quote(value, safe="").replace(".", "%2E")
+
+def _day_of(t: float) -> int:
+    return int(t // DAY_SECONDS)
+
+class HistoryStore:
+    """
+    Append-only telemetry history in time-partitioned columnar segments.
+
+    Layout: {HISTORY_DIR}/{tenant}/{asset}/{day}.seg holds packed RECORD_DTYPE rows
+    for one UTC day, read back through np.memmap. Appends are buffered in memory
+    and written by a background task every HISTORY_FLUSH_INTERVAL seconds, which
+    also drops days older than HISTORY_RETENTION_DAYS once a day.
+    """
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.HISTORY_DIR
+        self._buffer: Dict[Tuple[str, str], List[np.ndarray]] = defaultdict(list)
+        self._task: Optional[asyncio.Task] = None
+        # Rollups of closed days are immutable; keep recently used ones in memory
+        self._rollups: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        # Used from the flush thread and from query threads
+        self._rollups_lock = threading.Lock()
+
+    def append(self, tenant_id: str, asset_ids: List[str], t, load, temp, damage, rul):
+        """
+        Buffers one record per entry of the given (equally sized) columns.
+        """
+        if not settings.HISTORY_ENABLED:
+            return
+        records = np.empty(len(asset_ids), dtype=RECORD_DTYPE)
+        records["t"] = t
+        records["load"] = load
+        records["temp"] = temp
+        records["damage"] = damage
+        records["rul"] = rul
+        if len(asset_ids) == 1:
+            self._buffer[(tenant_id, asset_ids[0])].append(records)
+            return
+        codes = defaultdict(list)
+        for i, aid in enumerate(asset_ids):
+            codes[aid].append(i)
+        for aid, rows in codes.items():
+            self._buffer[(tenant_id, aid)].append(records[rows])
+
+    async def start(self):
+        if settings.HISTORY_ENABLED and not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        pruned_day = None
+        while True:
+            await asyncio.sleep(settings.HISTORY_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+                today = _day_of(time.time())
+                if settings.HISTORY_RETENTION_DAYS and today != pruned_day:
+                    await loop.run_in_executor(None, self.prune, today - settings.HISTORY_RETENTION_DAYS)
+                    pruned_day = today
+            except Exception as e:
+                logger.error(f"History flush failed: {e}")
+
+    def prune(self, before_day: int):
+        """
+        Deletes segments, and their rollups, of days before `before_day`.
+        """
+        removed = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                day = name.split(".", 1)[0]
+                if name.endswith(".seg") and day.lstrip("-").isdigit() and int(day) < before_day:
+                    path = os.path.join(directory, name)
+                    os.remove(path)
+                    with self._rollups_lock:
+                        self._rollups.pop(path, None)
+                    removed += 1
+        if removed:
+            logger.info(f"History retention removed {removed} segment files before day {before_day}")
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        buffer, self._buffer = self._buffer, defaultdict(list)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write, buffer)
+
+    def _write(self, buffer: Dict[Tuple[str, str], List[np.ndarray]]):
+        for (tenant_id, asset_id), chunks in buffer.items():
+            records = np.concatenate(chunks)
+            # Readings arrive in receive order, not reading time; segments are kept sorted
+            records = records[np.argsort(records["t"], kind="stable")]
+            days = (records["t"] // DAY_SECONDS).astype(np.int64)
+            directory = self._asset_dir(tenant_id, asset_id)
+            os.makedirs(directory, exist_ok=True)
+            for day in np.unique(days):
+                _append_sorted(os.path.join(directory, f"{day}.seg"), records[days == day])
+            # Data for a new day closes the previous one: build its rollups now,
+            # off the query path
+            previous = os.path.join(directory, f"{days.min() - 1}.seg")
+            if os.path.exists(previous):
+                self._rollup(previous, ROLLUP_LEVELS[0])
+
+    def _asset_dir(self, tenant_id: str, asset_id: str) -> str:
+        return os.path.join(self.root, _safe_name(tenant_id), _safe_name(asset_id))
+
+    def query(self, tenant_id: str, asset_id: str, start: float, end: float,
+              points: int = 1000, method: str = "minmax", field: str = "damage") -> Dict[str, List[Any]]:
+        """
+        Returns at most `points` samples for [start, end] (epoch seconds).
+        method='minmax' keeps each bucket's min and max per field;
+        method='lttb' picks representative points of `field` (Largest-Triangle-Three-Buckets).
+        """
+        bucket_width = (end - start) / max(points, 1)
+        # Coarsest rollup that still leaves several rows per output bucket
+        level = next((seconds for seconds in ROLLUP_LEVELS if 4 * seconds <= bucket_width), None)
+        frame = self._frame(tenant_id, asset_id, start, end, level)
+        if frame.size == 0:
+            return {"t": []}
+        if method == "lttb":
+            return _lttb(frame, points, field)
+        return _minmax(frame, start, end, max(points // 2, 1))
+
+    def _frame(self, tenant_id: str, asset_id: str, start: float, end: float, level: Optional[int]) -> np.ndarray:
+        """
+        Rows in ROLLUP_DTYPE covering [start, end]: rollups for closed days when a
+        level is given, raw records (count=1) otherwise and for the current day.
+        """
+        directory = self._asset_dir(tenant_id, asset_id)
+        today = _day_of(time.time())
+        parts: List[np.ndarray] = []
+        for day in range(_day_of(start), _day_of(end) + 1):
+            path = os.path.join(directory, f"{day}.seg")
+            if not os.path.exists(path) or os.path.getsize(path) < RECORD_DTYPE.itemsize:
+                continue
+            if level and day < today:
+                rows = self._rollup(path, level)
+                lo, hi = np.searchsorted(rows["t"], [start - level, end], side="right")
+                parts.append(rows[lo:hi])
+            else:
+                raw = _open_segment(path)
+                lo, hi = np.searchsorted(raw["t"], [start, end], side="left")
+                parts.append(_as_rollup_rows(raw[lo:hi]))
+        # Preallocated copy; np.concatenate is slow on structured dtypes
+        frame = np.empty(sum(part.size for part in parts), dtype=ROLLUP_DTYPE)
+        offset = 0
+        for part in parts:
+            frame[offset:offset + part.size] = part
+            offset += part.size
+        return frame
+
+    def _rollup(self, path: str, seconds: int) -> np.ndarray:
+        rollup_path = path[:-len(".seg")] + f".r{seconds}.seg"
+        mtime = os.path.getmtime(path)
+        with self._rollups_lock:
+            cached = self._rollups.get(rollup_path)
+            if cached and cached[0] >= mtime:
+                self._rollups.move_to_end(rollup_path)
+                return cached[1]
+
+        if os.path.exists(rollup_path) and os.path.getmtime(rollup_path) >= mtime:
+            rows = np.fromfile(rollup_path, dtype=ROLLUP_DTYPE)
+        else:
+            finer = [level for level in ROLLUP_LEVELS if level < seconds and seconds % level == 0]
+            source = self._rollup(path, max(finer)) if finer else _as_rollup_rows(_open_segment(path))
+            rows = _aggregate(source, seconds)
+            rows.tofile(rollup_path)
+
+        with self._rollups_lock:
+            self._rollups[rollup_path] = (mtime, rows)
+            while len(self._rollups) > settings.HISTORY_ROLLUP_CACHE_SIZE:
+                self._rollups.popitem(last=False)
+        return rows
+
+def _as_rollup_rows(raw: np.ndarray) -> np.ndarray:
+    rows = np.empty(raw.size, dtype=ROLLUP_DTYPE)
+    rows["t"] = raw["t"]
+    rows["count"] = 1
+    for field in FIELDS:
+        values = raw[field]
+        rows[f"{field}_min"] = values
+        rows[f"{field}_max"] = values
+        rows[f"{field}_mean"] = values
+    return rows
+
+def _aggregate(source: np.ndarray, seconds: int) -> np.ndarray:
+    slot = (source["t"] // seconds).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, slot[1:] != slot[:-1]])
+    counts = np.add.reduceat(source["count"], starts)
+    rows = np.empty(starts.size, dtype=ROLLUP_DTYPE)
+    rows["t"] = slot[starts] * seconds
+    rows["count"] = counts
+    for field in FIELDS:
+        rows[f"{field}_min"] = np.minimum.reduceat(source[f"{field}_min"], starts)
+        rows[f"{field}_max"] = np.maximum.reduceat(source[f"{field}_max"], starts)
+        rows[f"{field}_mean"] = np.add.reduceat(source[f"{field}_mean"] * source["count"], starts) / counts
+    return rows
+
+def _append_sorted(path: str, records: np.ndarray):
+    """
+    Appends time-sorted records to a segment. Records older than the segment's
+    last one (late readings) are merged in by rewriting it, so segments stay
+    sorted for searchsorted and the rollups.
+    """
+    if os.path.exists(path) and os.path.getsize(path) >= RECORD_DTYPE.itemsize:
+        existing = _open_segment(path)
+        if records["t"][0] < existing["t"][-1]:
+            merged = np.concatenate([np.asarray(existing), records])
+            merged = merged[np.argsort(merged["t"], kind="stable")]
+            # Open memmaps keep the old file; a rollup is rebuilt from the new mtime
+            merged.tofile(path + ".tmp")
+            os.replace(path + ".tmp", path)
+            return
+    with open(path, "ab") as f:
+        f.write(records.tobytes())
+
+def _open_segment(path: str) -> np.ndarray:
+    size = os.path.getsize(path) // RECORD_DTYPE.itemsize
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(size,))
+
+def _minmax(frame: np.ndarray, start: float, end: float, buckets: int) -> Dict[str, List[Any]]:
+    edges = np.linspace(min(start, frame["t"][0]), end, buckets + 1)
+    bounds = np.searchsorted(frame["t"], edges[:-1], side="left")
+    counts = np.diff(np.r_[bounds, frame["t"].size])
+    occupied = counts > 0
+    idx = bounds[occupied]
+    result: Dict[str, List[Any]] = {"t": edges[:-1][occupied].tolist()}
+    for field in FIELDS:
+        result[f"{field}_min"] = np.minimum.reduceat(frame[f"{field}_min"], idx).tolist()
+        result[f"{field}_max"] = np.maximum.reduceat(frame[f"{field}_max"], idx).tolist()
+    return result
+
+def _lttb(frame: np.ndarray, points: int, field: str) -> Dict[str, List[Any]]:
+    x = frame["t"]
+    y = frame[f"{field}_mean"]
+    n = x.size
+    if points >= n or points < 3:
+        selected = np.arange(n)
+    else:
+        selected = np.empty(points, dtype=np.int64)
+        selected[0], selected[-1] = 0, n - 1
+        every = (n - 2) / (points - 2)
+        a = 0
+        for i in range(points - 2):
+            lo = int(i * every) + 1
+            hi = int((i + 1) * every) + 1
+            next_hi = min(int((i + 2) * every) + 1, n)
+            # Average of the next bucket (or the last point) is the third triangle vertex
+            avg_x = x[hi:next_hi].mean() if next_hi > hi else x[-1]
+            avg_y = y[hi:next_hi].mean() if next_hi > hi else y[-1]
+            area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+            a = lo + int(np.argmax(area))
+            selected[i + 1] = a
+    result: Dict[str, List[Any]] = {"t": x[selected].tolist()}
+    for f in FIELDS:
+        result[f] = frame[f"{f}_mean"][selected].tolist()
+    return result
+
+history_store = HistoryStore()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set
+from app.core.cache import state_cache
+from app.core.config import settings
+from app.utils.metrics import LIVE_FEED_SUBSCRIBERS, LIVE_FEED_COALESCED
+from loguru import logger
+
+CHANNEL_PREFIX = "forsee:live:"
+
+class Subscription:
+    """
+    One connected client. Holds at most one pending state per asset: a consumer
+    that falls behind receives the latest value instead of a growing backlog.
+    """
+    def __init__(self, tenant_id: str, asset_ids: Optional[Iterable[str]] = None):
+        self.tenant_id = tenant_id
+        self.asset_ids: Optional[Set[str]] = set(asset_ids) if asset_ids else None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, states: Dict[str, Dict[str, Any]]):
+        for asset_id, state in states.items():
+            if self.asset_ids is not None and asset_id not in self.asset_ids:
+                continue
+            if asset_id in self._pending:
+                LIVE_FEED_COALESCED.inc()
+            self._pending[asset_id] = state
+            self._ready.set()
+
+    async def next(self, timeout: float) -> List[Dict[str, Any]]:
+        """
+        Waits up to `timeout` seconds and returns every pending state (empty on timeout).
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+class LiveFeed:
+    """
+    Fans asset state updates out to WebSocket/SSE subscribers.
+
+    Updates are delivered to this process's subscribers immediately and, when
+    Redis is available, coalesced per tenant and published to
+    forsee:live:{tenant_id} so subscribers connected to other workers (or fed
+    by the Kafka ingest worker) see them too.
+    """
+    def __init__(self):
+        self.node_id = uuid.uuid4().hex
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._outbox: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listen_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, tenant_id: str, asset_ids: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(tenant_id, asset_ids)
+        self._subscribers.setdefault(tenant_id, set()).add(subscription)
+        LIVE_FEED_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.tenant_id)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            LIVE_FEED_SUBSCRIBERS.dec()
+            if not subscribers:
+                del self._subscribers[subscription.tenant_id]
+
+    def publish(self, tenant_id: str, asset_id: str, state: Dict[str, Any]):
+        """
+        Called by the ingest path for every new asset state. Never blocks.
+        """
+        state = {"asset_id": asset_id, **state}
+        self._deliver(tenant_id, {asset_id: state})
+        if self._flush_task:
+            self._outbox.setdefault(tenant_id, {})[asset_id] = state
+
+    def _deliver(self, tenant_id: str, states: Dict[str, Dict[str, Any]]):
+        for subscription in self._subscribers.get(tenant_id, ()):
+            subscription.offer(states)
+
+    async def flush(self):
+        if not self._outbox or state_cache.client is None:
+            return
+        outbox, self._outbox = self._outbox, {}
+        try:
+            async with state_cache.client.pipeline(transaction=False) as pipe:
+                for tenant_id, states in outbox.items():
+                    pipe.publish(CHANNEL_PREFIX + tenant_id, json.dumps({"node": self.node_id, "states": states}))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Live feed publish of {len(outbox)} tenants failed: {e}")
+
+    async def start(self):
+        if state_cache.client is None or self._flush_task:
+            return
+        self._flush_task = asyncio.create_task(self._run_flush())
+        self._listen_task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        for task in (self._listen_task, self._flush_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flush_task = self._listen_task = None
+        await self.flush()
+
+    async def _run_flush(self):
+        interval = settings.LIVE_FEED_FLUSH_INTERVAL_MS / 1000
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    async def _listen(self):
+        while True:
+            try:
+                async with state_cache.client.pubsub() as pubsub:
+                    await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        tenant_id = message["channel"].decode()[len(CHANNEL_PREFIX):]
+                        if tenant_id not in self._subscribers:
+                            continue
+                        payload = json.loads(message["data"])
+                        if payload["node"] != self.node_id:
+                            self._deliver(tenant_id, payload["states"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Live feed listener failed, retrying: {e}")
+                await asyncio.sleep(5)
+
+live_feed = LiveFeed()
@@ -1,14 +1,32 @@
-from typing import Any, Dict
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.engines.shift import ShiftEngine
 from app.engines.damage import DamageEngine
 from app.engines.rul import RULEngine
 from app.engines.environmental import EnvironmentalEngine
+from app.engines.monte_carlo import MonteCarloRULEngine, FLEET_DEFAULTS, NO_FAILURE_RUL
+from app.engines.simulation import LOAD_PROFILES, DEFAULT_PROFILE
+from app.engines.base import to_columns
 from app.core.bus import bus
-from app.db.models import TelemetrySnapshot, Asset, AuditLog
-from redis import Redis
+from app.core.cache import state_cache
+from app.services.snapshot_store import snapshot_store
+from app.services.audit import audit_sink
+from app.services.history import history_store
+from app.services.config_cache import config_cache, CONFIG_FIELDS
+from app.services.dashboard import dashboard_aggregates, CRITICAL_DAMAGE
+from app.services.fleet_summary import fleet_summary
+from app.services.live_feed import live_feed
+from app.db.models import TelemetrySnapshot, Asset
 from app.core.config import settings
-from sqlalchemy import select, update
+from app.utils.metrics import FORECAST_REJECTED, INGEST_STAGE_SECONDS, PROCESSED_TELEMETRY, PROCESSING_TIME
+from app.utils.timing import current_timings
+from sqlalchemy import select
 from loguru import logger
 
 class ReliabilityService:
@@ -17,7 +35,9 @@ class ReliabilityService:
         self.damage_engine = DamageEngine()
         self.rul_engine = RULEngine()
         self.env_engine = EnvironmentalEngine()
-        self.redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+        self.monte_carlo_engine = MonteCarloRULEngine()
+        self._forecast_slots = asyncio.Semaphore(settings.MONTE_CARLO_CONCURRENCY)
+        self._forecasts_admitted = 0
 
     async def ingest_telemetry(self, db: AsyncSession, tenant_id: str, asset_id: str, telemetry: Dict[str, Any]):
         """
@@ -29,68 +49,534 @@ class ReliabilityService:
         5. RUL Calculation
         6. State Update (DB + Redis)
         7. Event Emission (Kafka)
+        Returns the updated snapshot, or None if the asset is unknown or belongs
+        to another tenant.
         """
-        # 1. Fetch Asset and Config (Simplified for demo, usually from Redis/DB Cache)
-        # config = await db.scalar(select(ShiftConfig).where(Asset.id == asset_id))
-        shift_config = {"threshold_load": 80.0, "penalty_weight": 0.4} # Mocked config
+        stages = _StageClock("single")
+        received = time.time()
+        # Current state; unknown assets and those of other tenants are not ingested
+        snapshots, owners = await snapshot_store.load(db, [asset_id])
+        if owners.get(asset_id) != tenant_id:
+            return None
+        stages.mark("snapshot_load")
+
+        # 1. Fetch Asset Config (tiered cache: local LRU -> Redis -> DB)
+        config = (await config_cache.resolve(db, tenant_id, [asset_id]))[asset_id]
+        stages.mark("config")
         
         # 2. Shift check
-        multiplier = await self.shift_engine.process(telemetry, shift_config)
+        multiplier = await self.shift_engine.process(telemetry, config)
         
         # 3. Env check
-        env_modifier = await self.env_engine.process(telemetry)
+        env_modifier = await self.env_engine.process(telemetry, config)
         total_multiplier = multiplier * env_modifier
+        stages.mark("engines")
         
         # 4. Damage Accumulation
-        # Current state
-        stmt = select(TelemetrySnapshot).where(TelemetrySnapshot.asset_id == asset_id)
-        snapshot = await db.scalar(stmt)
-        if not snapshot:
-            snapshot = TelemetrySnapshot(asset_id=asset_id, tenant_id=tenant_id, current_damage=0.0)
-            db.add(snapshot)
-            
         damage_increment = await self.damage_engine.process(telemetry, total_multiplier)
-        new_damage = snapshot.current_damage + damage_increment
-        
-        # 5. RUL Calculation (using recent rate)
-        # Assuming telemetry includes a timestamp-based rate or we calculate it here
-        damage_rate = damage_increment # Simplistic delta-per-unit
-        rul_data = await self.rul_engine.process(new_damage, damage_rate)
-        
-        # 6. Update State
-        snapshot.current_damage = new_damage
-        snapshot.current_load = telemetry.get("load", 0.0)
-        snapshot.current_temp = telemetry.get("temp", 0.0)
-        snapshot.current_rul = rul_data["rul"]
-        snapshot.confidence_score = rul_data["confidence"]
-        snapshot.last_update = telemetry
-        
-        # 7. Audit Log
-        audit = AuditLog(
-            tenant_id=tenant_id,
-            entity_type="AssetRel",
-            entity_id=asset_id,
-            action="telemetry_processed",
-            new_value={"damage": new_damage, "rul": rul_data["rul"]},
-            metadata_info={"multiplier": total_multiplier}
+        reading_time = _epoch(telemetry.get("timestamp"), received)
+
+        # In-process state changes from here on are undone if the commit fails
+        undo = _Undo(self.rul_engine, [asset_id])
+        try:
+            snapshot = snapshots.get(asset_id)
+            created = snapshot is None
+            if created:
+                snapshot = snapshot_store.create(db, tenant_id, asset_id)
+            previous_damage = snapshot.current_damage or 0.0
+            new_damage = previous_damage + damage_increment
+
+            # 5. RUL Calculation (rate regressed over the asset's recent timestamped damage)
+            damage_rate, rate_stderr = self.rul_engine.observe(asset_id, reading_time, new_damage)
+            rul_data = await self.rul_engine.process(new_damage, damage_rate, rate_stderr=rate_stderr)
+
+            # 6. Update State
+            snapshot.current_damage = new_damage
+            snapshot.current_load = telemetry.get("load", 0.0)
+            snapshot.current_temp = telemetry.get("temp", 0.0)
+            snapshot.current_rul = rul_data["rul"]
+            snapshot.confidence_score = rul_data["confidence"]
+            snapshot.last_update = telemetry
+            snapshot_store.mark_dirty(asset_id)
+            stages.mark("engines")
+
+            await db.commit()
+        except BaseException:
+            undo.restore()
+            raise
+        stages.mark("commit")
+
+        # 7. Audit Log, only for committed state (queued to the background sink when it is running)
+        audit_entries = [{
+            "tenant_id": tenant_id,
+            "entity_type": "AssetRel",
+            "entity_id": asset_id,
+            "action": "telemetry_processed",
+            "new_value": {"damage": new_damage, "rul": rul_data["rul"]},
+            "metadata_info": {"multiplier": total_multiplier}
+        }]
+        if telemetry.get("load", 0.0) > config["threshold_load"]:
+            audit_entries.append(_violation_entry(tenant_id, asset_id, telemetry.get("load"), config["threshold_load"], multiplier))
+        await audit_sink.write(db, audit_entries)
+        stages.mark("audit")
+        dashboard_aggregates.record(
+            tenant_id,
+            damage_delta=new_damage - previous_damage,
+            critical_delta=int(new_damage > CRITICAL_DAMAGE) - int(previous_damage > CRITICAL_DAMAGE),
+            predictions=1,
+            snapshots_added=int(created),
+            heartbeats={asset_id: time.time()},
         )
-        db.add(audit)
-        
-        await db.commit()
         
-        # 8. Update Redis Cache (Performance layer)
+        # 8. Update Redis Cache (Performance layer, flushed in the background)
         redis_key = f"tenant:{tenant_id}:asset:{asset_id}:state"
-        self.redis.hset(redis_key, mapping={
+        state_cache.put(redis_key, {
             "damage": str(new_damage),
             "rul": str(rul_data["rul"]),
             "confidence": str(rul_data["confidence"]),
-            "timestamp": str(time.time())
+            "timestamp": str(reading_time)
         })
+        stages.mark("state_cache")
+        history_store.append(
+            tenant_id, [asset_id], reading_time, snapshot.current_load, snapshot.current_temp, new_damage, rul_data["rul"]
+        )
+        stages.mark("history")
         
         # 9. Emit Events
-        bus.emit("damage.updated", key=asset_id, data={"tenant_id": tenant_id, "damage": new_damage})
-        bus.emit("rul.recalculated", key=asset_id, data={"tenant_id": tenant_id, "rul": rul_data["rul"]})
+        bus.emit_state(tenant_id, asset_id, new_damage, rul_data["rul"], rul_data["confidence"])
+        live_feed.publish(tenant_id, asset_id, {
+            "damage": new_damage, "rul": rul_data["rul"], "confidence": rul_data["confidence"], "timestamp": reading_time
+        })
+        if fleet_summary.tracks(tenant_id):
+            violated = telemetry.get("load", 0.0) > config["threshold_load"]
+            fleet_summary.observe(
+                tenant_id, {asset_id: rul_data["rul"]},
+                [(asset_id, telemetry.get("load"), config["threshold_load"], reading_time)] if violated else (),
+            )
+        stages.mark("events")
+        stages.finish(1)
         
         return snapshot
 
+    async def ingest_batch(self, db: AsyncSession, tenant_id: str, readings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Vectorized variant of ingest_telemetry for many readings across many assets.
+        Snapshots are loaded in one query (or served from the write-behind state table),
+        the engine math runs over NumPy columns and everything is persisted in a single
+        transaction. Readings for the same asset are applied in the order they were received.
+        """
+        batch = await self.stage_batch(db, tenant_id, readings)
+        try:
+            await db.commit()
+        except BaseException:
+            batch.rollback()
+            raise
+        await batch.publish(db)
+        return batch.response
+
+    async def stage_batch(self, db: AsyncSession, tenant_id: str, readings: List[Dict[str, Any]]) -> "StagedBatch":
+        """
+        ingest_batch up to the commit: the new state is left in `db`'s transaction
+        (or the write-behind state table). The caller commits, possibly together
+        with other batches, then calls publish(); if the commit fails, rollback()
+        restores the in-process state so that the readings can be retried.
+        """
+        stages = _StageClock("batch")
+        received = time.time()
+        # 1. Load all affected snapshots at once
+        unique_ids = list(dict.fromkeys(r["asset_id"] for r in readings))
+        snapshots, owners = await snapshot_store.load(db, unique_ids)
+        stages.mark("snapshot_load")
+
+        # Readings for unknown assets or assets of another tenant are rejected,
+        # never touched. Both get the same answer, so other tenants' ids cannot be probed.
+        rejected = {aid for aid in unique_ids if owners.get(aid) != tenant_id}
+        accepted = [r for r in readings if r["asset_id"] not in rejected]
+
+        results: List[Dict[str, Any]] = []
+        undo = publish = None
+        if accepted:
+            undo = _Undo(self.rul_engine, [aid for aid in unique_ids if aid not in rejected])
+            try:
+                results, publish = await self._process_accepted(db, tenant_id, accepted, snapshots, received, stages)
+            except BaseException:
+                undo.restore()
+                raise
+
+        # Stitch per-reading results back into request order
+        processed = iter(results)
+        response = []
+        for reading in readings:
+            if reading["asset_id"] in rejected:
+                response.append({
+                    "asset_id": reading["asset_id"],
+                    "status": "rejected",
+                    "detail": "Unknown asset",
+                })
+            else:
+                response.append(next(processed))
+
+        return StagedBatch(
+            {"processed": len(results), "rejected": len(readings) - len(results), "results": response},
+            stages, undo, publish,
+        )
+
+    async def _process_accepted(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        readings: List[Dict[str, Any]],
+        snapshots: Dict[str, Any],
+        received: float,
+        stages: "_StageClock",
+    ) -> Tuple[List[Dict[str, Any]], Callable[[AsyncSession], Awaitable[None]]]:
+        """
+        Runs the pipeline and updates the snapshots. Returns the per-reading
+        results and the post-commit step (audit, aggregates, caches, events).
+        """
+        n = len(readings)
+        columns = to_columns(readings)
+        asset_ids = list(dict.fromkeys(r["asset_id"] for r in readings))
+        position = {aid: i for i, aid in enumerate(asset_ids)}
+        codes = np.fromiter((position[r["asset_id"]] for r in readings), dtype=np.int64, count=n)
+
+        # Per-reading parameter columns from each asset's resolved config
+        configs = await config_cache.resolve(db, tenant_id, asset_ids)
+        config = {
+            field: np.array([configs[aid][field] for aid in asset_ids], dtype=np.float64)[codes]
+            for field in CONFIG_FIELDS
+        }
+        stages.mark("config")
+
+        # 2-4. Engine math over the whole batch
+        multiplier = self.shift_engine.process_batch(columns, config)
+        violated = self.shift_engine.violations(columns, config)
+        violations = int(np.count_nonzero(violated))
+        if violations:
+            logger.warning(f"Shift violations in batch: {violations}/{n} readings above threshold")
+
+        env_modifier = self.env_engine.process_batch(columns, config)
+        total_multiplier = multiplier * env_modifier
+        columns["multiplier"] = total_multiplier
+        damage_increment = self.damage_engine.process_batch(columns)
+
+        # Per-asset running damage: readings are grouped by asset (stable, so arrival
+        # order is kept inside each group) and increments are summed cumulatively.
+        base_damage = np.fromiter(
+            ((snapshots[aid].current_damage or 0.0) if aid in snapshots else 0.0 for aid in asset_ids),
+            dtype=np.float64,
+            count=len(asset_ids),
+        )
+
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        sorted_increment = damage_increment[order]
+        running = np.cumsum(sorted_increment)
+        group_start = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        running -= np.repeat(running[group_start] - sorted_increment[group_start], np.diff(np.r_[group_start, n]))
+
+        new_damage = np.empty(n)
+        new_damage[order] = base_damage[sorted_codes] + running
+
+        # 5. RUL Calculation: per-asset rate windows are O(1) per reading, fed in order.
+        # Untimed readings all share the request's receive time.
+        reading_time = np.fromiter((_epoch(r.get("timestamp"), received) for r in readings), dtype=np.float64, count=n)
+        damage_rate = np.empty(n)
+        rate_stderr = np.empty(n)
+        damage_list = new_damage.tolist()
+        for i, (r, t) in enumerate(zip(readings, reading_time.tolist())):
+            damage_rate[i], rate_stderr[i] = self.rul_engine.observe(r["asset_id"], t, damage_list[i])
+        rul_data = self.rul_engine.process_batch({
+            "current_damage": new_damage, "damage_rate": damage_rate, "rate_stderr": rate_stderr
+        })
+
+        # 6. Update State: the last reading per asset wins
+        last_of_group = order[np.r_[group_start[1:] - 1, n - 1]]
+        final_damage = new_damage[last_of_group]
+        created = sum(1 for aid in asset_ids if aid not in snapshots)
+        for aid, i in zip(asset_ids, last_of_group.tolist()):
+            snapshot = snapshots.get(aid)
+            if snapshot is None:
+                snapshot = snapshot_store.create(db, tenant_id, aid)
+                snapshots[aid] = snapshot
+            snapshot.current_damage = float(new_damage[i])
+            snapshot.current_load = float(columns["load"][i])
+            snapshot.current_temp = float(columns["temp"][i])
+            snapshot.current_rul = float(rul_data["rul"][i])
+            snapshot.confidence_score = float(rul_data["confidence"][i])
+            snapshot.last_update = {k: v for k, v in readings[i].items() if k != "asset_id"}
+            snapshot_store.mark_dirty(aid)
+        stages.mark("engines")
+
+        rul_list = rul_data["rul"].tolist()
+        multiplier_list = total_multiplier.tolist()
+        confidence_list = rul_data["confidence"].tolist()
+        time_list = reading_time.tolist()
+
+        async def publish(db: AsyncSession):
+            # 7. Audit Log, only for committed state (one multi-row write)
+            audit_entries = [
+                {
+                    "tenant_id": tenant_id,
+                    "entity_type": "AssetRel",
+                    "entity_id": r["asset_id"],
+                    "action": "telemetry_processed",
+                    "new_value": {"damage": damage_list[i], "rul": rul_list[i]},
+                    "metadata_info": {"multiplier": multiplier_list[i]},
+                }
+                for i, r in enumerate(readings)
+            ]
+            shift_multiplier = multiplier.tolist()
+            audit_entries.extend(
+                _violation_entry(tenant_id, readings[i]["asset_id"], columns["load"][i].item(), config["threshold_load"][i].item(), shift_multiplier[i])
+                for i in np.flatnonzero(violated).tolist()
+            )
+            await audit_sink.write(db, audit_entries)
+            stages.mark("audit")
+            dashboard_aggregates.record(
+                tenant_id,
+                damage_delta=float(np.sum(final_damage - base_damage)),
+                critical_delta=int(np.count_nonzero(final_damage > CRITICAL_DAMAGE) - np.count_nonzero(base_damage > CRITICAL_DAMAGE)),
+                predictions=n,
+                snapshots_added=created,
+                heartbeats=dict.fromkeys(asset_ids, time.time()),
+            )
+
+            # 8. Update Redis Cache (flushed in the background)
+            history_store.append(
+                tenant_id, [r["asset_id"] for r in readings], reading_time,
+                columns["load"], columns["temp"], new_damage, rul_data["rul"]
+            )
+            stages.mark("history")
+            for aid, i in zip(asset_ids, last_of_group.tolist()):
+                state_cache.put(f"tenant:{tenant_id}:asset:{aid}:state", {
+                    "damage": str(damage_list[i]),
+                    "rul": str(rul_list[i]),
+                    "confidence": str(confidence_list[i]),
+                    "timestamp": str(time_list[i])
+                })
+            stages.mark("state_cache")
+
+            # 9. Emit Events (final state per asset)
+            for aid, i in zip(asset_ids, last_of_group.tolist()):
+                bus.emit_state(tenant_id, aid, damage_list[i], rul_list[i], confidence_list[i])
+                live_feed.publish(tenant_id, aid, {
+                    "damage": damage_list[i], "rul": rul_list[i], "confidence": confidence_list[i], "timestamp": time_list[i]
+                })
+            if fleet_summary.tracks(tenant_id):
+                fleet_summary.observe(
+                    tenant_id,
+                    {aid: rul_list[i] for aid, i in zip(asset_ids, last_of_group.tolist())},
+                    [
+                        (readings[i]["asset_id"], columns["load"][i].item(), config["threshold_load"][i].item(), time_list[i])
+                        for i in np.flatnonzero(violated).tolist()
+                    ],
+                )
+            stages.mark("events")
+
+        results = [
+            {
+                "asset_id": r["asset_id"],
+                "status": "processed",
+                "damage": damage_list[i],
+                "rul": rul_list[i],
+                "confidence": confidence_list[i],
+                "multiplier": multiplier_list[i],
+            }
+            for i, r in enumerate(readings)
+        ]
+        return results, publish
+
+    async def forecast_rul(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        asset_ids: Optional[List[str]] = None,
+        scenarios: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Monte Carlo RUL percentiles for the tenant's assets (or the given subset).
+        Each asset is simulated around its latest load and environment readings,
+        with the load spread of its type profile and its resolved reliability config.
+
+        At most MONTE_CARLO_CONCURRENCY forecasts simulate at once and
+        MONTE_CARLO_QUEUE_SIZE wait; beyond that callers get an immediate 429.
+        """
+        if self._forecasts_admitted >= settings.MONTE_CARLO_CONCURRENCY + settings.MONTE_CARLO_QUEUE_SIZE:
+            FORECAST_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent forecasts, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._forecasts_admitted += 1
+        try:
+            return await self._forecast_rul(db, tenant_id, asset_ids, scenarios, seed)
+        finally:
+            self._forecasts_admitted -= 1
+
+    async def _forecast_rul(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        asset_ids: Optional[List[str]],
+        scenarios: Optional[int],
+        seed: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        stmt = (
+            select(Asset.id, Asset.type, TelemetrySnapshot.current_damage, TelemetrySnapshot.current_rul,
+                   TelemetrySnapshot.current_load, TelemetrySnapshot.last_update)
+            .outerjoin(TelemetrySnapshot, TelemetrySnapshot.asset_id == Asset.id)
+            .where(Asset.tenant_id == tenant_id)
+        )
+        if asset_ids:
+            stmt = stmt.where(Asset.id.in_(asset_ids))
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            return []
+        ids = [row.id for row in rows]
+        configs = await config_cache.resolve(db, tenant_id, ids)
+
+        records = []
+        for row in rows:
+            (low, high), _ = LOAD_PROFILES.get(row.type, DEFAULT_PROFILE)
+            last = row.last_update or {}
+            records.append({
+                # max_damage stays at the default 1.0, the limit ingest's RUL uses
+                "current_damage": row.current_damage,
+                "damage_rate": _live_rate(row.current_damage, row.current_rul),
+                "base_damage_factor": last.get("base_damage_factor"),
+                "load_mean": row.current_load if row.current_load else 50.0 + (low + high) / 2,
+                "load_std": max(1.0, (high - low) / 12 ** 0.5),
+                "ambient_temp_mean": last.get("ambient_temp"),
+                "humidity_mean": last.get("humidity"),
+                **configs[row.id],
+            })
+        columns = {
+            name: np.array([default if r.get(name) is None else r[name] for r in records], dtype=np.float64)
+            for name, default in FLEET_DEFAULTS.items()
+        }
+
+        context: Dict[str, Any] = {"asset_ids": ids}
+        if scenarios is not None:
+            context["scenarios"] = scenarios
+        if seed is not None:
+            context["seed"] = seed
+        # CPU-bound (fans out to the process pool for large fleets): keep it off the event loop
+        async with self._forecast_slots:
+            result = await run_in_threadpool(self.monte_carlo_engine.process_batch, columns, context)
+
+        return [
+            {"asset_id": aid, **{key: float(values[i]) for key, values in result.items()}}
+            for i, aid in enumerate(ids)
+        ]
+
+def _live_rate(current_damage: Optional[float], current_rul: Optional[float]) -> Optional[float]:
+    """
+    Damage per hour behind the RUL ingest stored (remaining capacity / RUL), or
+    None while it has none: no rate measured yet, or no capacity left.
+    """
+    if current_rul is None or not 0 < current_rul < NO_FAILURE_RUL:
+        return None
+    return max(0.0, 1.0 - (current_damage or 0.0)) / current_rul
+
+def _epoch(timestamp: Optional[Any], received: float) -> float:
+    """
+    Reading time in epoch seconds. Accepts datetimes, ISO strings or numbers;
+    naive values are taken as UTC and missing ones default to `received`, the
+    receive time of the request.
+    """
+    if timestamp is None:
+        return received
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+class _StageClock:
+    """
+    Splits one ingest call into consecutive stages: mark(stage) charges the time
+    since the previous mark to `stage` (repeated stages accumulate), and
+    finish() records each stage once plus the total, and adds the stages to the
+    current request's timings for slow-request breakdowns.
+    """
+    def __init__(self, path: str):
+        self._path = path
+        self._start = self._last = time.perf_counter()
+        self._spent: Dict[str, float] = {}
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self._spent[stage] = self._spent.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self, processed: int):
+        timings = current_timings.get()
+        for stage, seconds in self._spent.items():
+            INGEST_STAGE_SECONDS.labels(path=self._path, stage=stage).observe(seconds)
+            if timings is not None:
+                timings.add(f"ingest.{stage}", seconds)
+        PROCESSING_TIME.observe(self._last - self._start)
+        PROCESSED_TELEMETRY.inc(processed)
+
+class StagedBatch:
+    """
+    A batch ingested into a session but not committed yet; see stage_batch.
+    """
+    def __init__(
+        self,
+        response: Dict[str, Any],
+        stages: "_StageClock",
+        undo: Optional["_Undo"],
+        publish: Optional[Callable[[AsyncSession], Awaitable[None]]],
+    ):
+        self.response = response
+        self._stages = stages
+        self._undo = undo
+        self._publish = publish
+
+    async def publish(self, db: AsyncSession):
+        """
+        Side effects of the committed batch: audit entries, dashboard deltas,
+        caches, history and events.
+        """
+        # Time since staging ended goes to the caller's commit
+        self._stages.mark("commit")
+        if self._publish is not None:
+            await self._publish(db)
+        self._stages.finish(self.response["processed"])
+
+    def rollback(self):
+        if self._undo is not None:
+            self._undo.restore()
+
+class _Undo:
+    """
+    In-process state of some assets (rate windows, write-behind snapshots) as
+    it was before an ingest, put back when the ingest does not commit, so a
+    retry does not apply the same readings twice.
+    """
+    def __init__(self, rul_engine: RULEngine, asset_ids: List[str]):
+        self._rul_engine = rul_engine
+        self._windows = rul_engine.save(asset_ids)
+        self._states = snapshot_store.save(asset_ids)
+
+    def restore(self):
+        self._rul_engine.restore(self._windows)
+        snapshot_store.restore(self._states)
+
+def _violation_entry(tenant_id: str, asset_id: str, load: float, threshold_load: float, multiplier: float) -> Dict[str, Any]:
+    return {
+        "tenant_id": tenant_id,
+        "entity_type": "AssetRel",
+        "entity_id": asset_id,
+        "action": "violation_detected",
+        "new_value": {"load": load, "threshold_load": threshold_load},
+        "metadata_info": {"multiplier": multiplier, "source_engine": "ShiftEngine"}
+    }
+
 reliability_service = ReliabilityService()
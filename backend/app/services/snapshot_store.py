@@ -0,0 +1,224 @@
+import asyncio
+import copy
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.config import settings
+from app.db.models import Asset, TelemetrySnapshot
+from app.db.session import SessionLocal
+from loguru import logger
+
+SNAPSHOT_FIELDS = (
+    "current_load", "current_temp", "current_damage",
+    "current_rul", "confidence_score", "last_update",
+)
+
+class AssetState:
+    """
+    In-process copy of a TelemetrySnapshot row. Mirrors the column names so the
+    reliability pipeline can update it exactly like the ORM object.
+    """
+    def __init__(self, asset_id: str, tenant_id: str, **values: Any):
+        self.asset_id = asset_id
+        self.tenant_id = tenant_id
+        self.current_load = values.get("current_load", 0.0)
+        self.current_temp = values.get("current_temp", 0.0)
+        self.current_damage = values.get("current_damage", 0.0)
+        self.current_rul = values.get("current_rul")
+        self.confidence_score = values.get("confidence_score", 1.0)
+        self.last_update = values.get("last_update")
+
+    @classmethod
+    def from_snapshot(cls, snapshot: TelemetrySnapshot) -> "AssetState":
+        return cls(
+            snapshot.asset_id,
+            snapshot.tenant_id,
+            **{field: getattr(snapshot, field) for field in SNAPSHOT_FIELDS},
+        )
+
+    def as_row(self) -> Dict[str, Any]:
+        row = {"asset_id": self.asset_id, "tenant_id": self.tenant_id}
+        row.update({field: getattr(self, field) for field in SNAPSHOT_FIELDS})
+        return row
+
+class SnapshotStore:
+    """
+    Source of TelemetrySnapshot state for the reliability pipeline.
+
+    write_through: every ingest reads and writes the telemetry_snapshot table.
+    write_behind: live state is kept in an in-process table and dirty rows are
+    checkpointed with a bulk UPSERT every SNAPSHOT_CHECKPOINT_INTERVAL seconds,
+    bounding staleness of the table to that interval. The in-process table is
+    the source of truth for its assets, so each asset must be ingested by one
+    process only: two API workers in write-behind mode would each advance
+    their own copy and overwrite each other's checkpoints.
+    """
+    def __init__(self):
+        self._states: Dict[str, AssetState] = {}
+        self._dirty: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    @property
+    def write_behind(self) -> bool:
+        return settings.SNAPSHOT_WRITE_MODE == "write_behind"
+
+    async def load(self, db: AsyncSession, asset_ids: List[str], chunk_size: int = 1000) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Returns (snapshots, owners): existing snapshots (ORM rows or AssetState)
+        keyed by asset_id, and the owning tenant of every asset that exists.
+        Ids missing from `owners` are unknown. In write-behind mode only assets
+        not yet in memory hit the database.
+
+        Write-through locks the asset rows until `db` commits, so concurrent
+        ingests of one asset queue up instead of both updating (or both
+        creating) its snapshot from the same starting point.
+        """
+        found: Dict[str, Any] = {}
+        owners: Dict[str, str] = {}
+        if self.write_behind:
+            missing = []
+            for aid in asset_ids:
+                state = self._states.get(aid)
+                if state is None:
+                    missing.append(aid)
+                else:
+                    found[aid] = state
+                    owners[aid] = state.tenant_id
+        else:
+            # Locks are taken in id order, so overlapping batches cannot deadlock
+            missing = sorted(asset_ids)
+
+        # Chunked to stay below bind-parameter limits on large batches
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            if self.write_behind:
+                stmt = (
+                    select(Asset.id, Asset.tenant_id, TelemetrySnapshot)
+                    .outerjoin(TelemetrySnapshot, TelemetrySnapshot.asset_id == Asset.id)
+                    .where(Asset.id.in_(chunk))
+                )
+                for asset_id, owner, snapshot in (await db.execute(stmt)).all():
+                    owners[asset_id] = owner
+                    if snapshot is not None:
+                        # A concurrent ingest may have hydrated the same asset meanwhile
+                        found[asset_id] = self._states.setdefault(asset_id, AssetState.from_snapshot(snapshot))
+                continue
+
+            # FOR NO KEY UPDATE (ignored by SQLite, whose single writer connection
+            # already serializes ingests): the snapshot is read only once the lock
+            # is held, so it includes whatever the previous holder committed
+            owners.update((await db.execute(
+                select(Asset.id, Asset.tenant_id)
+                .where(Asset.id.in_(chunk))
+                .order_by(Asset.id)
+                .with_for_update(key_share=True)
+            )).all())
+            for snapshot in await db.scalars(
+                select(TelemetrySnapshot)
+                .where(TelemetrySnapshot.asset_id.in_(chunk))
+                .execution_options(populate_existing=True)
+            ):
+                found[snapshot.asset_id] = snapshot
+        return found, owners
+
+    def create(self, db: AsyncSession, tenant_id: str, asset_id: str) -> Any:
+        if self.write_behind:
+            return self._states.setdefault(asset_id, AssetState(asset_id, tenant_id))
+        snapshot = TelemetrySnapshot(asset_id=asset_id, tenant_id=tenant_id, current_damage=0.0)
+        db.add(snapshot)
+        return snapshot
+
+    def mark_dirty(self, asset_id: str):
+        if self.write_behind:
+            self._dirty.add(asset_id)
+
+    def save(self, asset_ids: List[str]) -> Dict[str, Tuple[Optional[AssetState], bool]]:
+        """
+        Write-behind only: copies of the assets' states and dirty flags, for
+        restore(). Write-through state lives in the session and rolls back with it.
+        """
+        if not self.write_behind:
+            return {}
+        return {
+            aid: (copy.copy(self._states[aid]) if aid in self._states else None, aid in self._dirty)
+            for aid in asset_ids
+        }
+
+    def restore(self, saved: Dict[str, Tuple[Optional[AssetState], bool]]):
+        for aid, (state, dirty) in saved.items():
+            if state is None:
+                self._states.pop(aid, None)
+            else:
+                self._states[aid] = state
+            if dirty:
+                self._dirty.add(aid)
+            else:
+                self._dirty.discard(aid)
+
+    def evict(self, asset_ids: Iterable[str]):
+        """
+        Forgets in-process state (call after a checkpoint): the next ingest of
+        these assets reloads them from the table.
+        """
+        for aid in asset_ids:
+            self._states.pop(aid, None)
+            self._dirty.discard(aid)
+
+    async def start(self):
+        if self.write_behind and not self._task:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            # Let a checkpoint in progress finish rather than cancelling it midway
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.checkpoint()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.SNAPSHOT_CHECKPOINT_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                logger.error(f"Snapshot checkpoint failed: {e}")
+
+    async def checkpoint(self, chunk_size: int = 500):
+        """
+        Bulk UPSERTs every dirty state into telemetry_snapshot.
+        """
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        rows = [self._states[aid].as_row() for aid in dirty]
+
+        try:
+            async with SessionLocal() as db:
+                upsert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+                for start in range(0, len(rows), chunk_size):
+                    stmt = upsert(TelemetrySnapshot).values(rows[start:start + chunk_size])
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[TelemetrySnapshot.asset_id],
+                        set_={
+                            **{field: stmt.excluded[field] for field in SNAPSHOT_FIELDS},
+                            "updated_at": func.now(),
+                        },
+                    )
+                    await db.execute(stmt)
+                await db.commit()
+        except BaseException:
+            # Keep the rows dirty so the next checkpoint retries them (cancellation included)
+            self._dirty |= dirty
+            raise
+        logger.debug(f"Checkpointed {len(rows)} telemetry snapshots")
+
+snapshot_store = SnapshotStore()
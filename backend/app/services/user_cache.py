@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from app.core.cache import state_cache
+from app.core.config import settings
+from app.db.models import User
+from app.db.session import ReadSessionLocal
+from app.utils.metrics import USER_CACHE_LOOKUPS
+from loguru import logger
+
+INVALIDATION_CHANNEL = "forsee:auth:invalidate"
+
+def _changed_key(user_id: int) -> str:
+    return f"forsee:auth:changed:{user_id}"
+
+class UserCache:
+    """
+    In-process TTL cache of authenticated users, keyed by id.
+
+    Users are loaded in a short session of the cache's own, so cached users
+    are detached: they are read-only, and code that modifies a user must load
+    it in its own session and call invalidate() afterwards. Invalidation also
+    records when the user changed, so tokens issued before that point stop
+    being trusted for their role claim. The change time is kept in Redis for
+    the token lifetime, where every worker (including ones started later)
+    checks it; running workers also drop their cached copy on
+    INVALIDATION_CHANNEL.
+    """
+    def __init__(self, session_factory=ReadSessionLocal):
+        self.session_factory = session_factory
+        self._local: "OrderedDict[int, Tuple[float, User]]" = OrderedDict()
+        self._changed_at: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self, user_id: int) -> Optional[User]:
+        entry = self._local.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            USER_CACHE_LOOKUPS.labels(result="hit").inc()
+            return entry[1]
+
+        USER_CACHE_LOOKUPS.labels(result="miss").inc()
+        # Not the request's session: that would hold a connection (on SQLite the
+        # only writer) for the rest of the request
+        async with self.session_factory() as session:
+            user = await session.scalar(select(User).where(User.id == user_id))
+        if user is None:
+            return None
+        self._local[user_id] = (time.monotonic() + settings.USER_CACHE_TTL, user)
+        self._local.move_to_end(user_id)
+        while len(self._local) > settings.USER_CACHE_SIZE:
+            self._local.popitem(last=False)
+        return user
+
+    async def is_stale(self, user_id: int, issued_at: Optional[int]) -> bool:
+        """
+        True if the user changed after the token was issued (or the token has no iat),
+        so its role claim must be checked against the user record.
+        """
+        changed_at = self._changed_at.get(user_id)
+        if state_cache.client is not None:
+            try:
+                stored = await state_cache.client.get(_changed_key(user_id))
+            except Exception as e:
+                logger.warning(f"User change lookup in Redis failed: {e}")
+                stored = None
+            if stored is not None:
+                changed_at = max(float(stored), changed_at or 0.0)
+        if changed_at is None:
+            return False
+        return issued_at is None or issued_at <= changed_at
+
+    def invalidate_local(self, user_id: int, changed_at: float):
+        self._local.pop(user_id, None)
+        self._changed_at[user_id] = max(changed_at, self._changed_at.get(user_id, 0.0))
+        # Tokens older than the expiry window are rejected anyway
+        horizon = time.time() - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        for uid in [uid for uid, t in self._changed_at.items() if t < horizon]:
+            del self._changed_at[uid]
+
+    async def invalidate(self, user_id: int):
+        """
+        Called after a user's role or active status changed.
+        """
+        changed_at = time.time()
+        self.invalidate_local(user_id, changed_at)
+        if state_cache.client is not None:
+            try:
+                # Tokens older than the expiry window are rejected anyway
+                await state_cache.client.set(
+                    _changed_key(user_id), changed_at, ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+                )
+                await state_cache.client.publish(
+                    INVALIDATION_CHANNEL, json.dumps({"user_id": user_id, "changed_at": changed_at})
+                )
+            except Exception as e:
+                logger.warning(f"User cache invalidation via Redis failed: {e}")
+
+    async def start(self):
+        if state_cache.client is not None and not self._task:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        while True:
+            try:
+                async with state_cache.client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        payload = json.loads(message["data"])
+                        self.invalidate_local(payload["user_id"], payload["changed_at"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"User invalidation listener failed, retrying: {e}")
+                await asyncio.sleep(5)
+
+user_cache = UserCache()
@@ -1,6 +1,17 @@
 import logging
 import sys
+import time
+from typing import Dict, Hashable, Optional, Tuple
 from loguru import logger
+from app.core.config import settings
+
+# Records bound with audit=True (role/config changes) are kept in the audit log,
+# along with every warning and error not bound with audit=False.
+audit_logger = logger.bind(audit=True)
+
+# Lowest level the console/hot-path sinks accept; engine events below it are skipped
+# before any formatting. 0 until setup_logging runs (loguru's default sink takes all).
+_min_level_no = 0
 
 class InterceptHandler(logging.Handler):
     def emit(self, record):
@@ -18,23 +29,77 @@ class InterceptHandler(logging.Handler):
 
         logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
 
+_level_nos: Dict[str, int] = {}
+
+def level_enabled(level: str) -> bool:
+    no = _level_nos.get(level)
+    if no is None:
+        no = _level_nos[level] = logger.level(level).no
+    return no >= _min_level_no
+
+_WARNING_NO = logger.level("WARNING").no
+
+def _is_audit(record) -> bool:
+    return record["extra"].get("audit", record["level"].no >= _WARNING_NO)
+
+class EventSampler:
+    """
+    Rate limiter for repetitive log events: at most one event per key every
+    `interval` seconds. admit() returns None when the event should be dropped,
+    otherwise the number of events dropped for that key since the last one.
+    """
+    def __init__(self, max_keys: int = 100000):
+        self._max_keys = max_keys
+        self._last: Dict[Hashable, Tuple[float, int]] = {}
+
+    def admit(self, key: Hashable, interval: float) -> Optional[int]:
+        now = time.monotonic()
+        entry = self._last.get(key)
+        if entry is not None and now - entry[0] < interval:
+            self._last[key] = (entry[0], entry[1] + 1)
+            return None
+        if entry is None and len(self._last) >= self._max_keys:
+            # Pending suppressed counts are lost; only the log line loses them
+            self._last.clear()
+        self._last[key] = (now, 0)
+        return entry[1] if entry else 0
+
+engine_event_sampler = EventSampler()
+
 def setup_logging():
+    global _min_level_no
     # Intercept standard logging
     logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
-    
-    # Configure Loguru
+
+    # Configure Loguru. With enqueue the caller only pushes the record on a
+    # queue; formatting and I/O happen on the sink's background thread.
     logger.remove()
     logger.add(
         sys.stdout,
         format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level="INFO",
+        level=settings.LOG_LEVEL,
+        enqueue=settings.LOG_ENQUEUE,
     )
-    # Add a file sink for production-safe logs
+    # Hot-path log: everything at LOG_FILE_LEVEL, kept briefly
     logger.add(
         "logs/backend_{time}.log",
         rotation="10 MB",
-        retention="1 month",
+        retention=settings.LOG_RETENTION,
         compression="zip",
-        level="DEBUG",
+        level=settings.LOG_FILE_LEVEL,
         serialize=True, # Structured JSON for production
+        enqueue=settings.LOG_ENQUEUE,
+    )
+    # Audit log: warnings, errors and audit records, kept long
+    logger.add(
+        "logs/audit_{time}.log",
+        rotation="10 MB",
+        retention=settings.LOG_AUDIT_RETENTION,
+        compression="zip",
+        level="INFO",
+        filter=_is_audit,
+        serialize=True,
+        enqueue=settings.LOG_ENQUEUE,
     )
+    # The audit sink only takes bound audit records below WARNING, so it does not count here
+    _min_level_no = min(logger.level(settings.LOG_LEVEL).no, logger.level(settings.LOG_FILE_LEVEL).no)
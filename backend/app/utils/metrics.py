@@ -1,10 +1,123 @@
-from prometheus_client import Counter, Gauge, Histogram, generate_latest
-from fastapi import Response
+import os
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from starlette.responses import Response
+
+# Sub-millisecond resolution for per-call timings (engines, stages, Redis)
+FAST_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
 
 # Metrics definitions
 PROCESSED_TELEMETRY = Counter("forsee_telemetry_total", "Total processed telemetry packets")
+# Not populated: one series per asset does not scale. Fleet health is exported
+# in bulk by app/services/fleet_health.py instead.
 RELIABILITY_SCORE = Gauge("forsee_asset_health", "Current health score per asset", ["tenant_id", "asset_id"])
 PROCESSING_TIME = Histogram("forsee_processing_seconds", "Time spent processing reliability logic")
 
+# Pipeline stages
+ENGINE_SECONDS = Histogram("forsee_engine_seconds", "Time spent in an engine's process_batch", ["engine"], buckets=FAST_BUCKETS)
+INGEST_STAGE_SECONDS = Histogram(
+    "forsee_ingest_stage_seconds", "Time per reliability ingest stage (path: single or batch)", ["path", "stage"], buckets=FAST_BUCKETS
+)
+
+# HTTP requests (route template, not raw path)
+HTTP_REQUEST_SECONDS = Histogram("forsee_http_request_seconds", "HTTP request latency by route template", ["method", "route", "status"])
+
+# Logging
+ENGINE_LOG_SUPPRESSED = Counter("forsee_engine_log_suppressed_total", "Engine log events dropped by per-asset rate limiting", ["engine"])
+
+# Database pools (pool: primary or read)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "forsee_db_pool_checkout_seconds", "Time to obtain a pooled DB connection, waiting and connecting included", ["pool"], buckets=FAST_BUCKETS
+)
+DB_POOL_IN_USE = Gauge("forsee_db_pool_connections_in_use", "DB connections checked out of the pool", ["pool"], multiprocess_mode="livesum")
+DB_POOL_CAPACITY = Gauge("forsee_db_pool_capacity", "Connections the pool may open, overflow included (0 = not bounded)", ["pool"], multiprocess_mode="livesum")
+DB_POOL_WAITING = Gauge("forsee_db_pool_waiting", "Checkouts in progress (waiting for a free or new connection)", ["pool"], multiprocess_mode="livesum")
+DB_POOL_TIMEOUTS = Counter("forsee_db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["pool"])
+
+# Redis and Kafka client calls
+REDIS_CALL_SECONDS = Histogram("forsee_redis_call_seconds", "Redis round trips by command (PIPELINE for a whole pipeline)", ["command"], buckets=FAST_BUCKETS)
+KAFKA_CALL_SECONDS = Histogram("forsee_kafka_call_seconds", "Blocking librdkafka client calls", ["call"], buckets=FAST_BUCKETS)
+
+# Redis state cache
+STATE_CACHE_FLUSH_SIZE = Histogram(
+    "forsee_state_cache_flush_size", "Keys written per state cache pipeline flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 5000)
+)
+STATE_CACHE_FLUSH_LATENCY = Histogram("forsee_state_cache_flush_seconds", "Latency of state cache pipeline flushes")
+STATE_CACHE_DROPPED = Counter("forsee_state_cache_dropped_total", "State updates dropped (buffer full or Redis failure)")
+
+# Audit sink
+AUDIT_QUEUE_DEPTH = Gauge("forsee_audit_queue_depth", "Audit entries waiting to be written", multiprocess_mode="livesum")
+AUDIT_WRITTEN = Counter("forsee_audit_written_total", "Audit entries written to the database")
+AUDIT_DROPPED = Counter("forsee_audit_dropped_total", "Audit entries dropped (queue full, or a failed write of a sampled action)")
+AUDIT_SAMPLED_OUT = Counter("forsee_audit_sampled_out_total", "High-frequency audit entries skipped by sampling")
+AUDIT_FLUSH_SIZE = Histogram(
+    "forsee_audit_flush_size", "Audit entries per multi-row write",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 5000)
+)
+
+# Event bus
+EVENT_QUEUE_DEPTH = Gauge("forsee_event_queue_depth", "Events waiting in the producer queue", multiprocess_mode="livesum")
+EVENT_DELIVERY_LATENCY = Histogram(
+    "forsee_event_delivery_seconds", "Time from produce to broker acknowledgement",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+EVENT_DELIVERY_FAILED = Counter("forsee_event_delivery_failed_total", "Events the broker failed to acknowledge")
+EVENT_DROPPED = Counter("forsee_event_dropped_total", "Events dropped because the producer queue was full")
+
+# Kafka ingest worker
+WORKER_CONSUMED = Counter("forsee_worker_readings_total", "Readings ingested by the Kafka worker")
+WORKER_REJECTED = Counter("forsee_worker_rejected_total", "Readings the Kafka worker skipped or rejected")
+WORKER_SKIPPED_BATCHES = Counter("forsee_worker_skipped_batches_total", "Micro-batches skipped after INGEST_WORKER_MAX_ATTEMPTS failures")
+WORKER_BATCH_SECONDS = Histogram("forsee_worker_batch_seconds", "Time to ingest and persist one consumed micro-batch")
+
+# Reliability configuration cache
+CONFIG_CACHE_LOOKUPS = Counter("forsee_config_cache_lookups_total", "Config lookups served per cache tier", ["tier"])
+
+# Authentication
+USER_CACHE_LOOKUPS = Counter("forsee_user_cache_lookups_total", "Authenticated-user lookups by result", ["result"])
+PASSWORD_HASH_SECONDS = Histogram("forsee_password_hash_seconds", "Time from submitting a password hash/verify to its result, queueing included", ["operation"])
+PASSWORD_HASH_REJECTED = Counter("forsee_password_hash_rejected_total", "Password hash/verify requests refused because the hashing queue was full")
+FORECAST_REJECTED = Counter("forsee_forecast_rejected_total", "RUL forecasts refused because the simulation queue was full")
+
+# Dashboard aggregates
+DASHBOARD_RECONCILE_DRIFT = Counter("forsee_dashboard_reconcile_drift_total", "Tenants whose dashboard aggregates had drifted at reconciliation")
+DASHBOARD_RECONCILE_SECONDS = Histogram("forsee_dashboard_reconcile_seconds", "Duration of dashboard aggregate reconciliation")
+
+# Live push feed
+LIVE_FEED_SUBSCRIBERS = Gauge("forsee_live_feed_subscribers", "Connected WebSocket/SSE subscribers", multiprocess_mode="livesum")
+LIVE_FEED_COALESCED = Counter("forsee_live_feed_coalesced_total", "State updates replaced by a newer one before a slow subscriber read them")
+
+# Fleet health export
+FLEET_EXPORT_SECONDS = Histogram("forsee_fleet_export_refresh_seconds", "Time to rebuild the fleet health export from the snapshot table")
+
+# Chatbot
+CHATBOT_CACHE_LOOKUPS = Counter("forsee_chatbot_cache_lookups_total", "Chatbot answer lookups by cache tier (miss = generated)", ["result"])
+CHATBOT_FIRST_TOKEN_SECONDS = Histogram("forsee_chatbot_first_token_seconds", "Time from request to the first generated chunk")
+CHATBOT_PROMPT_TOKENS = Histogram(
+    "forsee_chatbot_prompt_tokens", "Estimated prompt tokens sent to the model (excluding the system prompt)",
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+
+# Custom collectors (computed per process, not aggregated through the multiprocess files)
+_collectors = []
+
+def register_collector(collector):
+    _collectors.append(collector)
+    REGISTRY.register(collector)
+
 def get_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Several worker processes: aggregate every process's metric files
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _collectors:
+            registry.register(collector)
+        return Response(content=generate_latest(registry), media_type="text/plain")
     return Response(content=generate_latest(), media_type="text/plain")
+
+def mark_process_dead():
+    """
+    Drops this process's live gauges from the multiprocess aggregate. Call on exit.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
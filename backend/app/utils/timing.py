@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+class RequestTimings:
+    """
+    Seconds spent per phase (auth, db, engine, ingest stages) during one HTTP
+    request. Phases may overlap: a user lookup on a cache miss counts as both
+    auth and db.
+    """
+    __slots__ = ("start", "phases")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+# Set by RequestTimingMiddleware for the duration of a request; None elsewhere
+# (background tasks, the Kafka worker), where recording is a no-op.
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+def record(phase: str, seconds: float):
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
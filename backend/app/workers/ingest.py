@@ -0,0 +1,198 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from confluent_kafka import Consumer, KafkaError, TopicPartition
+from pydantic import ValidationError
+from app.core.bus import SERIALIZERS, get_serializer
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.schemas.reliability import TelemetryStreamReading
+from app.services.audit import audit_sink
+from app.services.history import history_store
+from app.services.reliability import reliability_service
+from app.services.snapshot_store import snapshot_store
+from app.utils.metrics import WORKER_CONSUMED, WORKER_REJECTED, WORKER_SKIPPED_BATCHES, WORKER_BATCH_SECONDS, KAFKA_CALL_SECONDS
+from loguru import logger
+
+class TelemetryIngestWorker:
+    """
+    Consumes raw telemetry from Kafka in micro-batches and runs it through the
+    reliability pipeline. Gateways key messages by asset_id, so each asset maps to
+    one partition and therefore to one worker of the consumer group, which keeps
+    its readings in order. Offsets are committed only after state is persisted;
+    a crash between the two replays the batch (at-least-once).
+
+    The worker's per-asset state (write-behind snapshots, RUL rate windows) is
+    only valid while it owns the asset's partition: on revocation it is
+    checkpointed and dropped, so the next owner's progress is never overwritten.
+    """
+    def __init__(self, topic: Optional[str] = None, batch_size: Optional[int] = None, batch_timeout: Optional[float] = None):
+        self.topic = topic or settings.TELEMETRY_TOPIC
+        self.batch_size = batch_size or settings.INGEST_WORKER_BATCH_SIZE
+        self.batch_timeout = batch_timeout or settings.INGEST_WORKER_BATCH_TIMEOUT
+        self.consumer = Consumer({
+            'bootstrap.servers': settings.KAFKA_BOOTSTRAP_SERVERS,
+            'group.id': settings.KAFKA_GROUP_ID,
+            'client.id': 'forsee-ingest-worker',
+            'enable.auto.commit': False,
+            'auto.offset.reset': 'earliest',
+            'partition.assignment.strategy': 'cooperative-sticky',
+        })
+        self._serializers: Dict[str, Any] = {}
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Assets seen on each (topic, partition) while it is assigned here
+        self._partition_assets: Dict[Tuple[str, int], Set[str]] = defaultdict(set)
+
+    async def run(self):
+        loop = self._loop = asyncio.get_running_loop()
+        self.consumer.subscribe([self.topic], on_revoke=self._on_revoke)
+        self._running = True
+        logger.info(f"Ingest worker consuming '{self.topic}' in batches of {self.batch_size}")
+        failures = 0
+        try:
+            while self._running:
+                with KAFKA_CALL_SECONDS.labels(call="consume").time():
+                    messages = await loop.run_in_executor(
+                        None, self.consumer.consume, self.batch_size, self.batch_timeout
+                    )
+                if not messages:
+                    continue
+                try:
+                    await self.handle(messages)
+                except Exception as e:
+                    # Rewinding replays the same batch: bound the attempts so one
+                    # poison batch cannot stall its partitions forever
+                    failures += 1
+                    if failures < settings.INGEST_WORKER_MAX_ATTEMPTS:
+                        logger.error(f"Batch of {len(messages)} failed (attempt {failures}), rewinding: {e}")
+                        self._rewind(messages)
+                        await asyncio.sleep(min(30.0, settings.INGEST_WORKER_RETRY_BACKOFF * 2 ** (failures - 1)))
+                        continue
+                    WORKER_SKIPPED_BATCHES.inc()
+                    logger.error(f"Skipping batch {self._offsets(messages)} after {failures} failed attempts: {e}")
+                failures = 0
+                with KAFKA_CALL_SECONDS.labels(call="commit").time():
+                    await loop.run_in_executor(None, lambda: self.consumer.commit(asynchronous=False))
+        finally:
+            # close() revokes on this thread; the shutdown checkpoint covers it instead
+            self._loop = None
+            self.consumer.close()
+
+    def stop(self):
+        self._running = False
+
+    def _on_revoke(self, consumer, partitions: List[TopicPartition]):
+        # Runs inside consume() on the executor thread, between two batches
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.release(partitions), self._loop).result()
+
+    async def release(self, partitions: List[TopicPartition]):
+        """
+        Hands the assets of revoked partitions over: persists their snapshots,
+        then drops them and their RUL windows, so that regaining a partition
+        later reloads its assets from the table instead of a stale copy.
+        """
+        asset_ids: Set[str] = set()
+        for tp in partitions:
+            asset_ids |= self._partition_assets.pop((tp.topic, tp.partition), set())
+        if not asset_ids:
+            return
+        if snapshot_store.write_behind:
+            try:
+                await snapshot_store.checkpoint()
+            except Exception as e:
+                # Offsets are committed only after a checkpoint: the next owner replays what is lost
+                logger.error(f"Checkpoint on partition revoke failed: {e}")
+        snapshot_store.evict(asset_ids)
+        for aid in asset_ids:
+            reliability_service.rul_engine.windows.pop(aid, None)
+        logger.info(f"Released {len(asset_ids)} assets of {len(partitions)} revoked partitions")
+
+    async def handle(self, messages: List[Any]):
+        """
+        Decodes a micro-batch, ingests it for all its tenants in one transaction
+        and makes the results durable before returning. If anything fails before
+        the commit, the in-process state is rolled back as well, so the rewound
+        batch is applied exactly once. Readings are only applied to assets owned
+        by the tenant_id of their payload.
+        """
+        with WORKER_BATCH_SECONDS.time():
+            by_tenant: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for msg in messages:
+                if msg.error():
+                    if msg.error().code() != KafkaError._PARTITION_EOF:
+                        logger.error(f"Consumer error: {msg.error()}")
+                    continue
+                reading = self._decode(msg)
+                if reading is not None:
+                    self._partition_assets[(msg.topic(), msg.partition())].add(reading["asset_id"])
+                    by_tenant[reading.pop("tenant_id")].append(reading)
+
+            async with SessionLocal() as db:
+                staged = []
+                try:
+                    for tenant_id, readings in by_tenant.items():
+                        staged.append(await reliability_service.stage_batch(db, tenant_id, readings))
+                    await db.commit()
+                    # In write-behind mode the snapshot table lags; persist before committing
+                    if snapshot_store.write_behind:
+                        await snapshot_store.checkpoint()
+                except BaseException:
+                    for batch in staged:
+                        batch.rollback()
+                    raise
+
+                # The batch is committed: failures from here on must not replay it
+                for batch in staged:
+                    WORKER_CONSUMED.inc(batch.response["processed"])
+                    WORKER_REJECTED.inc(batch.response["rejected"])
+                    try:
+                        await batch.publish(db)
+                    except Exception as e:
+                        logger.error(f"Post-commit ingest steps failed: {e}")
+
+            # Audit entries and history of the batch are written before its offsets
+            try:
+                await audit_sink.drain()
+                await history_store.flush()
+            except Exception as e:
+                logger.error(f"Draining audit and history after a batch failed: {e}")
+
+    def _decode(self, msg) -> Optional[Dict[str, Any]]:
+        content_type = dict(msg.headers() or []).get("content-type", b"application/json").decode()
+        try:
+            serializer = self._serializer_for(content_type)
+            reading = TelemetryStreamReading(**serializer.loads(msg.value()))
+        except (ValueError, ValidationError) as e:
+            WORKER_REJECTED.inc()
+            logger.warning(f"Skipping malformed telemetry at {msg.topic()}[{msg.partition()}]@{msg.offset()}: {e}")
+            return None
+        return reading.model_dump(mode="json")
+
+    def _serializer_for(self, content_type: str):
+        if content_type not in self._serializers:
+            names = [name for name, cls in SERIALIZERS.items() if cls.content_type == content_type]
+            if not names:
+                raise ValueError(f"Unsupported content-type '{content_type}'")
+            self._serializers[content_type] = get_serializer(names[0])
+        return self._serializers[content_type]
+
+    def _offsets(self, messages: List[Any]) -> str:
+        ranges: Dict[tuple, List[int]] = {}
+        for msg in messages:
+            if not msg.error():
+                offsets = ranges.setdefault((msg.topic(), msg.partition()), [msg.offset(), msg.offset()])
+                offsets[0], offsets[1] = min(offsets[0], msg.offset()), max(offsets[1], msg.offset())
+        return ", ".join(f"{topic}[{partition}]@{low}-{high}" for (topic, partition), (low, high) in ranges.items())
+
+    def _rewind(self, messages: List[Any]):
+        # Seek every partition back to the first offset of the failed batch
+        first: Dict[tuple, int] = {}
+        for msg in messages:
+            if msg.error():
+                continue
+            key = (msg.topic(), msg.partition())
+            first[key] = min(first.get(key, msg.offset()), msg.offset())
+        for (topic, partition), offset in first.items():
+            self.consumer.seek(TopicPartition(topic, partition, offset))
@@ -0,0 +1,35 @@
+from jose import jwt
+from benchmarks.fakes import memory_database
+from benchmarks.harness import benchmark
+from app.api.deps import get_current_user
+from app.api.middleware.tenant import decode_token
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.db.models import Tenant, User
+from app.services.user_cache import user_cache
+
+@benchmark("auth.jwt_decode")
+async def jwt_decode():
+    token = create_access_token("1", tenant_id="bench")
+    return lambda: jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+@benchmark("auth.decode_token")
+async def token_claims():
+    token = create_access_token("1", tenant_id="bench", role="admin")
+    return lambda: decode_token(token)
+
+@benchmark("auth.get_current_user")
+async def current_user():
+    Session = await memory_database()
+    async with Session() as db:
+        db.add(Tenant(id="bench", name="Benchmark"))
+        user = User(email="bench@example.com", hashed_password=get_password_hash("bench"), role="admin", tenant_id="bench")
+        db.add(user)
+        await db.commit()
+        claims = decode_token(create_access_token(user.id, tenant_id="bench", role="admin"))
+
+    user_cache.session_factory = Session
+
+    async def resolve():
+        await get_current_user(claims)
+    return resolve
@@ -0,0 +1,21 @@
+from benchmarks.harness import benchmark
+from app.services.chat import ChatService, StubBackend, cache_key
+
+HISTORY = [("user", "What does RUL mean?"), ("model", "Remaining useful life, in hours.")] * 5
+
+@benchmark("chat.cache_key")
+async def chat_cache_key():
+    return lambda: cache_key("How do I read the damage gauge?", HISTORY)
+
+@benchmark("chat.answer_cached")
+async def chat_answer_cached():
+    service = ChatService(StubBackend())
+    await service.answer("How do I read the damage gauge?", HISTORY)
+    return lambda: service.answer("How do I read the damage gauge?", HISTORY)
+
+@benchmark("chat.answer_stub")
+async def chat_answer_stub():
+    # Cache disabled per call by varying the message: measures the streaming path itself
+    service = ChatService(StubBackend())
+    counter = iter(range(10**9))
+    return lambda: service.answer(f"Question {next(counter)}", HISTORY)
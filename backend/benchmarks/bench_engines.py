@@ -0,0 +1,97 @@
+import numpy as np
+from benchmarks.harness import benchmark
+from app.engines.base import to_columns
+from app.engines.shift import ShiftEngine
+from app.engines.environmental import EnvironmentalEngine
+from app.engines.damage import DamageEngine
+from app.engines.rul import RULEngine, DamageRateWindow
+from app.engines.simulation import SimulationEngine
+from app.engines.monte_carlo import MonteCarloRULEngine
+from app.services.config_cache import DEFAULT_RELIABILITY_CONFIG
+
+BATCH = 10_000
+
+def _readings(n: int):
+    rng = np.random.default_rng(0)
+    return [
+        {"load": float(load), "temp": 60.0, "ambient_temp": float(t), "humidity": float(h), "base_damage_factor": 0.0001}
+        for load, t, h in zip(rng.uniform(40, 110, n), rng.uniform(15, 40, n), rng.uniform(30, 95, n))
+    ]
+
+@benchmark("engines.to_columns.10k")
+async def to_columns_batch():
+    readings = _readings(BATCH)
+    return lambda: to_columns(readings)
+
+@benchmark("engines.shift.scalar")
+async def shift_scalar():
+    engine, reading = ShiftEngine(), _readings(1)[0]
+    return lambda: engine.process(reading, DEFAULT_RELIABILITY_CONFIG)
+
+@benchmark("engines.shift.batch_10k")
+async def shift_batch():
+    engine, columns = ShiftEngine(), to_columns(_readings(BATCH))
+    return lambda: engine.process_batch(columns, DEFAULT_RELIABILITY_CONFIG)
+
+@benchmark("engines.environmental.scalar")
+async def environmental_scalar():
+    engine, reading = EnvironmentalEngine(), _readings(1)[0]
+    return lambda: engine.process(reading, DEFAULT_RELIABILITY_CONFIG)
+
+@benchmark("engines.environmental.batch_10k")
+async def environmental_batch():
+    engine, columns = EnvironmentalEngine(), to_columns(_readings(BATCH))
+    return lambda: engine.process_batch(columns, DEFAULT_RELIABILITY_CONFIG)
+
+@benchmark("engines.damage.scalar")
+async def damage_scalar():
+    engine, reading = DamageEngine(), _readings(1)[0]
+    return lambda: engine.process(reading, 1.2)
+
+@benchmark("engines.damage.batch_10k")
+async def damage_batch():
+    engine, columns = DamageEngine(), to_columns(_readings(BATCH))
+    columns["multiplier"] = np.full(BATCH, 1.2)
+    return lambda: engine.process_batch(columns)
+
+@benchmark("engines.rul.scalar")
+async def rul_scalar():
+    engine = RULEngine()
+    return lambda: engine.process(0.4, 0.001, rate_stderr=0.0001)
+
+@benchmark("engines.rul.batch_10k")
+async def rul_batch():
+    engine, rng = RULEngine(), np.random.default_rng(0)
+    columns = {
+        "current_damage": rng.uniform(0, 1, BATCH),
+        "damage_rate": rng.uniform(-0.001, 0.01, BATCH),
+        "rate_stderr": rng.uniform(0, 0.001, BATCH),
+    }
+    return lambda: engine.process_batch(columns)
+
+@benchmark("engines.rul.rate_window_push")
+async def rate_window_push():
+    window, state = DamageRateWindow(64), {"t": 0.0, "d": 0.0}
+
+    def push():
+        state["t"] += 60.0
+        state["d"] += 0.0001
+        window.push(state["t"], state["d"])
+    return push
+
+@benchmark("engines.simulation.scalar")
+async def simulation_scalar():
+    engine = SimulationEngine()
+    return lambda: engine.generate_synthetic_load("Pump")
+
+@benchmark("engines.simulation.batch_10k")
+async def simulation_batch():
+    engine = SimulationEngine()
+    return lambda: engine.process_batch({}, {"asset_type": "Pump", "size": BATCH, "seed": 0})
+
+@benchmark("engines.monte_carlo.128x1000")
+async def monte_carlo_chunk():
+    engine = MonteCarloRULEngine()
+    ids = [f"asset-{i}" for i in range(128)]
+    columns = {"current_damage": np.linspace(0.0, 0.9, 128)}
+    return lambda: engine.process_batch(columns, {"asset_ids": ids, "scenarios": 1000, "workers": 1})
@@ -0,0 +1,108 @@
+from typing import Any, Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.commands: List[tuple] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.commands = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        results = [getattr(self.redis, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+class FakeRedis:
+    """
+    Just enough of redis.asyncio.Redis for the state cache, config cache,
+    dashboard aggregates and live feed to run without a server.
+    """
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+
+    def pipeline(self, transaction: bool = False) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self._set(key, str(value) if isinstance(value, (int, float)) else value, ex=ex)
+        return True
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def publish(self, channel, message):
+        return 0
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def _incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+    def _set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def _hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def _hgetall(self, key):
+        return {k.encode(): str(v).encode() for k, v in self.data.get(key, {}).items()}
+
+    def _hincrby(self, key, field, amount):
+        bucket = self.data.setdefault(key, {})
+        bucket[field] = int(float(bucket.get(field, 0))) + amount
+
+    def _hincrbyfloat(self, key, field, amount):
+        bucket = self.data.setdefault(key, {})
+        bucket[field] = float(bucket.get(field, 0)) + amount
+
+    def _zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def _zcount(self, key, low, high):
+        return sum(1 for score in self.data.get(key, {}).values() if score >= float(low))
+
+    def _zremrangebyscore(self, key, low, high):
+        members = self.data.get(key, {})
+        for member in [m for m, score in members.items() if score <= float(high)]:
+            del members[member]
+
+    def _publish(self, channel, message):
+        return 0
+
+async def memory_database():
+    """
+    Fresh in-memory SQLite database with the full schema. StaticPool keeps the
+    single connection alive, since every new :memory: connection is empty.
+    """
+    from app.db.base import Base
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
@@ -0,0 +1,128 @@
+import inspect
+import json
+import os
+import platform
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# name -> async factory returning the operation to time (may return an awaitable)
+BENCHMARKS: Dict[str, Callable[[], Awaitable[Callable[[], Any]]]] = {}
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def benchmark(name: str):
+    """
+    Registers an async factory. The factory does the setup and returns the
+    callable whose per-call time is measured; if the callable returns an
+    awaitable, it is awaited as part of the call.
+    """
+    def register(factory):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark {name}")
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+async def _time_calls(operation: Callable[[], Any], number: int, is_async: bool) -> float:
+    if is_async:
+        start = time.perf_counter()
+        for _ in range(number):
+            await operation()
+    else:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+    return time.perf_counter() - start
+
+async def measure(operation: Callable[[], Any], repeats: int = 5, min_time: float = 0.1) -> Dict[str, float]:
+    """
+    Calibrates the number of calls per repeat so each repeat takes at least
+    `min_time`, then returns per-call timings in seconds.
+    """
+    # Warm-up call; also tells whether the operation returns an awaitable
+    result = operation()
+    is_async = inspect.isawaitable(result)
+    if is_async:
+        await result
+
+    number = 1
+    while True:
+        elapsed = await _time_calls(operation, number, is_async)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    samples = [await _time_calls(operation, number, is_async) / number for _ in range(repeats)]
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "calls": number,
+    }
+
+async def run(names: List[str], repeats: int, min_time: float, quiet: bool = False) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        operation = await BENCHMARKS[name]()
+        results[name] = await measure(operation, repeats, min_time)
+        if not quiet:
+            print(f"  {name:45} {format_time(results[name]['median_s']):>12}/op  (+/- {format_time(results[name]['stdev_s'])})")
+    return results
+
+def is_regression(result: Dict[str, float], before: Dict[str, float], tolerance: float) -> bool:
+    # Best-of-repeats is the least noisy estimate of the code's own cost
+    return result["min_s"] > before["min_s"] * (1 + tolerance)
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+def environment() -> Dict[str, Any]:
+    import numpy
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+def load_baseline(path: str = BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: str = BASELINE_PATH, merge: bool = True):
+    baseline = (load_baseline(path) or {}) if merge else {}
+    benchmarks = {**baseline.get("benchmarks", {}), **results}
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "benchmarks": dict(sorted(benchmarks.items()))}, f, indent=2)
+        f.write("\n")
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Prints the change against the baseline and returns the names that got
+    slower by more than `tolerance` (a fraction, e.g. 0.25 = 25%).
+    """
+    regressions = []
+    if baseline.get("environment") != environment():
+        print(f"\nNote: baseline was recorded on a different environment: {baseline.get('environment')}")
+    print(f"\nAgainst baseline (tolerance {tolerance:.0%}):")
+    for name, result in results.items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before:
+            print(f"  {name:45} new")
+            continue
+        ratio = result["min_s"] / before["min_s"]
+        if is_regression(result, before, tolerance):
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            flag = "improved"
+        else:
+            flag = "ok"
+        print(f"  {name:45} {format_time(before['min_s']):>12} -> {format_time(result['min_s']):>12}  {ratio:6.2f}x  {flag}")
+    return regressions
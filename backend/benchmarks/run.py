@@ -0,0 +1,89 @@
+"""
+Micro-benchmarks for the engines, the ingest pipeline, auth and asset listing.
+
+    python -m benchmarks.run                  # run all, compare with baseline.json
+    python -m benchmarks.run -k engines.rul   # only names containing the filter
+    python -m benchmarks.run --save           # record the results as the new baseline
+
+Exits with status 1 when any benchmark is slower than its baseline by more
+than --tolerance, so it can gate CI.
+"""
+import os
+import sys
+import argparse
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Self-contained runs: no broker, no Redis, no history files on disk
+for key, value in {
+    "DATABASE_URL": "sqlite+aiosqlite:///:memory:",
+    "EVENT_BUS_BACKEND": "memory",
+    "HISTORY_ENABLED": "false",
+    "KAFKA_BOOTSTRAP_SERVERS": "localhost:9092",
+    "KAFKA_GROUP_ID": "benchmarks",
+    "SECRET_KEY": "benchmark-secret",
+}.items():
+    os.environ.setdefault(key, value)
+
+def main():
+    parser = argparse.ArgumentParser(description="FORSEE micro-benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="run benchmarks whose name contains this")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per repeat")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=None, help="baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--confirm", type=int, default=2, help="re-measure suspected regressions this many times")
+    parser.add_argument("--save", action="store_true", help="write results to the baseline file")
+    args = parser.parse_args()
+
+    from loguru import logger
+    logger.remove() # measure the code, not the log sinks
+
+    from benchmarks import harness
+    # Imported for their registrations
+    import benchmarks.bench_engines  # noqa: F401
+    import benchmarks.bench_ingest  # noqa: F401
+    import benchmarks.bench_auth  # noqa: F401
+    import benchmarks.bench_assets  # noqa: F401
+    import benchmarks.bench_chat  # noqa: F401
+
+    names = [name for name in harness.BENCHMARKS if args.filter in name]
+    if not names:
+        parser.error(f"no benchmark matches {args.filter!r}")
+    path = args.baseline or harness.BASELINE_PATH
+
+    print(f"Running {len(names)} benchmarks")
+    results = asyncio.run(harness.run(names, args.repeats, args.min_time))
+
+    if args.save:
+        harness.save_baseline(results, path)
+        print(f"\nBaseline written to {path}")
+        return 0
+
+    baseline = harness.load_baseline(path)
+    if baseline is None:
+        print(f"\nNo baseline at {path}; run with --save to record one")
+        return 0
+    # A slowdown has to reproduce before it is reported: re-measure suspects and
+    # keep their best run, so one noisy sample on a busy machine does not fail the suite
+    for _ in range(args.confirm):
+        suspects = [
+            name for name, result in results.items()
+            if name in baseline.get("benchmarks", {}) and harness.is_regression(result, baseline["benchmarks"][name], args.tolerance)
+        ]
+        if not suspects:
+            break
+        print(f"\nRe-measuring {len(suspects)} suspected regression(s)")
+        for name, result in asyncio.run(harness.run(suspects, args.repeats, args.min_time, quiet=True)).items():
+            if result["min_s"] < results[name]["min_s"]:
+                results[name] = result
+
+    regressions = harness.compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
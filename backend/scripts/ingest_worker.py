@@ -0,0 +1,58 @@
+import sys
+import os
+import argparse
+import asyncio
+import signal
+import multiprocessing
+
+# Add the parent directory to sys.path to resolve app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+async def run_worker(args):
+    from app.utils.logging import setup_logging
+    from app.core.lifecycle import start_background_services, stop_background_services
+    from app.workers.ingest import TelemetryIngestWorker
+
+    setup_logging()
+    worker = TelemetryIngestWorker(args.topic, args.batch_size, args.batch_timeout)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError: # Windows
+            pass
+
+    await start_background_services()
+    try:
+        await worker.run()
+    finally:
+        await stop_background_services()
+        from app.utils.metrics import mark_process_dead
+        mark_process_dead()
+
+def main(args):
+    asyncio.run(run_worker(args))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kafka telemetry ingestion worker")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes in this consumer group")
+    parser.add_argument("--topic", default=None, help="raw telemetry topic (default: TELEMETRY_TOPIC)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--batch-timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        main(args)
+    else:
+        # Each process joins the same consumer group; Kafka spreads partitions
+        # (and therefore assets) across them.
+        procs = [multiprocessing.Process(target=main, args=(args,)) for _ in range(args.processes)]
+        for p in procs:
+            p.start()
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            for p in procs:
+                p.terminate()
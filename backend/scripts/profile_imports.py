@@ -0,0 +1,91 @@
+"""
+Import-time profiler for worker boot.
+
+Imports a module in fresh interpreters and reports the wall time of the
+import plus the slowest modules (`python -X importtime`), by their own time
+and summed per top-level package.
+
+    python scripts/profile_imports.py                      # app.main
+    python scripts/profile_imports.py --module app.workers.ingest --top 30
+    python scripts/profile_imports.py --budget 1.0         # exit 1 if slower (CI)
+
+The wall time is the fastest of --repeat plain imports, so the first run's
+cold disk cache does not dominate; the tables come from one -X importtime run.
+
+app.workers.ingest fits a 1.0 s budget; app.main does not, since FastAPI
+loads its OpenAPI models on import and the routers are registered up front.
+"""
+import sys
+import os
+import argparse
+import subprocess
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_import(module: str, importtime: bool) -> subprocess.CompletedProcess:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - start)"
+    )
+    flags = ["-X", "importtime"] if importtime else []
+    proc = subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND_DIR, env=dict(os.environ, PYTHONPATH=BACKEND_DIR), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return proc
+
+def import_seconds(module: str) -> float:
+    # Plain run: -X importtime itself slows the import down
+    return float(run_import(module, importtime=False).stdout.strip().splitlines()[-1])
+
+def import_profile(module: str) -> list:
+    """
+    [(self us, cumulative us, module name)] for every module the import loads.
+    """
+    entries = []
+    for line in run_import(module, importtime=True).stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        entries.append((int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+def by_package(entries: list) -> dict:
+    """
+    Microseconds per top-level package: the sum of its modules' self time, so
+    nested imports within a package are not double counted.
+    """
+    totals = defaultdict(int)
+    for self_us, _, name in entries:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+def main(args):
+    wall = min(import_seconds(args.module) for _ in range(args.repeat))
+    entries = import_profile(args.module)
+
+    print(f"import {args.module}: {wall * 1000:.1f} ms wall (best of {args.repeat}), {len(entries)} modules")
+    print("\nSlowest modules (self time):")
+    for self_us, cumulative_us, name in sorted(entries, reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {cumulative_us / 1000:9.1f} ms cumulative  {name}")
+
+    print("\nSlowest packages:")
+    packages = sorted(by_package(entries).items(), key=lambda item: item[1], reverse=True)
+    for name, total_us in packages[:args.top]:
+        print(f"  {total_us / 1000:9.1f} ms  {name}")
+
+    if args.budget and wall > args.budget:
+        print(f"\nOver budget: {wall:.3f}s > {args.budget:.3f}s")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the slowest imports of a module")
+    parser.add_argument("--module", default="app.main", help="module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument("--repeat", type=int, default=3, help="runs; the fastest is reported")
+    parser.add_argument("--budget", type=float, default=0.0, help="fail if the import takes longer (seconds, 0 = off)")
+    main(parser.parse_args())
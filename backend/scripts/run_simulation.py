@@ -1,98 +1,266 @@
+"""
+Load tester for the FORSEE API.
+
+Seeds a tenant, an admin user and N assets straight into the configured
+database, then drives traffic at a target rate with bounded concurrency and
+reports throughput and p50/p95/p99 latency per operation.
+
+    # no server needed: requests go through the ASGI app in-process
+    python scripts/run_simulation.py --mode asgi --assets 200 --rate 500 --duration 30
+
+    # against a running server sharing the same DATABASE_URL
+    python scripts/run_simulation.py --url http://localhost:8000 --scenario mixed
+
+Scenarios: ingest (POST /reliability/ingest/{id}), dashboard (GET /dashboard/
+and GET /assets/), mixed (--read-ratio of reads, rest ingest).
+Results are written as JSON; pass --compare old.json to diff two runs.
+"""
 import sys
 import os
+import argparse
 import asyncio
-import httpx
+import json
+import platform
 import random
 import time
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timezone
 
-# Add the parent directory to sys.path to resolve app modules if needed, 
-# though we are using HTTP here so it's strictly a client.
+# Add the parent directory to sys.path to resolve app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-ASSETS = [
-    {"id": "pump-001", "type": "Pump", "name": "Main Feed Pump"},
-    {"id": "turb-002", "type": "Turbine", "name": "Gas Turbine A"},
-    {"id": "comp-003", "type": "Compressor", "name": "Air Compressor 1"},
-]
-
-API_URL = "http://localhost:8000/api/v1"
-
-async def register_assets(client):
-    print("Registering assets...")
-    # Use hardcoded tenant for demo
-    tenant_id = "demo-tenant"
-    
-    # Login to get token (Skipping for now if auth is complex, assumes dev mode or we can add a bypass/token generation script)
-    # For simplicity, we'll implement a basic loop without auth if endpoints open, 
-    # but endpoints are protected. We need a token.
-    
-    # Login as admin (assuming created, or we create one). 
-    # Since we can't easily login without a user in DB, 
-    # we might need to seed the DB first.
-    pass
-
-async def simulate_traffic():
-    print(f"Starting simulation on {API_URL}")
-    
-    # We need to bypass auth or have a flexible token for simulation.
-    # Alternatively, the simulation runner can import the app code directly 
-    # and call the service layer if we want to bypass HTTP auth for local demo.
-    # But HTTP is better for "real" testing.
-    
-    # Let's try to ingest without auth? No, `get_current_tenant_id` is required.
-    # We will generate a token using the internal security utility since we have access to the code!
+ASSET_TYPES = ["Pump", "Turbine", "Compressor"]
+
+def loadtest_email(tenant_id: str) -> str:
+    return f"loadtest@{tenant_id}.local"
+
+async def seed(tenant_id: str, asset_count: int) -> str:
+    """
+    Idempotently creates the tenant, an admin user and `asset_count` assets.
+    Returns the admin user's id.
+    """
+    from sqlalchemy import select
+    from app.core.security import get_password_hash
+    from app.db.base import Base
+    from app.db.models import Asset, Tenant, TelemetrySnapshot, User
+    from app.db.session import SessionLocal, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with SessionLocal() as db:
+        if not await db.get(Tenant, tenant_id):
+            db.add(Tenant(id=tenant_id, name=f"Load test {tenant_id}"))
+        email = loadtest_email(tenant_id)
+        user = await db.scalar(select(User).where(User.email == email))
+        if not user:
+            user = User(
+                email=email, hashed_password=get_password_hash("loadtest"),
+                full_name="Load Test", role="admin", tenant_id=tenant_id,
+            )
+            db.add(user)
+
+        ids = [f"{tenant_id}-asset-{i:06d}" for i in range(asset_count)]
+        existing = set(await db.scalars(select(Asset.id).where(Asset.id.in_(ids))))
+        for i, asset_id in enumerate(ids):
+            if asset_id in existing:
+                continue
+            db.add(Asset(id=asset_id, name=f"Asset {i}", type=ASSET_TYPES[i % len(ASSET_TYPES)], tenant_id=tenant_id))
+            db.add(TelemetrySnapshot(asset_id=asset_id, tenant_id=tenant_id, current_damage=0.0))
+        await db.commit()
+        await db.refresh(user)
+        print(f"Seeded tenant {tenant_id}: {asset_count} assets ({asset_count - len(existing)} new)")
+        return str(user.id)
+
+async def seeded_user_id(tenant_id: str) -> str:
+    """
+    The id of the admin user an earlier seeding run created (for --no-seed).
+    """
+    from sqlalchemy import select
+    from app.db.models import User
+    from app.db.session import ReadSessionLocal
+
+    async with ReadSessionLocal() as db:
+        user_id = await db.scalar(select(User.id).where(User.email == loadtest_email(tenant_id)))
+    if user_id is None:
+        raise SystemExit(f"No load test user {loadtest_email(tenant_id)}: run once without --no-seed, or pass --user-id")
+    return str(user_id)
+
+def make_operation(scenario: str, asset_ids: list, read_ratio: float, rng: random.Random):
+    """
+    Returns (operation name, method, path, json body) for the next request.
+    """
+    read = scenario == "dashboard" or (scenario == "mixed" and rng.random() < read_ratio)
+    if read:
+        if rng.random() < 0.5:
+            return "dashboard", "GET", "/api/v1/dashboard/", None
+        return "list_assets", "GET", "/api/v1/assets/?limit=50", None
+
+    load = rng.uniform(50, 90)
+    body = {
+        "load": load,
+        "temp": 40 + load * 0.3 + rng.uniform(-2, 2),
+        "ambient_temp": 25.0 + rng.uniform(-5, 5),
+        "humidity": 60.0 + rng.uniform(-10, 10),
+    }
+    return "ingest", "POST", f"/api/v1/reliability/ingest/{rng.choice(asset_ids)}", body
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies: dict, statuses: dict, elapsed: float) -> dict:
+    operations = {}
+    for name, values in latencies.items():
+        values.sort()
+        operations[name] = {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+            "statuses": dict(statuses[name]),
+        }
+    total = sum(len(v) for v in latencies.values())
+    return {"elapsed_s": round(elapsed, 3), "requests": total, "throughput_rps": round(total / elapsed, 2), "operations": operations}
+
+async def run_load(client, headers: dict, args, asset_ids: list) -> dict:
+    rng = random.Random(args.seed)
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    start = time.perf_counter()
+    deadline = start + args.duration
+
+    async def producer():
+        # Open loop: request i is due at start + i / rate, independent of how fast
+        # earlier ones completed. Latency is measured from the due time, so queueing
+        # behind a slow server shows up instead of being hidden (coordinated omission).
+        sent = 0
+        while time.perf_counter() < deadline and (not args.requests or sent < args.requests):
+            due = start + sent / args.rate if args.rate else time.perf_counter()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await queue.put((due, make_operation(args.scenario, asset_ids, args.read_ratio, rng)))
+            sent += 1
+        for _ in range(args.concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            due, (name, method, path, body) = item
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies[name].append(time.perf_counter() - due)
+            statuses[name][status] += 1
+
+    await asyncio.gather(producer(), *(worker() for _ in range(args.concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+def compare(current: dict, previous: dict):
+    print(f"\nComparison with {previous.get('started_at')} ({previous['config'].get('scenario')}):")
+    for name, now in current["results"]["operations"].items():
+        before = previous["results"]["operations"].get(name)
+        if not before:
+            continue
+        parts = []
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before[metric]:
+                parts.append(f"{metric} {before[metric]} -> {now[metric]} ({(now[metric] / before[metric] - 1) * 100:+.1f}%)")
+        print(f"  {name}: " + ", ".join(parts))
+
+async def main(args):
+    if args.mode == "asgi":
+        # In-process runs need neither a broker nor a port
+        os.environ.setdefault("EVENT_BUS_BACKEND", "memory")
+
+    import httpx
+    from loguru import logger
     from app.core.security import create_access_token
-    token = create_access_token("sim_user", tenant_id="demo-tenant")
+
+    if args.user_id:
+        user_id = str(args.user_id)
+    elif args.no_seed:
+        user_id = await seeded_user_id(args.tenant)
+    else:
+        user_id = await seed(args.tenant, args.assets)
+    token = create_access_token(user_id, tenant_id=args.tenant)
     headers = {"Authorization": f"Bearer {token}"}
-    
-    async with httpx.AsyncClient() as client:
-        # 1. Register Assets (Idempotent-ish via backend check)
-        for asset in ASSETS:
-            try:
-                # We need to register first. 
-                # But /assets/register needs admin/engineer role.
-                # Let's create an admin token.
-                admin_token = create_access_token("admin_user", tenant_id="demo-tenant")
-                # Wait, the token payload needs role?
-                # The create_access_token helper in security.py only takes subject and tenant_id.
-                # It doesn't take role? 
-                # Let's check security.py content again.
-                pass
-            except Exception:
-                pass
-
-        # 2. Main Loop
-        while True:
-            for asset in ASSETS:
-                # Generate synthetic data
-                load = random.uniform(50, 90)
-                temp = 40 + (load * 0.3) + random.uniform(-2, 2)
-                
-                payload = {
-                    "load": load,
-                    "temp": temp,
-                    "ambient_temp": 25.0 + random.uniform(-5, 5),
-                    "humidity": 60.0 + random.uniform(-10, 10),
-                }
-                
-                try:
-                    resp = await client.post(
-                        f"{API_URL}/reliability/ingest/{asset['id']}",
-                        json=payload,
-                        headers=headers
-                    )
-                    if resp.status_code == 200:
-                        print(f"[{datetime.now().time()}] Ingested {asset['id']}: Load={load:.1f}, RUL={resp.json().get('current_rul', 'N/A'):.1f}")
-                    else:
-                        print(f"Failed to ingest {asset['id']}: {resp.status_code} - {resp.text}")
-                except Exception as e:
-                    print(f"Error connecting to backend: {e}")
-            
-            await asyncio.sleep(2)
+    asset_ids = [f"{args.tenant}-asset-{i:06d}" for i in range(args.assets)]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.mode == "asgi":
+        from app.main import app
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+        await app.router.startup()
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+    else:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout)
+
+    print(f"Running {args.scenario} for {args.duration}s ({args.mode}, rate={args.rate or 'max'}, concurrency={args.concurrency})")
+    started_at = datetime.now(timezone.utc).isoformat()
+    try:
+        results = await run_load(client, headers, args, asset_ids)
+    finally:
+        await client.aclose()
+        if args.mode == "asgi":
+            await app.router.shutdown()
+
+    report = {
+        "started_at": started_at,
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "environment": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+
+    print(f"\n{results['requests']} requests in {results['elapsed_s']}s ({results['throughput_rps']} req/s)")
+    for name, op in results["operations"].items():
+        print(f"  {name:12} n={op['requests']:<7} {op['throughput_rps']:>9} req/s  "
+              f"p50={op['p50_ms']}ms p95={op['p95_ms']}ms p99={op['p99_ms']}ms  {op['statuses']}")
+
+    output = args.output or os.path.join("loadtest-results", f"{args.scenario}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FORSEE API load tester")
+    parser.add_argument("--mode", choices=["http", "asgi"], default="http", help="asgi: call the app in-process, no server")
+    parser.add_argument("--url", default="http://localhost:8000", help="server base URL (http mode)")
+    parser.add_argument("--scenario", choices=["ingest", "dashboard", "mixed"], default="ingest")
+    parser.add_argument("--read-ratio", type=float, default=0.2, help="share of reads in the mixed scenario")
+    parser.add_argument("--assets", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=200.0, help="target requests/s (0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0 = duration only)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--tenant", default="loadtest")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed for the request mix")
+    parser.add_argument("--no-seed", action="store_true", help="skip database seeding (uses the user an earlier run seeded)")
+    parser.add_argument("--user-id", type=int, help="sign requests as this user instead of the seeded one (implies --no-seed)")
+    parser.add_argument("--output", help="report path (default: loadtest-results/<scenario>-<time>.json)")
+    parser.add_argument("--compare", help="previous report to compare against")
+    args = parser.parse_args()
+
     try:
-        asyncio.run(simulate_traffic())
+        asyncio.run(main(args))
     except KeyboardInterrupt:
-        print("Simulation stopped.")
+        print("Load test stopped.")
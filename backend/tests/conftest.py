@@ -0,0 +1,88 @@
+"""
+Test settings: no external services, and no connection to the configured
+database. Set before any app module is imported, since settings are read
+at import time.
+"""
+import os
+import tempfile
+
+# A scratch file rather than :memory:, so that services opening their own
+# sessions (snapshot checkpoints, the audit sink) see the test's data
+_database_dir = tempfile.TemporaryDirectory(prefix="forsee-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_database_dir.name}/test.db"
+os.environ["EVENT_BUS_BACKEND"] = "memory"
+os.environ["HISTORY_ENABLED"] = "false"
+
+import pytest  # noqa: E402
+
+@pytest.fixture
+async def db():
+    """
+    Session on a freshly created app database. The in-process state of the
+    service singletons is reset around each test.
+    """
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine, engines
+    from app.services.config_cache import config_cache
+    from app.services.reliability import reliability_service
+    from app.services.snapshot_store import snapshot_store
+    from app.services.user_cache import user_cache
+
+    def reset():
+        reliability_service.rul_engine.windows.clear()
+        config_cache._local.clear()
+        config_cache._generations.clear()
+        config_cache._loaded_tenants.clear()
+        snapshot_store._states.clear()
+        snapshot_store._dirty.clear()
+        user_cache._local.clear()
+        user_cache._changed_at.clear()
+
+    reset()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        yield session
+    reset()
+    # Pooled connections belong to this test's event loop
+    for pooled in engines.values():
+        await pooled.dispose()
+
+@pytest.fixture
+def add_assets(db):
+    """
+    add_assets(tenant_id, *asset_ids): creates the tenant (once) and its assets.
+    """
+    from app.db.models import Asset, Tenant
+
+    tenants = set()
+
+    async def add(tenant_id: str, *asset_ids: str, type: str = "Pump"):
+        if tenant_id not in tenants:
+            db.add(Tenant(id=tenant_id, name=tenant_id))
+            tenants.add(tenant_id)
+        for asset_id in asset_ids:
+            db.add(Asset(id=asset_id, tenant_id=tenant_id, name=asset_id, type=type))
+        await db.commit()
+    return add
+
+@pytest.fixture
+async def client(db):
+    """
+    HTTP client for the v1 API (no lifespan, so no background services).
+    """
+    import httpx
+    from fastapi import FastAPI
+    from app.api.v1.api import api_router
+    from app.core.config import settings
+
+    app = FastAPI()
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+
+def auth_headers(tenant_id: str, user_id: str = "user-1", role: str = None) -> dict:
+    from app.core.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token(user_id, tenant_id, role=role)}"}
@@ -0,0 +1,53 @@
+"""
+Asset list pagination by RUL.
+"""
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.models import TelemetrySnapshot
+from conftest import auth_headers
+
+RULS = {"a-1": 300.0, "a-2": 100.0, "a-3": 200.0, "a-4": 100.0, "a-5": None}
+
+@pytest.fixture
+async def fleet(db, add_assets):
+    """
+    tenant-a: a-1..a-5 with snapshots (a-5 without a RUL), a-6 without one.
+    tenant-b: b-1, which must never show up.
+    """
+    await add_assets("tenant-a", *RULS, "a-6")
+    await add_assets("tenant-b", "b-1")
+    for asset_id, rul in RULS.items():
+        db.add(TelemetrySnapshot(asset_id=asset_id, tenant_id="tenant-a", current_rul=rul))
+    db.add(TelemetrySnapshot(asset_id="b-1", tenant_id="tenant-b", current_rul=50.0))
+    await db.commit()
+    return db
+
+async def _walk(client, **params) -> list:
+    ids, cursor = [], None
+    while True:
+        response = await client.get(
+            f"{settings.API_V1_STR}/assets/",
+            params={"sort": "rul", "limit": 2, **params, **({"cursor": cursor} if cursor else {})},
+            headers=auth_headers("tenant-a"),
+        )
+        assert response.status_code == 200
+        page = response.json()
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+@pytest.mark.parametrize("order, expected", [
+    ("asc", ["a-2", "a-4", "a-3", "a-1", "a-5", "a-6"]),
+    ("desc", ["a-1", "a-3", "a-4", "a-2", "a-6", "a-5"]),
+])
+async def test_rul_pages_put_assets_without_rul_last(fleet, client, order, expected):
+    assert await _walk(client, order=order) == expected
+
+async def test_rul_pages_apply_filters(fleet, client):
+    await fleet.execute(update(TelemetrySnapshot).where(TelemetrySnapshot.asset_id == "a-3").values(current_rul=None))
+    await fleet.commit()
+
+    assert await _walk(client, rul_max=250.0) == ["a-2", "a-4"]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.db.models import AuditLog
+from app.core.config import settings
+from app.services.audit import AuditSink, _copy_value, audit_sink
+from app.services.reliability import reliability_service
+
+READINGS = [{"asset_id": "a-1", "load": 120.0, "temp": 70.0}, {"asset_id": "a-2", "load": 60.0, "temp": 70.0}]
+
+@pytest.fixture
+async def running_sink(db):
+    await audit_sink.start()
+    yield audit_sink
+    await audit_sink.stop()
+
+async def _audit_count(db) -> int:
+    return await db.scalar(select(func.count()).select_from(AuditLog))
+
+async def test_failed_commit_is_not_audited(db, add_assets, running_sink, monkeypatch):
+    await add_assets("tenant-a", "a-1", "a-2")
+
+    async def fail():
+        raise RuntimeError("commit failed")
+    monkeypatch.setattr(db, "commit", fail)
+    with pytest.raises(RuntimeError):
+        await reliability_service.ingest_batch(db, "tenant-a", READINGS)
+    await db.rollback()
+
+    assert running_sink._queue.qsize() == 0
+    await running_sink.stop()
+    assert await _audit_count(db) == 0
+
+async def test_committed_batch_is_audited(db, add_assets, running_sink):
+    await add_assets("tenant-a", "a-1", "a-2")
+
+    await reliability_service.ingest_batch(db, "tenant-a", READINGS)
+    await running_sink.stop()
+
+    actions = sorted((await db.scalars(select(AuditLog.action))).all())
+    assert actions == ["telemetry_processed", "telemetry_processed", "violation_detected"]
+
+async def test_without_sink_entries_are_committed(db, add_assets):
+    await add_assets("tenant-a", "a-1", "a-2")
+
+    await reliability_service.ingest_batch(db, "tenant-a", READINGS)
+    await db.close()
+
+    assert await _audit_count(db) == 3
+
+async def test_failed_flush_keeps_rare_entries(db, add_assets, running_sink, monkeypatch):
+    await add_assets("tenant-a", "a-1", "a-2")
+    monkeypatch.setattr(settings, "AUDIT_RETRY_BACKOFF", 0.01)
+    flush = AuditSink._flush
+    calls = []
+
+    async def flaky(self, batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        await flush(self, batch)
+    monkeypatch.setattr(AuditSink, "_flush", flaky)
+
+    await reliability_service.ingest_batch(db, "tenant-a", READINGS)
+    await asyncio.wait_for(running_sink.drain(), timeout=5)
+
+    # The sampled entries of the failed batch are gone, the violation is retried
+    assert calls == [3, 1]
+    assert (await db.scalars(select(AuditLog.action))).all() == ["violation_detected"]
+
+async def test_full_queue_fails_rare_entries_after_deadline(db, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_QUEUE_SIZE", 1)
+    monkeypatch.setattr(settings, "AUDIT_ENQUEUE_DEADLINE_MS", 50)
+    sink = AuditSink()
+    # A running sink whose drainer is stalled
+    sink._queue = asyncio.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+    sink._task = asyncio.get_running_loop().create_future()
+    entry = {"tenant_id": "tenant-a", "entity_type": "AssetRel", "entity_id": "a-1", "action": "violation_detected"}
+
+    await sink.write(db, [entry])
+    with pytest.raises(HTTPException) as exc:
+        await asyncio.wait_for(sink.write(db, [entry]), timeout=5)
+
+    assert exc.value.status_code == 503
+    sink._task.cancel()
+
+def test_copy_sends_null_for_missing_json():
+    entry = {"action": "telemetry_processed", "new_value": {"damage": 0.1}, "old_value": None}
+    assert _copy_value(entry, "old_value") is None
+    assert _copy_value(entry, "metadata_info") is None
+    assert json.loads(_copy_value(entry, "new_value")) == {"damage": 0.1}
+    assert _copy_value(entry, "action") == "telemetry_processed"
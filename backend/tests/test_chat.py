@@ -0,0 +1,131 @@
+"""
+ChatService against a fake backend: streaming, history trimming and caching.
+"""
+import pytest
+
+from app.core.config import settings
+from app.db.models import User
+from app.services.chat import BLOCKED_RESPONSE, ChatBackend, ChatService, chat_service, needs_fleet_data
+from conftest import auth_headers
+
+CHAT_URL = f"{settings.API_V1_STR}/chatbot/"
+
+class FakeBackend(ChatBackend):
+    name = "fake"
+
+    def __init__(self, chunks=("Pump ", "P-1 ", "is fine."), fail_after=None):
+        self.chunks = list(chunks)
+        self.fail_after = fail_after
+        self.calls = []
+
+    async def stream(self, message, history, context=""):
+        self.calls.append((message, list(history), context))
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("backend went away")
+            yield chunk
+
+@pytest.fixture(autouse=True)
+def local_cache_only(monkeypatch):
+    monkeypatch.setattr(settings, "CHATBOT_CACHE_TTL", 60.0)
+
+async def test_stream_passes_chunks_through_in_order():
+    backend = FakeBackend()
+    chunks = [text async for text in ChatService(backend).stream("How is P-1?", [], "P-1: damage 0.1")]
+
+    assert chunks == ["Pump ", "P-1 ", "is fine."]
+    message, history, context = backend.calls[0]
+    assert (message, history) == ("How is P-1?", [])
+    assert context == "Current fleet data:\nP-1: damage 0.1"
+
+async def test_answer_joins_the_stream_and_is_cached():
+    backend = FakeBackend()
+    service = ChatService(backend)
+
+    assert await service.answer("How is P-1?", [("user", "Hi"), ("model", "Hello")]) == "Pump P-1 is fine."
+    # Same question modulo case and whitespace, after the same turns
+    assert await service.answer("how is  p-1?", [("user", "hi"), ("model", "hello")]) == "Pump P-1 is fine."
+    assert len(backend.calls) == 1
+
+async def test_history_is_trimmed_to_the_budget(monkeypatch):
+    monkeypatch.setattr(settings, "CHATBOT_HISTORY_TOKEN_BUDGET", 10)
+    backend = FakeBackend()
+    history = [("user", "first question " * 5), ("model", "long answer " * 5), ("user", "Short?"), ("model", "Yes.")]
+
+    await ChatService(backend).answer("And now?", history)
+
+    _, sent, context = backend.calls[0]
+    assert sent == [("user", "Short?"), ("model", "Yes.")]
+    assert context.startswith("Earlier in this conversation the user asked: first question")
+
+async def test_blocked_and_failed_answers_are_not_cached():
+    blocked = FakeBackend(chunks=[BLOCKED_RESPONSE])
+    service = ChatService(blocked)
+    await service.answer("Something odd", [])
+    await service.answer("Something odd", [])
+    assert len(blocked.calls) == 2
+
+    failing = FakeBackend(fail_after=1)
+    service = ChatService(failing)
+    with pytest.raises(RuntimeError):
+        await service.answer("How is P-1?", [])
+    failing.fail_after = None
+    assert await service.answer("How is P-1?", []) == "Pump P-1 is fine."
+    assert len(failing.calls) == 2
+
+def test_backends_must_implement_stream():
+    class Incomplete(ChatBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+@pytest.mark.parametrize("message, last_question, expected", [
+    ("What is RUL?", "", False),
+    ("How does humidity affect aging?", "", False),
+    ("Which pump is closest to failure?", "", True),
+    ("How is P-101 doing?", "", True),
+    ("And why is that?", "What is our worst asset?", True),
+])
+def test_needs_fleet_data(message, last_question, expected):
+    history = [("user", last_question), ("model", "...")] if last_question else []
+    assert needs_fleet_data(message, history) is expected
+
+@pytest.fixture
+async def users(db, add_assets):
+    """
+    user id per tenant: tenant-a with one asset, tenant-b with two.
+    """
+    ids = {}
+    for tenant_id, assets in (("tenant-a", 1), ("tenant-b", 2)):
+        await add_assets(tenant_id, *(f"{tenant_id}-pump-{i}" for i in range(assets)))
+        user = User(email=f"{tenant_id}@example.com", hashed_password="-", role="viewer", tenant_id=tenant_id)
+        db.add(user)
+        await db.commit()
+        ids[tenant_id] = str(user.id)
+    return ids
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(chat_service, "backend", backend)
+    monkeypatch.setattr(chat_service, "_local", type(chat_service._local)())
+    return backend
+
+async def test_general_answers_are_shared_across_tenants(client, users, fake_backend):
+    for tenant_id, user_id in users.items():
+        response = await client.post(CHAT_URL, json={"message": "What is RUL?"}, headers=auth_headers(tenant_id, user_id))
+        assert response.json() == {"response": "Pump P-1 is fine."}
+
+    assert len(fake_backend.calls) == 1
+    assert fake_backend.calls[0][2] == ""
+
+async def test_fleet_questions_get_their_tenants_data(client, users, fake_backend):
+    for tenant_id, user_id in users.items():
+        response = await client.post(CHAT_URL, json={"message": "Which asset is worst?"}, headers=auth_headers(tenant_id, user_id))
+        assert response.status_code == 200
+
+    contexts = [call[2] for call in fake_backend.calls]
+    assert [context.split(",")[0] for context in contexts] == [
+        "Current fleet data:\nFleet: 1 assets", "Current fleet data:\nFleet: 2 assets",
+    ]
@@ -0,0 +1,61 @@
+"""
+Config cache: per-tenant loading and invalidation racing a lookup.
+"""
+import pytest
+
+from app.core.cache import state_cache
+from app.db.models import ReliabilityConfig
+from app.services.config_cache import ConfigCache
+from benchmarks.fakes import FakeRedis
+
+@pytest.fixture
+async def fleet(db, add_assets):
+    await add_assets("tenant-a", "a-1", "a-2", "a-3")
+    await add_assets("tenant-b", "b-1")
+    return db
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(state_cache, "client", fake)
+    return fake
+
+async def _set_pump_threshold(db, threshold_load: float):
+    db.add(ReliabilityConfig(tenant_id="tenant-a", scope="asset_type", scope_key="Pump", threshold_load=threshold_load))
+    await db.commit()
+
+async def test_first_lookup_loads_the_whole_tenant(fleet):
+    cache = ConfigCache()
+
+    await cache.resolve(fleet, "tenant-a", ["a-1"])
+
+    assert sorted(cache._local) == [("tenant-a", "a-1"), ("tenant-a", "a-2"), ("tenant-a", "a-3")]
+
+async def test_edits_reach_other_workers_through_redis(fleet, redis):
+    worker, other = ConfigCache(), ConfigCache()
+    assert (await other.resolve(fleet, "tenant-a", ["a-1"]))["a-1"]["threshold_load"] == 80.0
+
+    await _set_pump_threshold(fleet, 90.0)
+    await worker.invalidate(fleet, "tenant-a", "asset_type", "Pump")
+    # The other worker missed the message (or has not dropped its entry yet)
+    other._local.clear()
+
+    assert (await other.resolve(fleet, "tenant-a", ["a-1"]))["a-1"]["threshold_load"] == 90.0
+
+async def test_lookup_racing_an_edit_caches_nothing_stale(fleet, redis, monkeypatch):
+    cache = ConfigCache()
+    load = cache._load
+
+    async def load_then_edit(db, tenant_id, asset_ids=None):
+        # Reads the old config, then the edit commits and invalidates
+        loaded = await load(db, tenant_id, asset_ids)
+        await _set_pump_threshold(db, 90.0)
+        await cache.invalidate(db, tenant_id, "asset_type", "Pump")
+        return loaded
+
+    monkeypatch.setattr(cache, "_load", load_then_edit)
+    assert (await cache.resolve(fleet, "tenant-a", ["a-1"]))["a-1"]["threshold_load"] == 80.0
+    monkeypatch.setattr(cache, "_load", load)
+
+    assert (await cache.resolve(fleet, "tenant-a", ["a-1"]))["a-1"]["threshold_load"] == 90.0
+    assert (await ConfigCache().resolve(fleet, "tenant-a", ["a-2"]))["a-2"]["threshold_load"] == 90.0
@@ -0,0 +1,89 @@
+"""
+Dashboard aggregates: averages, and reconciliation across workers.
+
+The flush-side fence runs as a Redis script, so that test needs a server:
+it runs when TEST_REDIS_URL points at a scratch Redis (its keys are flushed).
+"""
+import os
+
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import state_cache
+from app.db.models import TelemetrySnapshot
+from app.services.dashboard import DashboardAggregates
+from benchmarks.fakes import FakeRedis
+
+@pytest.fixture
+async def fleet(db, add_assets):
+    """
+    tenant-a with one snapshot at damage 0.4 and one without a damage value.
+    """
+    await add_assets("tenant-a", "a-1", "a-2")
+    db.add(TelemetrySnapshot(asset_id="a-1", tenant_id="tenant-a", current_damage=0.4))
+    db.add(TelemetrySnapshot(asset_id="a-2", tenant_id="tenant-a"))
+    await db.commit()
+    # Rows written outside the ORM (its column default would replace None)
+    await db.execute(update(TelemetrySnapshot).where(TelemetrySnapshot.asset_id == "a-2").values(current_damage=None))
+    await db.commit()
+    return db
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(state_cache, "client", fake)
+    return fake
+
+@pytest.fixture
+async def real_redis(monkeypatch):
+    url = os.getenv("TEST_REDIS_URL")
+    if not url:
+        pytest.skip("TEST_REDIS_URL not set")
+    from redis.asyncio import Redis
+
+    client = Redis.from_url(url)
+    await client.flushdb()
+    monkeypatch.setattr(state_cache, "client", client)
+    yield client
+    await client.flushdb()
+    await client.aclose()
+
+async def test_average_ignores_snapshots_without_damage(fleet):
+    stats = await DashboardAggregates().get("tenant-a", fleet)
+
+    assert stats["total_assets"] == 2
+    assert stats["avg_health"] == 60.0
+
+async def test_only_one_worker_reconciles(fleet, fake_redis):
+    assert await DashboardAggregates().reconcile()
+    assert not await DashboardAggregates().reconcile()
+
+async def test_reads_skip_local_deltas_from_before_the_recount(fleet, fake_redis):
+    worker, leader = DashboardAggregates(), DashboardAggregates()
+    # Committed before the recount, not yet flushed
+    worker.record("tenant-a", damage_delta=0.4, critical_delta=1, predictions=1)
+    fleet.add(TelemetrySnapshot(asset_id="a-3", tenant_id="tenant-a", current_damage=0.8))
+    await fleet.commit()
+
+    assert await leader.reconcile()
+    stats = await worker.get("tenant-a")
+
+    assert stats["critical_risks"] == 1
+    assert stats["predictions_run"] == 1
+    assert stats["avg_health"] == 40.0
+
+async def test_flushes_skip_deltas_from_before_the_recount(fleet, real_redis):
+    worker, leader = DashboardAggregates(), DashboardAggregates()
+    worker.record("tenant-a", damage_delta=0.4, critical_delta=1, predictions=1)
+    fleet.add(TelemetrySnapshot(asset_id="a-3", tenant_id="tenant-a", current_damage=0.8))
+    await fleet.commit()
+    assert await leader.reconcile()
+
+    await worker.flush()
+    worker.record("tenant-a", predictions=1)
+    await worker.flush()
+
+    stats = await DashboardAggregates().get("tenant-a")
+    assert stats["critical_risks"] == 1
+    assert stats["predictions_run"] == 2
+    assert stats["avg_health"] == 40.0
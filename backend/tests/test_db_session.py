@@ -0,0 +1,72 @@
+"""
+Session routing, concurrent read-modify-write on one asset, and endpoints
+that must not keep the (single SQLite) writer while awaiting other work.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import Tenant, TelemetrySnapshot
+from app.db.session import ReadSessionLocal, SessionLocal, engine, read_engine
+from app.services.config_cache import config_cache
+from app.services.reliability import reliability_service
+from conftest import auth_headers
+
+TELEMETRY = {"load": 60.0, "temp": 70.0}
+
+async def test_sessions_route_reads_only_when_read_only(db):
+    assert read_engine is not None
+    async with SessionLocal() as session:
+        # Even a plain SELECT in a writing session stays on the writer
+        assert session.sync_session.get_bind(clause=select(TelemetrySnapshot)) is engine.sync_engine
+    async with ReadSessionLocal() as session:
+        assert session.sync_session.get_bind() is read_engine.sync_engine
+
+async def _ingest(tenant_id: str, asset_id: str) -> float:
+    async with SessionLocal() as session:
+        snapshot = await reliability_service.ingest_telemetry(session, tenant_id, asset_id, TELEMETRY)
+        return snapshot.current_damage
+
+async def test_concurrent_ingests_of_one_asset_all_apply(db, add_assets):
+    await add_assets("tenant-a", "a-1", "a-2")
+    single = await _ingest("tenant-a", "a-2")
+
+    # No snapshot exists yet: the first of these race on creating it, the rest on updating it
+    damages = await asyncio.gather(*(_ingest("tenant-a", "a-1") for _ in range(4)))
+
+    async with SessionLocal() as session:
+        stored = {row.asset_id: row.current_damage for row in await session.scalars(select(TelemetrySnapshot))}
+    assert stored["a-1"] == max(damages)
+    assert stored["a-1"] == pytest.approx(single * 4)
+
+async def test_config_edit_does_not_hold_the_writer(client, add_assets, monkeypatch):
+    await add_assets("tenant-a", "a-1")
+    invalidate = config_cache.invalidate
+    stalled, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_invalidate(*args):
+        await invalidate(*args)
+        # A slow Redis round trip, after the affected assets were looked up
+        stalled.set()
+        await release.wait()
+
+    monkeypatch.setattr(config_cache, "invalidate", slow_invalidate)
+    edit = asyncio.create_task(client.put(
+        f"{settings.API_V1_STR}/configs/asset_type/Pump", json={"threshold_load": 90.0},
+        headers=auth_headers("tenant-a", user_id="1", role="engineer"),
+    ))
+    await asyncio.wait([edit, asyncio.create_task(stalled.wait())], timeout=5, return_when=asyncio.FIRST_COMPLETED)
+    assert stalled.is_set(), edit.result().text if edit.done() else "edit did not reach the invalidation"
+
+    try:
+        # Another writer (a request, the audit flush, a checkpoint) gets the connection meanwhile
+        async with SessionLocal() as session:
+            session.add(Tenant(id="tenant-b", name="tenant-b"))
+            await asyncio.wait_for(session.commit(), timeout=5)
+    finally:
+        release.set()
+        response = await edit
+
+    assert response.status_code == 200
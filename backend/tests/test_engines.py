@@ -0,0 +1,67 @@
+"""
+Engines: the scalar process() gives the same answer as process_batch(),
+including at the caps and the no-failure sentinel.
+"""
+import numpy as np
+import pytest
+
+from app.engines.damage import DamageEngine
+from app.engines.environmental import EnvironmentalEngine
+from app.engines.rul import RULEngine
+from app.engines.shift import ShiftEngine
+
+SHIFT_CONFIG = {"threshold_load": 80.0, "penalty_weight": 0.5}
+
+# Below, at, just over and far over the threshold (the last hits the 5.0 cap)
+LOADS = [40.0, 80.0, 100.0, 2000.0]
+
+# Cool and dry, warm, humid, and hot and humid enough to hit the 2.0 cap
+CLIMATES = [(20.0, 50.0), (45.0, 60.0), (25.0, 90.0), (90.0, 100.0)]
+
+# (current_damage, damage_rate, rate_stderr): normal, spent, no rate and a negative rate
+RUL_CASES = [(0.2, 0.01, 0.002), (1.2, 0.01, 0.0), (0.5, 0.0, 0.0), (0.5, -0.01, 0.0)]
+
+async def test_shift_scalar_matches_batch():
+    engine = ShiftEngine()
+    batch = engine.process_batch({"load": np.array(LOADS)}, SHIFT_CONFIG)
+
+    scalar = [await engine.process({"asset_id": "a-1", "load": load}, SHIFT_CONFIG) for load in LOADS]
+
+    assert scalar == pytest.approx(batch.tolist())
+    assert scalar[0] == scalar[1] == 1.0
+    assert scalar[-1] == 5.0
+
+async def test_environmental_scalar_matches_batch():
+    engine = EnvironmentalEngine()
+    temps, humidities = (np.array(column) for column in zip(*CLIMATES))
+    batch = engine.process_batch({"ambient_temp": temps, "humidity": humidities})
+
+    scalar = [await engine.process({"ambient_temp": temp, "humidity": humidity}) for temp, humidity in CLIMATES]
+
+    assert scalar == pytest.approx(batch.tolist())
+    assert scalar[0] == 1.0
+    assert scalar[-1] == 2.0
+
+async def test_damage_scalar_matches_batch():
+    engine = DamageEngine()
+    multipliers = [1.0, 1.5, 5.0]
+    batch = engine.process_batch({"base_damage_factor": np.full(3, 1e-4), "multiplier": np.array(multipliers)})
+
+    scalar = [await engine.process({"asset_id": "a-1", "base_damage_factor": 1e-4}, m) for m in multipliers]
+
+    assert scalar == pytest.approx(batch.tolist())
+
+async def test_rul_scalar_matches_batch():
+    engine = RULEngine()
+    damage, rate, stderr = (np.array(column) for column in zip(*RUL_CASES))
+    batch = engine.process_batch({"current_damage": damage, "damage_rate": rate, "rate_stderr": stderr})
+
+    scalar = [await engine.process(d, r, rate_stderr=s) for d, r, s in RUL_CASES]
+
+    for i, result in enumerate(scalar):
+        assert result == pytest.approx({key: float(values[i]) for key, values in batch.items()})
+    assert scalar[0]["rul"] == pytest.approx(80.0)
+    assert scalar[1]["rul"] == 0.0
+    # No positive rate: the sentinel, with no confidence in it
+    assert [result["rul"] for result in scalar[2:]] == [99999.0, 99999.0]
+    assert [result["confidence"] for result in scalar[2:]] == [0.0, 0.0]
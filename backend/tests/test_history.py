@@ -0,0 +1,80 @@
+"""
+Telemetry history: segments stay time-ordered, and naive query times are UTC.
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.history import DAY_SECONDS, HistoryStore, _open_segment
+from conftest import auth_headers
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_ENABLED", True)
+    return HistoryStore(root=str(tmp_path))
+
+async def _append(store: HistoryStore, *times: float):
+    n = len(times)
+    store.append("tenant-a", ["a-1"] * n, np.array(times), np.full(n, 50.0), np.full(n, 25.0), np.array(times) / 1e10, np.full(n, 100.0))
+    await store.flush()
+
+def _segment(store: HistoryStore, t: float) -> np.ndarray:
+    return _open_segment(os.path.join(store._asset_dir("tenant-a", "a-1"), f"{int(t // DAY_SECONDS)}.seg"))
+
+async def test_late_readings_keep_segments_sorted(store):
+    now = time.time()
+    await _append(store, now - 10)
+    # Out of order within one flush, and older than what is already on disk
+    await _append(store, now - 5, now - 30, now - 20)
+
+    assert np.all(np.diff(_segment(store, now)["t"]) >= 0)
+    series = store.query("tenant-a", "a-1", now - 25, now, points=100, method="lttb")
+    assert series["t"] == [now - 20, now - 10, now - 5]
+
+async def test_late_readings_of_a_closed_day_reach_its_rollups(store):
+    yesterday = (time.time() // DAY_SECONDS - 1) * DAY_SECONDS
+    await _append(store, yesterday + 7200, yesterday + 10)
+    start = yesterday
+    end = yesterday + DAY_SECONDS - 1
+    # Wide enough buckets to be served from the hourly rollup
+    hours = store.query("tenant-a", "a-1", start, end, points=4, method="lttb")["t"]
+    assert hours == [yesterday, yesterday + 7200]
+
+    await _append(store, yesterday + 3700)
+
+    assert np.all(np.diff(_segment(store, yesterday)["t"]) >= 0)
+    hours = store.query("tenant-a", "a-1", start, end, points=4, method="lttb")["t"]
+    assert hours == [yesterday, yesterday + 3600, yesterday + 7200]
+
+async def test_prune_drops_days_past_retention(store):
+    today = time.time() // DAY_SECONDS * DAY_SECONDS
+    await _append(store, today - 3 * DAY_SECONDS + 10, today - 2 * DAY_SECONDS + 10, today + 10)
+    # Builds the hourly rollup of the oldest day, on disk and in the cache
+    store.query("tenant-a", "a-1", today - 3 * DAY_SECONDS, today - 2 * DAY_SECONDS - 1, points=4)
+
+    store.prune(int(today // DAY_SECONDS) - 2)
+
+    assert sorted(os.listdir(store._asset_dir("tenant-a", "a-1"))) == [
+        f"{int(today // DAY_SECONDS) - 2}.seg", f"{int(today // DAY_SECONDS)}.seg",
+    ]
+    assert not store._rollups
+    assert store.query("tenant-a", "a-1", today - 3 * DAY_SECONDS, today - 2 * DAY_SECONDS - 1, points=4) == {"t": []}
+
+async def test_history_takes_naive_times_as_utc(client, monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        response = await client.get(
+            f"{settings.API_V1_STR}/reliability/history/a-1",
+            params={"start": "2026-01-01T00:00:00", "end": "2026-01-02T00:00:00"},
+            headers=auth_headers("tenant-a"),
+        )
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert response.status_code == 200
+    assert (response.json()["start"], response.json()["end"]) == (1767225600.0, 1767312000.0)
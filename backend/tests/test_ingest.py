@@ -0,0 +1,97 @@
+"""
+Telemetry ingest through the API: tenant isolation and RUL timing.
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import TelemetrySnapshot
+from conftest import auth_headers
+
+BATCH_URL = f"{settings.API_V1_STR}/reliability/ingest"
+
+def _reading(asset_id: str, load: float = 60.0) -> dict:
+    return {"asset_id": asset_id, "load": load, "temp": 70.0}
+
+async def _snapshots(db) -> dict:
+    rows = await db.scalars(select(TelemetrySnapshot))
+    return {row.asset_id: row for row in rows}
+
+async def test_batch_rejects_foreign_assets(db, client, add_assets):
+    await add_assets("tenant-a", "a-1")
+    await add_assets("tenant-b", "b-1")
+
+    response = await client.post(BATCH_URL, json={"readings": [_reading("b-1")]}, headers=auth_headers("tenant-a"))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["processed"], body["rejected"]) == (0, 1)
+    assert body["results"] == [{
+        "asset_id": "b-1", "status": "rejected", "detail": "Unknown asset",
+        "damage": None, "rul": None, "confidence": None, "multiplier": None,
+    }]
+    # Not even a snapshot is created under the caller's tenant
+    assert await _snapshots(db) == {}
+
+async def test_batch_rejects_unknown_assets(db, client, add_assets):
+    await add_assets("tenant-a", "a-1")
+
+    response = await client.post(BATCH_URL, json={"readings": [_reading("ghost")]}, headers=auth_headers("tenant-a"))
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["status"] == "rejected"
+    assert await _snapshots(db) == {}
+
+async def test_batch_mixed(db, client, add_assets):
+    await add_assets("tenant-a", "a-1", "a-2")
+    await add_assets("tenant-b", "b-1")
+    readings = [_reading("a-1"), _reading("b-1"), _reading("ghost"), _reading("a-2"), _reading("a-1", load=90.0)]
+
+    response = await client.post(BATCH_URL, json={"readings": readings}, headers=auth_headers("tenant-a"))
+
+    body = response.json()
+    assert (body["processed"], body["rejected"]) == (3, 2)
+    # Results stay in request order
+    assert [(r["asset_id"], r["status"]) for r in body["results"]] == [
+        ("a-1", "processed"), ("b-1", "rejected"), ("ghost", "rejected"), ("a-2", "processed"), ("a-1", "processed"),
+    ]
+    snapshots = await _snapshots(db)
+    assert set(snapshots) == {"a-1", "a-2"}
+    assert {s.tenant_id for s in snapshots.values()} == {"tenant-a"}
+    assert snapshots["a-1"].current_damage == body["results"][4]["damage"]
+
+async def test_single_ingest_of_foreign_asset_is_not_found(db, client, add_assets):
+    await add_assets("tenant-a", "a-1")
+    await add_assets("tenant-b", "b-1")
+
+    response = await client.post(f"{BATCH_URL}/b-1", json={"load": 60.0, "temp": 70.0}, headers=auth_headers("tenant-a"))
+
+    assert response.status_code == 404
+    assert await _snapshots(db) == {}
+
+async def test_untimed_readings_share_one_instant(db, client, add_assets):
+    # Regression: each untimed reading used to get its own time.time(), so
+    # readings of one batch sat microseconds apart and RUL collapsed to ~1e-6 h
+    await add_assets("tenant-a", "a-1")
+    readings = [_reading("a-1", load=60.0 + i) for i in range(5)]
+
+    response = await client.post(BATCH_URL, json={"readings": readings}, headers=auth_headers("tenant-a"))
+
+    results = response.json()["results"]
+    assert results[-1]["damage"] > results[0]["damage"] > 0
+    # One instant gives no time base for a rate yet: RUL stays at the sentinel
+    assert [r["rul"] for r in results] == [99999.0] * 5
+    assert results[-1]["confidence"] == 0.0
+
+async def test_timed_readings_give_rul_in_hours(db, client, add_assets):
+    await add_assets("tenant-a", "a-1")
+    readings = [
+        {**_reading("a-1"), "timestamp": f"2026-01-01T{hour:02d}:00:00"}
+        for hour in range(4)
+    ]
+
+    response = await client.post(BATCH_URL, json={"readings": readings}, headers=auth_headers("tenant-a"))
+
+    last = response.json()["results"][-1]
+    per_hour = last["damage"] / 4 # constant load: the same increment every hour
+    assert last["rul"] == pytest.approx((1.0 - last["damage"]) / per_hour)
@@ -0,0 +1,197 @@
+"""
+Replaying a batch whose commit failed (what the Kafka worker does after a
+rewind) must apply its readings exactly once. The worker drops per-asset
+state of revoked partitions and gives up on a batch that keeps failing.
+"""
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import TelemetrySnapshot
+from app.db.session import SessionLocal
+from app.services.config_cache import config_cache
+from app.services.reliability import reliability_service
+from app.services.snapshot_store import snapshot_store
+
+READINGS = {
+    "tenant-a": [{"asset_id": "a-1", "load": 60.0, "temp": 70.0, "timestamp": t} for t in (0.0, 3600.0)],
+    "tenant-b": [{"asset_id": "b-1", "load": 60.0, "temp": 70.0, "timestamp": 0.0}],
+}
+
+@pytest.fixture(params=["write_through", "write_behind"])
+async def seeded(request, db, add_assets, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_WRITE_MODE", request.param)
+    await add_assets("tenant-a", "a-1")
+    await add_assets("tenant-b", "b-1")
+    return db
+
+async def _stored_damage() -> dict:
+    if snapshot_store.write_behind:
+        await snapshot_store.checkpoint()
+    # A session of its own: the test's session must not hold the single SQLite writer
+    async with SessionLocal() as session:
+        rows = await session.scalars(select(TelemetrySnapshot))
+        return {row.asset_id: row.current_damage for row in rows}
+
+async def _ingest_all(db) -> dict:
+    staged = [await reliability_service.stage_batch(db, tenant_id, batch) for tenant_id, batch in READINGS.items()]
+    await db.commit()
+    for batch in staged:
+        await batch.publish(db)
+    return {r["asset_id"]: r["damage"] for batch in staged for r in batch.response["results"]}
+
+async def _assert_applied_once(damage: dict):
+    assert damage["a-1"] == pytest.approx(2 * damage["b-1"])
+    assert await _stored_damage() == damage
+    # Two readings at two instants: the rate window saw each once
+    assert reliability_service.rul_engine.windows["a-1"].size == 2
+    assert reliability_service.rul_engine.windows["b-1"].size == 1
+
+async def test_failed_commit_replays_once(seeded, monkeypatch):
+    db = seeded
+    staged = [await reliability_service.stage_batch(db, tenant_id, batch) for tenant_id, batch in READINGS.items()]
+    # The commit fails: the caller rolls back the session and the staged batches
+    await db.rollback()
+    for batch in staged:
+        batch.rollback()
+    assert "a-1" not in reliability_service.rul_engine.windows
+
+    await _assert_applied_once(await _ingest_all(db))
+
+async def test_failure_while_staging_replays_once(seeded, monkeypatch):
+    db = seeded
+    resolve = config_cache.resolve
+
+    async def failing_resolve(session, tenant_id, asset_ids):
+        if tenant_id == "tenant-b":
+            raise RuntimeError("config lookup failed")
+        return await resolve(session, tenant_id, asset_ids)
+
+    monkeypatch.setattr(config_cache, "resolve", failing_resolve)
+    staged = []
+    with pytest.raises(RuntimeError):
+        for tenant_id, batch in READINGS.items():
+            staged.append(await reliability_service.stage_batch(db, tenant_id, batch))
+    await db.rollback()
+    for batch in staged:
+        batch.rollback()
+    monkeypatch.setattr(config_cache, "resolve", resolve)
+
+    await _assert_applied_once(await _ingest_all(db))
+
+class FakeMessage:
+    def __init__(self, offset: int, payload: dict):
+        self._offset = offset
+        self._value = json.dumps(payload).encode()
+
+    def error(self):
+        return None
+
+    def value(self):
+        return self._value
+
+    def headers(self):
+        return [("content-type", b"application/json")]
+
+    def topic(self):
+        return "telemetry.raw"
+
+    def partition(self):
+        return 0
+
+    def offset(self):
+        return self._offset
+
+@pytest.fixture
+async def worker():
+    pytest.importorskip("confluent_kafka")
+    from app.workers.ingest import TelemetryIngestWorker
+
+    ingest_worker = TelemetryIngestWorker()
+    yield ingest_worker
+    ingest_worker.consumer.close()
+
+def _messages(readings: dict):
+    payloads = [{**reading, "tenant_id": tenant_id} for tenant_id, batch in readings.items() for reading in batch]
+    return [FakeMessage(offset, payload) for offset, payload in enumerate(payloads)]
+
+async def test_worker_replays_failed_batch_once(seeded, worker, monkeypatch):
+    resolve = config_cache.resolve
+
+    async def failing_resolve(session, tenant_id, asset_ids):
+        if tenant_id == "tenant-b":
+            raise RuntimeError("config lookup failed")
+        return await resolve(session, tenant_id, asset_ids)
+
+    monkeypatch.setattr(config_cache, "resolve", failing_resolve)
+    with pytest.raises(RuntimeError):
+        await worker.handle(_messages(READINGS))
+    # tenant-a's half of the batch was not committed on its own
+    assert await _stored_damage() == {}
+
+    monkeypatch.setattr(config_cache, "resolve", resolve)
+    await worker.handle(_messages(READINGS))
+    damage = await _stored_damage()
+    assert damage["a-1"] == pytest.approx(2 * damage["b-1"])
+    assert reliability_service.rul_engine.windows["a-1"].size == 2
+
+async def test_worker_checks_payload_tenant(seeded, worker):
+    # A message claiming tenant-a for tenant-b's asset
+    await worker.handle(_messages({"tenant-a": READINGS["tenant-b"]}))
+    assert await _stored_damage() == {}
+
+async def test_worker_releases_revoked_partitions(seeded, worker):
+    from confluent_kafka import TopicPartition
+
+    await worker.handle(_messages(READINGS))
+    damage = await _stored_damage()
+
+    await worker.release([TopicPartition("telemetry.raw", 0)])
+
+    assert "a-1" not in snapshot_store._states
+    assert "a-1" not in reliability_service.rul_engine.windows
+    # Another worker takes over from the released state
+    assert await _stored_damage() == damage
+
+class FakeConsumer:
+    """
+    Serves the same batch until stopped (a rewind replays it).
+    """
+    def __init__(self, worker, messages, polls: int):
+        self.worker, self.messages, self.polls = worker, messages, polls
+        self.seeks, self.commits = 0, 0
+
+    def subscribe(self, topics, on_revoke=None):
+        pass
+
+    def consume(self, num_messages, timeout):
+        self.polls -= 1
+        if self.polls == 0:
+            self.worker.stop()
+        return self.messages
+
+    def seek(self, partition):
+        self.seeks += 1
+
+    def commit(self, asynchronous=True):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+async def test_worker_skips_a_batch_that_keeps_failing(seeded, worker, monkeypatch):
+    async def poisoned(messages):
+        raise RuntimeError("poison")
+
+    monkeypatch.setattr(settings, "INGEST_WORKER_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "INGEST_WORKER_RETRY_BACKOFF", 0.0)
+    monkeypatch.setattr(worker, "handle", poisoned)
+    worker.consumer.close()
+    consumer = worker.consumer = FakeConsumer(worker, _messages(READINGS), polls=3)
+
+    await worker.run()
+
+    # Two rewinds, then its offsets are committed past it
+    assert (consumer.seeks, consumer.commits) == (2, 1)
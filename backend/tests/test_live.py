@@ -0,0 +1,86 @@
+"""
+Live feed authentication: token in a header or the first WebSocket frame,
+re-checked while the stream is open.
+"""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.api import api_router
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.models import User
+from app.services.user_cache import user_cache
+from conftest import auth_headers
+
+WS_URL = f"{settings.API_V1_STR}/live/ws"
+SSE_URL = f"{settings.API_V1_STR}/live/sse"
+
+@pytest.fixture
+def live_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_FEED_HEARTBEAT", 0.05)
+    monkeypatch.setattr(settings, "LIVE_FEED_AUTH_TIMEOUT", 0.2)
+    monkeypatch.setattr(settings, "LIVE_FEED_AUTH_RECHECK", 0.05)
+
+@pytest.fixture
+def ws_client(live_settings):
+    app = FastAPI()
+    app.include_router(api_router, prefix=settings.API_V1_STR)
+    with TestClient(app) as client:
+        yield client
+
+def _token(**kwargs) -> str:
+    # No user record needed while the user has not changed since the token was issued
+    return create_access_token("1", "tenant-a", **kwargs)
+
+def test_ws_accepts_the_token_as_first_frame(ws_client):
+    with ws_client.websocket_connect(WS_URL) as ws:
+        ws.send_json({"type": "auth", "token": _token()})
+        assert ws.receive_json() == {"type": "ping"}
+
+def test_ws_accepts_the_token_in_a_header(ws_client):
+    with ws_client.websocket_connect(WS_URL, headers={"Authorization": f"Bearer {_token()}"}) as ws:
+        assert ws.receive_json() == {"type": "ping"}
+
+@pytest.mark.parametrize("url", [WS_URL, f"{WS_URL}?token={_token()}"], ids=["no-token", "query-string"])
+def test_ws_without_auth_frame_is_closed(ws_client, url):
+    with ws_client.websocket_connect(url) as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+
+def test_ws_is_closed_when_the_token_expires(ws_client):
+    with ws_client.websocket_connect(WS_URL) as ws:
+        ws.send_json({"type": "auth", "token": _token(expires_delta=timedelta(seconds=1))})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            for _ in range(200):
+                ws.receive_json()
+    assert closed.value.code == 1008
+
+async def test_sse_requires_a_header(client, live_settings):
+    response = await client.get(SSE_URL, params={"token": _token()})
+    assert response.status_code == 401
+
+async def test_sse_ends_when_the_user_is_deactivated(db, client, add_assets, live_settings):
+    await add_assets("tenant-a")
+    user = User(email="viewer@example.com", hashed_password="-", role="viewer", tenant_id="tenant-a")
+    db.add(user)
+    await db.commit()
+
+    async def deactivate():
+        await asyncio.sleep(0.2)
+        user.is_active = False
+        await db.commit()
+        await user_cache.invalidate(user.id)
+
+    task = asyncio.create_task(deactivate())
+    response = await client.get(SSE_URL, headers=auth_headers("tenant-a", str(user.id)))
+    await task
+
+    assert response.status_code == 200
+    assert ": ping" in response.text
+    assert response.text.endswith("event: unauthorized\ndata: {}\n\n")
@@ -0,0 +1,35 @@
+"""
+Sign-up and login keep password hashing off the single SQLite writer.
+"""
+import asyncio
+
+from app.core.config import settings
+from app.db.models import Tenant
+from app.db.session import SessionLocal
+
+async def _login(client, password: str = "correct horse"):
+    return await client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": "ops@example.com", "password": password},
+    )
+
+async def test_signup_then_login(client):
+    response = await client.post(
+        f"{settings.API_V1_STR}/users/", json={"email": "ops@example.com", "password": "correct horse"},
+    )
+    assert response.status_code == 200
+
+    assert (await _login(client)).status_code == 200
+    assert (await _login(client, "wrong")).status_code == 400
+
+async def test_login_does_not_wait_for_the_writer(client):
+    await client.post(f"{settings.API_V1_STR}/users/", json={"email": "ops@example.com", "password": "correct horse"})
+
+    async with SessionLocal() as writer:
+        # Another request mid-transaction on the only writer connection
+        writer.add(Tenant(id="tenant-x", name="tenant-x"))
+        await writer.flush()
+        response = await asyncio.wait_for(_login(client), timeout=5)
+        await writer.rollback()
+
+    assert response.status_code == 200
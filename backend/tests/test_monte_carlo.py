@@ -0,0 +1,117 @@
+"""
+Monte Carlo forecasts: reproducibility, chunking, the time base shared with
+live ingest, and admission control.
+"""
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.engines.monte_carlo import MonteCarloRULEngine, chunk_assets
+from app.services.reliability import reliability_service
+from conftest import auth_headers
+
+FORECAST_URL = f"{settings.API_V1_STR}/reliability/forecast"
+
+def _fleet(n: int = 7):
+    rng = np.random.default_rng(42)
+    columns = {
+        "current_damage": rng.uniform(0.0, 0.5, n),
+        "base_damage_factor": rng.uniform(1e-5, 1e-3, n),
+        "load_mean": rng.uniform(40.0, 90.0, n),
+    }
+    return columns, [f"asset-{i}" for i in range(n)]
+
+def _forecast(seed: int = 1, chunk_size: int = None, asset_ids=None, columns=None):
+    default_columns, default_ids = _fleet()
+    context = {"asset_ids": asset_ids or default_ids, "scenarios": 200, "steps": 12, "seed": seed, "workers": 1}
+    if chunk_size:
+        context["chunk_size"] = chunk_size
+    return MonteCarloRULEngine().process_batch(columns or default_columns, context)
+
+def _assert_same(a, b):
+    for key in ("p10", "p50", "p90", "mean"):
+        np.testing.assert_array_equal(a[key], b[key])
+
+def test_same_seed_same_forecast():
+    _assert_same(_forecast(seed=1), _forecast(seed=1))
+    assert not np.array_equal(_forecast(seed=1)["mean"], _forecast(seed=2)["mean"])
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_forecast_does_not_depend_on_chunking(chunk_size):
+    _assert_same(_forecast(chunk_size=chunk_size), _forecast(chunk_size=7))
+
+def test_forecast_does_not_depend_on_fleet_order():
+    columns, ids = _fleet()
+    order = list(reversed(range(len(ids))))
+    reordered = _forecast(asset_ids=[ids[i] for i in order], columns={k: v[order] for k, v in columns.items()})
+    forward = _forecast()
+    for key in ("p10", "p50", "p90", "mean"):
+        np.testing.assert_array_equal(reordered[key], forward[key][order])
+
+def test_chunks_are_bounded_by_cells(monkeypatch):
+    monkeypatch.setattr(settings, "MONTE_CARLO_CHUNK_ASSETS", 128)
+    monkeypatch.setattr(settings, "MONTE_CARLO_CHUNK_CELLS", 2000000)
+    assert chunk_assets(scenarios=100, steps=24) == 128
+    assert chunk_assets(scenarios=10000, steps=24) == 8
+    # A single asset is always simulated, even above the cell budget
+    assert chunk_assets(scenarios=10000, steps=1000) == 1
+
+def test_measured_rate_sets_the_time_base():
+    columns, ids = _fleet()
+    columns["damage_rate"] = np.full(len(ids), 0.001)
+    remaining = 1.0 - columns["current_damage"]
+
+    hourly = _forecast(columns=columns)
+    settings_step = MonteCarloRULEngine().process_batch(columns, {
+        "asset_ids": ids, "scenarios": 200, "steps": 12, "seed": 1, "workers": 1, "step_hours": 1 / 3600,
+    })
+
+    # The scenarios spread around the measured rate, whatever the nominal step
+    np.testing.assert_allclose(hourly["p50"], remaining / 0.001, rtol=0.25)
+    np.testing.assert_allclose(settings_step["p50"], hourly["p50"])
+
+async def test_forecast_matches_ingest_at_one_hertz(db, add_assets):
+    await add_assets("tenant-a", "a-1")
+    readings = [{"asset_id": "a-1", "load": 50.0, "temp": 25.0, "timestamp": float(t)} for t in range(10)]
+    async with SessionLocal() as session:
+        result = await reliability_service.ingest_batch(session, "tenant-a", readings)
+        live_rul = result["results"][-1]["rul"]
+
+        forecast = await reliability_service.forecast_rul(session, "tenant-a", scenarios=200, seed=1)
+
+    # Same hours as ingest reports (an hourly time base would be 3600x longer)
+    assert forecast[0]["p50"] == pytest.approx(live_rul, rel=0.25)
+
+async def test_forecasts_beyond_the_queue_get_429(db, client, add_assets, monkeypatch):
+    await add_assets("tenant-a", "a-1")
+    monkeypatch.setattr(settings, "MONTE_CARLO_QUEUE_SIZE", 0)
+    monkeypatch.setattr(reliability_service, "_forecast_slots", asyncio.Semaphore(settings.MONTE_CARLO_CONCURRENCY))
+    release = threading.Event()
+    started = threading.Semaphore(0)
+    simulate = reliability_service.monte_carlo_engine.process_batch
+
+    def blocking_process_batch(columns, context):
+        started.release()
+        release.wait(10)
+        return simulate(columns, context)
+
+    monkeypatch.setattr(reliability_service.monte_carlo_engine, "process_batch", blocking_process_batch)
+    headers = auth_headers("tenant-a")
+    body = {"scenarios": 10, "seed": 1}
+    running = [
+        asyncio.create_task(client.post(FORECAST_URL, json=body, headers=headers))
+        for _ in range(settings.MONTE_CARLO_CONCURRENCY)
+    ]
+    for _ in running:
+        await asyncio.to_thread(started.acquire, True, 10)
+
+    rejected = await client.post(FORECAST_URL, json=body, headers=headers)
+    release.set()
+
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "1"
+    assert [r.status_code for r in await asyncio.gather(*running)] == [200] * len(running)
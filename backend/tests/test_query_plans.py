@@ -0,0 +1,193 @@
+"""
+Query-plan regression tests for the tenant-scoped hot paths.
+
+Each test runs a real code path against a seeded database, records the
+SELECTs it issues and EXPLAINs them: the test fails if any table is read
+by a full scan instead of an index lookup.
+
+SQLite always runs. PostgreSQL runs when TEST_POSTGRES_URL points at a
+scratch database (its tables are dropped and recreated), with sequential
+scans disabled so the planner picks an index whenever one applies.
+"""
+import json
+import os
+import re
+from typing import Any, List, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.v1.endpoints.assets import list_assets
+from app.db.base import Base
+from app.db.models import Asset, AuditLog, ReliabilityConfig, Tenant, TelemetrySnapshot
+from app.services.config_cache import ConfigCache
+from app.services.dashboard import DashboardAggregates
+from app.services.fleet_summary import FleetSummary, _TenantFleet
+from app.services.reliability import reliability_service
+
+TENANT = "tenant-1"
+TENANTS = ["tenant-0", TENANT, "tenant-2"]
+ASSETS_PER_TENANT = 40
+TYPES = ["Pump", "Compressor", "Turbine"]
+TABLES = set(Base.metadata.tables)
+
+BACKENDS = [
+    pytest.param("sqlite", id="sqlite"),
+    pytest.param("postgresql", id="postgresql", marks=pytest.mark.skipif(
+        not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set",
+    )),
+]
+
+async def _seed(db: AsyncSession):
+    for tenant_id in TENANTS:
+        db.add(Tenant(id=tenant_id, name=tenant_id))
+        for i in range(ASSETS_PER_TENANT):
+            asset_id = f"{tenant_id}-asset-{i:03d}"
+            db.add(Asset(id=asset_id, tenant_id=tenant_id, name=asset_id, type=TYPES[i % len(TYPES)]))
+            db.add(TelemetrySnapshot(
+                asset_id=asset_id, tenant_id=tenant_id, current_load=50.0 + i, current_temp=25.0,
+                current_damage=i / ASSETS_PER_TENANT, current_rul=1000.0 * (i + 1),
+                last_update={"load": 50.0 + i, "temp": 25.0},
+            ))
+            db.add(AuditLog(
+                tenant_id=tenant_id, entity_type="Asset", entity_id=asset_id, action="violation_detected",
+                new_value={"load": 120.0, "threshold_load": 100.0},
+            ))
+        db.add(ReliabilityConfig(tenant_id=tenant_id, scope="asset_type", scope_key="Pump", threshold_load=90.0))
+    await db.commit()
+
+@pytest.fixture(params=BACKENDS)
+async def plan_db(request, tmp_path):
+    """
+    (session, captured SELECTs) on a seeded database.
+    """
+    if request.param == "sqlite":
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}")
+    else:
+        engine = create_async_engine(os.environ["TEST_POSTGRES_URL"])
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        await _seed(db)
+
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        yield db, captured
+    await engine.dispose()
+
+async def _plan(db: AsyncSession, statement: str, parameters: Any) -> List[str]:
+    """
+    One line per plan step: SQLite's EXPLAIN QUERY PLAN details, or
+    "<node type> on <table> [using <index>]" for PostgreSQL.
+    """
+    conn = await db.connection()
+    if conn.dialect.name == "sqlite":
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+        return [row[3] for row in rows]
+
+    await conn.exec_driver_sql("SET enable_seqscan = off")
+    try:
+        raw = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+    finally:
+        await conn.exec_driver_sql("RESET enable_seqscan")
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    lines = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            index = f" using {node['Index Name']}" if "Index Name" in node else ""
+            lines.append(f"{node['Node Type']} on {node['Relation Name']}{index}")
+        nodes.extend(node.get("Plans", ()))
+    return lines
+
+def _is_full_scan(line: str) -> bool:
+    # SQLite: "SEARCH t USING INDEX ..." is a lookup; "SCAN t", with or without
+    # an index, visits every row (a full index scan still ignores the tenant)
+    m = re.match(r"(?:SCAN|Seq Scan on) (\w+)", line)
+    return m is not None and m.group(1) in TABLES
+
+async def _assert_indexed(db: AsyncSession, captured: List[Tuple[str, Any]], uses: Tuple[str, ...] = ()):
+    """
+    Fails on any full table scan and, on SQLite (whose planner is deterministic
+    here), if one of the `uses` indexes does not appear in the plans.
+    """
+    assert captured, "no SELECT was issued"
+    failures = []
+    plans = []
+    for statement, parameters in captured:
+        lines = await _plan(db, statement, parameters)
+        plans.extend(lines)
+        scans = [line for line in lines if _is_full_scan(line)]
+        if scans:
+            failures.append(f"{statement}\n  -> {'; '.join(scans)}")
+    assert not failures, "full table scans:\n" + "\n".join(failures)
+    if db.bind.dialect.name == "sqlite":
+        unused = [index for index in uses if not any(f" {index} " in f"{line} " for line in plans)]
+        assert not unused, f"indexes not used: {unused}\nplans:\n" + "\n".join(plans)
+
+async def test_dashboard_aggregates(plan_db):
+    db, captured = plan_db
+    stats = await DashboardAggregates().get(TENANT, db)
+    assert stats["total_assets"] == ASSETS_PER_TENANT
+    await _assert_indexed(db, captured, uses=("ix_telemetry_snapshot_tenant_id_current_damage",))
+
+async def test_fleet_summary(plan_db):
+    db, captured = plan_db
+    text = await FleetSummary().get(db, TENANT)
+    assert "Recent load violations" in text
+    await _assert_indexed(db, captured, uses=(
+        "ix_telemetry_snapshot_tenant_id_current_rul", "ix_auditlog_tenant_id_action_id",
+    ))
+
+async def test_config_resolution(plan_db):
+    db, captured = plan_db
+    asset_ids = [f"{TENANT}-asset-{i:03d}" for i in range(5)]
+    configs = await ConfigCache().resolve(db, TENANT, asset_ids)
+    assert configs[asset_ids[0]]["threshold_load"] == 90.0
+    await _assert_indexed(db, captured)
+
+async def test_config_invalidation(plan_db):
+    db, captured = plan_db
+    await ConfigCache().invalidate(db, TENANT, "asset_type", "Pump")
+    await _assert_indexed(db, captured, uses=("ix_asset_tenant_id_type_id",))
+
+@pytest.mark.parametrize("sort, uses", [
+    pytest.param("id", ("ix_asset_tenant_id_id", "ix_asset_tenant_id_type_id"), id="id"),
+    pytest.param("type", ("ix_asset_tenant_id_type_id",), id="type"),
+    pytest.param("rul", ("ix_telemetry_snapshot_tenant_id_current_rul",), id="rul"),
+])
+async def test_asset_list(plan_db, sort, uses):
+    db, captured = plan_db
+    response = await list_assets(
+        cursor=None, limit=10, sort=sort, order="asc", type=None, status=None,
+        rul_min=None, rul_max=None, db=db, tenant_id=TENANT,
+    )
+    page = json.loads(response.body)
+    assert len(page["items"]) == 10
+    await list_assets(
+        cursor=page["next_cursor"], limit=10, sort=sort, order="asc", type="Pump", status=None,
+        rul_min=None, rul_max=None, db=db, tenant_id=TENANT,
+    )
+    await _assert_indexed(db, captured, uses=uses)
+
+async def test_rul_forecast(plan_db):
+    db, captured = plan_db
+    forecast = await reliability_service.forecast_rul(db, TENANT, scenarios=100, seed=1)
+    assert len(forecast) == ASSETS_PER_TENANT
+    await _assert_indexed(db, captured)
+
+async def test_violation_feed(plan_db):
+    db, captured = plan_db
+    fleet = _TenantFleet()
+    await FleetSummary()._load(db, TENANT, fleet)
+    assert len(fleet.violations) > 0
+    await _assert_indexed(db, captured, uses=("ix_auditlog_tenant_id_action_id",))
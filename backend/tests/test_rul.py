@@ -0,0 +1,38 @@
+import math
+
+import pytest
+
+from app.engines.rul import DamageRateWindow
+
+def test_rate_per_hour():
+    window = DamageRateWindow(8)
+    for hour in range(4):
+        rate, stderr = window.push(hour * 3600.0, 0.01 * hour)
+    assert rate == pytest.approx(0.01)
+    assert stderr == pytest.approx(0.0, abs=1e-12)
+
+def test_same_instant_points_are_merged():
+    window = DamageRateWindow(8, min_spacing=1.0)
+    window.push(0.0, 0.0)
+    for i in range(5):
+        # Microseconds apart: regressed separately they would give ~1e3 per hour
+        rate, _ = window.push(3600.0 + i * 1e-6, 0.001 * (i + 1))
+    assert window.size == 2
+    # The merged point keeps the latest damage of its instant
+    assert window.d[1] == pytest.approx(0.005)
+    assert rate == pytest.approx(0.005)
+
+def test_single_instant_has_no_rate():
+    window = DamageRateWindow(8, min_spacing=1.0)
+    for i in range(5):
+        rate, stderr = window.push(0.0, 0.001 * i)
+    assert (rate, stderr) == (0.0, math.inf)
+
+def test_merge_across_ring_wrap():
+    window = DamageRateWindow(4, min_spacing=1.0)
+    for i in range(4):
+        window.push(i * 3600.0, 0.01 * i)
+    # The ring just wrapped: the newest point is the last slot
+    rate, _ = window.push(3 * 3600.0 + 0.5, 0.03)
+    assert window.size == 4
+    assert rate == pytest.approx(0.01)
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import TelemetrySnapshot
+from app.db.session import SessionLocal
+from app.services import snapshot_store as snapshot_store_module
+from app.services.reliability import reliability_service
+from app.services.snapshot_store import snapshot_store
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_WRITE_MODE", "write_behind")
+    monkeypatch.setattr(settings, "SNAPSHOT_CHECKPOINT_INTERVAL", 0.01)
+
+async def _stored_damage() -> dict:
+    # A session of its own: the test's session must not hold the single SQLite writer
+    async with SessionLocal() as session:
+        rows = await session.scalars(select(TelemetrySnapshot))
+        return {row.asset_id: row.current_damage for row in rows}
+
+async def test_state_is_checkpointed_and_flushed_on_stop(db, add_assets, write_behind):
+    await add_assets("tenant-a", "a-1", "a-2")
+    await snapshot_store.start()
+    try:
+        result = await reliability_service.ingest_batch(db, "tenant-a", [
+            {"asset_id": "a-1", "load": 60.0, "temp": 70.0},
+        ])
+        for _ in range(100):
+            if await _stored_damage():
+                break
+            await asyncio.sleep(0.01)
+        assert await _stored_damage() == {"a-1": result["results"][0]["damage"]}
+
+        result = await reliability_service.ingest_batch(db, "tenant-a", [
+            {"asset_id": "a-2", "load": 60.0, "temp": 70.0},
+        ])
+    finally:
+        await snapshot_store.stop()
+    # The final checkpoint runs on stop, after the loop has exited
+    assert (await _stored_damage())["a-2"] == result["results"][0]["damage"]
+    assert not snapshot_store._dirty
+
+async def test_cancelled_checkpoint_keeps_rows_dirty(db, add_assets, write_behind, monkeypatch):
+    await add_assets("tenant-a", "a-1")
+    await reliability_service.ingest_batch(db, "tenant-a", [{"asset_id": "a-1", "load": 60.0, "temp": 70.0}])
+    assert snapshot_store._dirty == {"a-1"}
+
+    entered = asyncio.Event()
+
+    class HangingSession:
+        async def __aenter__(self):
+            entered.set()
+            await asyncio.Event().wait()
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(snapshot_store_module, "SessionLocal", HangingSession)
+    task = asyncio.create_task(snapshot_store.checkpoint())
+    await entered.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert snapshot_store._dirty == {"a-1"}
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "SNAPSHOT_WRITE_MODE", "write_behind")
+    await snapshot_store.checkpoint()
+    assert "a-1" in await _stored_damage()
@@ -0,0 +1,56 @@
+"""
+User cache: private sessions, and role claims revoked across workers.
+"""
+import pytest
+from sqlalchemy import inspect
+
+from app.core.cache import state_cache
+from app.core.config import settings
+from app.db.models import User
+from app.services.user_cache import user_cache
+from benchmarks.fakes import FakeRedis
+from conftest import auth_headers
+
+TENANTS_URL = f"{settings.API_V1_STR}/tenants/"
+
+@pytest.fixture
+async def admin(db, add_assets):
+    await add_assets("tenant-a")
+    user = User(email="admin@example.com", hashed_password="-", role="admin", tenant_id="tenant-a")
+    db.add(user)
+    await db.commit()
+    return user
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(state_cache, "client", fake)
+    return fake
+
+async def test_get_returns_a_detached_user(admin):
+    user = await user_cache.get(admin.id)
+
+    assert user.role == "admin"
+    assert inspect(user).detached
+    assert await user_cache.get(admin.id) is user
+
+async def test_role_change_is_seen_by_other_workers(db, client, admin, redis):
+    headers = auth_headers("tenant-a", user_id=str(admin.id), role="admin")
+    admin.role = "viewer"
+    await db.commit()
+    await user_cache.invalidate(admin.id)
+    # Another worker: nothing cached and no invalidation message received
+    user_cache._local.clear()
+    user_cache._changed_at.clear()
+
+    response = await client.post(TENANTS_URL, json={"id": "t-new", "name": "New"}, headers=headers)
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Operation not permitted for your role"
+
+async def test_role_claim_is_trusted_without_a_change(client, admin, redis):
+    headers = auth_headers("tenant-a", user_id=str(admin.id), role="admin")
+
+    response = await client.post(TENANTS_URL, json={"id": "t-new", "name": "New"}, headers=headers)
+
+    assert response.status_code == 200
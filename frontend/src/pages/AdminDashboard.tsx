@@ -74,6 +74,18 @@ const auditLogs = [
     { id: 4, user: "Jane Doe", action: "User Role Update", resource: "John Smith (Engineer)", timestamp: "3h ago", severity: "medium" },
 ];
 
+// The asset list is cursor-paged; walk every page at the API's largest page size
+async function fetchAllAssets(): Promise<any[]> {
+    const items: any[] = [];
+    let cursor: string | null = null;
+    do {
+        const res: any = await api.get('/assets', { params: { limit: 500, ...(cursor ? { cursor } : {}) } });
+        items.push(...res.data.items);
+        cursor = res.data.next_cursor;
+    } while (cursor);
+    return items;
+}
+
 export default function AdminDashboard() {
     const [activeTab, setActiveTab] = useState("overview");
     const [systemRequests, setSystemRequests] = useState<SystemRequest[]>([]);
@@ -92,12 +104,12 @@ export default function AdminDashboard() {
 
     const fetchDashboardData = async () => {
         try {
-            const [statsRes, assetsRes] = await Promise.all([
+            const [statsRes, assets] = await Promise.all([
                 api.get('/dashboard'),
-                api.get('/assets')
+                fetchAllAssets()
             ]);
             setStats(statsRes.data);
-            setAssetsList(assetsRes.data);
+            setAssetsList(assets);
         } catch (error) {
             console.error("Failed to fetch dashboard data:", error);
             // Fallback to empty or toast error